@@ -0,0 +1,6 @@
+"""
+Benchmarks of the hashmaps against the built-in `dict`.
+
+Run them from the root of the repository with `python -m benchmarks`, and
+compare two result files with `python -m benchmarks.compare`.
+"""
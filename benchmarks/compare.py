@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+
+def compare(
+    old: dict[str, Any], new: dict[str, Any], threshold: float = 1.1
+) -> list[dict[str, Any]]:
+    """
+    Pair up the results of two reports and return the ones which got worse
+    by more than `threshold` times, as dicts with their `ratio` added.
+    """
+    old_values = {
+        (r["class"], r["distribution"], r["operation"]): r["value"]
+        for r in old["results"]
+    }
+    regressions = []
+    for result in new["results"]:
+        key = (result["class"], result["distribution"], result["operation"])
+        before = old_values.get(key)
+        after = result["value"]
+        if not before or after is None:
+            continue
+        ratio = after / before
+        if ratio > threshold:
+            regressions.append({**result, "old_value": before, "ratio": ratio})
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.compare",
+        description="List the benchmarks which got slower or bigger.",
+    )
+    parser.add_argument("old", help="results of the baseline")
+    parser.add_argument("new", help="results to check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="smallest new/old ratio reported, 1.1 by default",
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    regressions = compare(old, new, args.threshold)
+    for r in regressions:
+        print(
+            f"{r['class']:<30} {r['distribution']:<16} {r['operation']:<17} "
+            f"{r['old_value']:.6g} -> {r['value']:.6g} {r['unit']} "
+            f"({r['ratio']:.2f}x)"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import random
+import string
+from collections.abc import Callable, Hashable
+
+Distribution = Callable[[int, random.Random], tuple[list[Hashable], list[Hashable]]]
+
+# Colliding keys make most hashmaps quadratic, so only this many are used.
+COLLIDING_LIMIT = 500
+
+
+def random_ints(n: int, rng: random.Random) -> tuple[list[Hashable], list[Hashable]]:
+    keys = rng.sample(range(1 << 62), 2 * n)
+    return keys[:n], keys[n:]
+
+
+def sequential_ints(
+    n: int, rng: random.Random
+) -> tuple[list[Hashable], list[Hashable]]:
+    return list(range(n)), list(range(n, 2 * n))
+
+
+def short_strings(n: int, rng: random.Random) -> tuple[list[Hashable], list[Hashable]]:
+    alphabet = string.ascii_letters + string.digits
+    keys: dict[str, None] = {}
+    while len(keys) < 2 * n:
+        keys["".join(rng.choices(alphabet, k=8))] = None
+    strings = list(keys)
+    return strings[:n], strings[n:]
+
+
+def colliding_ints(
+    n: int, rng: random.Random
+) -> tuple[list[Hashable], list[Hashable]]:
+    """
+    Integers which are multiples of 2**32, so they share their low bits and
+    fall into a handful of slots, whatever the size of the table is.
+    """
+    n = min(n, COLLIDING_LIMIT)
+    return [i << 32 for i in range(n)], [i << 32 for i in range(n, 2 * n)]
+
+
+def sorted_ints(n: int, rng: random.Random) -> tuple[list[Hashable], list[Hashable]]:
+    """Random integers inserted in ascending order, with misses in between."""
+    keys = sorted(rng.sample(range(1 << 62), 2 * n))
+    return keys[::2], keys[1::2]
+
+
+DISTRIBUTIONS: dict[str, Distribution] = {
+    "random_ints": random_ints,
+    "sequential_ints": sequential_ints,
+    "short_strings": short_strings,
+    "colliding_ints": colliding_ints,
+    "sorted_ints": sorted_ints,
+}
+
+
+def make_keys(
+    distribution: str, n: int, seed: int
+) -> tuple[list[Hashable], list[Hashable]]:
+    """
+    Return `n` keys to insert and as many keys which are never inserted,
+    the same ones for the same `seed`.
+    """
+    return DISTRIBUTIONS[distribution](n, random.Random(seed))
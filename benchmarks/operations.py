@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import tracemalloc
+from collections.abc import Callable, Hashable, MutableMapping
+from time import perf_counter
+from typing import Any
+
+from src.pyhashmaps.base import BaseHashMap
+
+Factory = Callable[[], MutableMapping[Any, Any]]
+Operation = Callable[[Factory, list[Hashable], list[Hashable]], float | None]
+
+
+def _build(factory: Factory, keys: list[Hashable]) -> MutableMapping[Any, Any]:
+    hashmap = factory()
+    for k in keys:
+        hashmap[k] = k
+    return hashmap
+
+
+def insert(factory: Factory, keys: list[Hashable], missing: list[Hashable]) -> float:
+    hashmap = factory()
+    start = perf_counter()
+    for k in keys:
+        hashmap[k] = k
+    return perf_counter() - start
+
+
+def hit_lookup(
+    factory: Factory, keys: list[Hashable], missing: list[Hashable]
+) -> float:
+    hashmap = _build(factory, keys)
+    start = perf_counter()
+    for k in keys:
+        hashmap[k]
+    return perf_counter() - start
+
+
+def miss_lookup(
+    factory: Factory, keys: list[Hashable], missing: list[Hashable]
+) -> float:
+    hashmap = _build(factory, keys)
+    start = perf_counter()
+    for k in missing:
+        k in hashmap
+    return perf_counter() - start
+
+
+def delete(factory: Factory, keys: list[Hashable], missing: list[Hashable]) -> float:
+    hashmap = _build(factory, keys)
+    start = perf_counter()
+    for k in keys:
+        del hashmap[k]
+    return perf_counter() - start
+
+
+def churn(factory: Factory, keys: list[Hashable], missing: list[Hashable]) -> float:
+    """Insert a new key, look it up and delete an old one, over and over."""
+    hashmap = _build(factory, keys)
+    start = perf_counter()
+    for new, old in zip(missing, keys):
+        hashmap[new] = new
+        hashmap[new]
+        del hashmap[old]
+    return perf_counter() - start
+
+
+def iteration(
+    factory: Factory, keys: list[Hashable], missing: list[Hashable]
+) -> float:
+    hashmap = _build(factory, keys)
+    start = perf_counter()
+    for _ in hashmap.items():
+        pass
+    return perf_counter() - start
+
+
+def resize(
+    factory: Factory, keys: list[Hashable], missing: list[Hashable]
+) -> float | None:
+    """
+    The time spent rehashing while the keys were inserted, as reported by
+    `stats()`. The built-in `dict` doesn't report it.
+    """
+    hashmap = _build(factory, keys)
+    if not isinstance(hashmap, BaseHashMap):
+        return None
+    return hashmap.stats().resize_time
+
+
+def memory_per_entry(
+    factory: Factory, keys: list[Hashable], missing: list[Hashable]
+) -> float:
+    """The bytes allocated while the keys were inserted, per key."""
+    tracemalloc.start()
+    try:
+        hashmap = _build(factory, keys)
+        allocated, _peak = tracemalloc.get_traced_memory()
+        del hashmap
+    finally:
+        tracemalloc.stop()
+    return allocated / len(keys)
+
+
+# Name -> (operation, unit of its result).
+OPERATIONS: dict[str, tuple[Operation, str]] = {
+    "insert": (insert, "s"),
+    "hit_lookup": (hit_lookup, "s"),
+    "miss_lookup": (miss_lookup, "s"),
+    "delete": (delete, "s"),
+    "churn": (churn, "s"),
+    "iteration": (iteration, "s"),
+    "resize": (resize, "s"),
+    "memory_per_entry": (memory_per_entry, "B"),
+}
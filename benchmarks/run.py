@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from collections.abc import Iterable
+from typing import Any
+
+import src.pyhashmaps as pyhashmaps
+from src.pyhashmaps.base import BaseHashMap
+from src.pyhashmaps.caches import CacheHashMap
+from src.pyhashmaps.int_keys import IntKeyHashMap
+from src.pyhashmaps.persistent import MmapHashMap
+
+from .keys import COLLIDING_LIMIT, DISTRIBUTIONS, make_keys
+from .operations import OPERATIONS, Factory
+
+FACTORIES: dict[str, Factory] = {"dict": dict}
+for _name in pyhashmaps.__all__:
+    _obj = getattr(pyhashmaps, _name)
+    # `MmapHashMap` and `SharedHashMap` need a file or a shared memory segment
+    # to live in, and caches drop the items the lookups expect to find.
+    if (
+        isinstance(_obj, type)
+        and issubclass(_obj, BaseHashMap)
+        and not issubclass(_obj, (MmapHashMap, CacheHashMap))
+    ):
+        FACTORIES[_name] = _obj
+
+# The factories which only take integer keys.
+INT_KEY_FACTORIES = [
+    f
+    for f in FACTORIES.values()
+    if isinstance(f, type) and issubclass(f, IntKeyHashMap)
+]
+
+
+def run(
+    classes: Iterable[str] = FACTORIES,
+    distributions: Iterable[str] = DISTRIBUTIONS,
+    operations: Iterable[str] = OPERATIONS,
+    size: int = 10_000,
+    repeat: int = 5,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Run every operation on every class with every key distribution and return
+    a JSON-serializable report.
+
+    Every measurement is repeated `repeat` times on a new hashmap and the
+    smallest value is kept. Hashmaps which only take integer keys are skipped
+    for other distributions.
+    """
+    classes, distributions = list(classes), list(distributions)
+    operations = list(operations)
+    results = []
+    for distribution in distributions:
+        keys, missing = make_keys(distribution, size, seed)
+        int_keys = all(isinstance(k, int) for k in keys)
+        for class_name in classes:
+            factory = FACTORIES[class_name]
+            if not int_keys and factory in INT_KEY_FACTORIES:
+                continue
+            for operation in operations:
+                func, unit = OPERATIONS[operation]
+                values = [func(factory, keys, missing) for _ in range(repeat)]
+                results.append(
+                    {
+                        "class": class_name,
+                        "distribution": distribution,
+                        "operation": operation,
+                        "size": len(keys),
+                        "value": None if None in values else min(values),
+                        "unit": unit,
+                    }
+                )
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "size": size,
+            "colliding_limit": COLLIDING_LIMIT,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the hashmaps and write the results as JSON.",
+    )
+    parser.add_argument("--size", type=int, default=10_000, help="keys per run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--classes", nargs="+", choices=FACTORIES, default=list(FACTORIES)
+    )
+    parser.add_argument(
+        "--distributions",
+        nargs="+",
+        choices=DISTRIBUTIONS,
+        default=list(DISTRIBUTIONS),
+    )
+    parser.add_argument(
+        "--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS)
+    )
+    parser.add_argument(
+        "-o", "--output", help="file to write the results to, stdout by default"
+    )
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.classes,
+        args.distributions,
+        args.operations,
+        size=args.size,
+        repeat=args.repeat,
+        seed=args.seed,
+    )
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
@@ -1,15 +1,72 @@
+from .caches import LFUHashMap, LRUHashMap, TTLHashMap
+from .compact import CompactHashMap
+from .cuckoo import CuckooHashMap
+from .hamt import HAMTHashMap
+from .hashing import FibonacciHash, KeyedHash, SplitMixHash
+from .int_keys import IntFloatHashMap, IntIntHashMap, IntKeyHashMap
 from .open_addressing import (
+    ArrayDoubleHashingHashMap,
+    ArrayLinearProbingHashMap,
+    ArrayQuadraticProbingHashMap,
     DoubleHashingHashMap,
     LinearProbingHashMap,
     QuadraticProbingHashMap,
+    RobinHoodHashMap,
 )
-from .separate_chaining import BSTHashMap, DynamicArrayHashMap, LinkedListHashMap
+from .parallel import build_parallel
+from .persistent import MmapHashMap, PickleSerializer
+from .resize_policies import (
+    AdaptivePolicy,
+    LoadFactorMaxChainPolicy,
+    LoadFactorPolicy,
+)
+from .separate_chaining import (
+    AdaptiveHashMap,
+    AVLTreeHashMap,
+    BSTHashMap,
+    DynamicArrayHashMap,
+    LinkedListHashMap,
+)
+from .shared import SharedHashMap
+from .sharded import ShardedHashMap
+from .stats import CacheInfo, HashMapCounters, HashMapStats
+from .swiss_table import SwissTableHashMap
 
 __all__ = [
+    "ArrayDoubleHashingHashMap",
+    "ArrayLinearProbingHashMap",
+    "ArrayQuadraticProbingHashMap",
     "DoubleHashingHashMap",
     "LinearProbingHashMap",
     "QuadraticProbingHashMap",
+    "RobinHoodHashMap",
+    "SwissTableHashMap",
+    "CompactHashMap",
+    "CuckooHashMap",
+    "IntKeyHashMap",
+    "IntIntHashMap",
+    "IntFloatHashMap",
+    "MmapHashMap",
+    "SharedHashMap",
+    "ShardedHashMap",
+    "HAMTHashMap",
+    "LRUHashMap",
+    "LFUHashMap",
+    "TTLHashMap",
+    "AdaptiveHashMap",
+    "AVLTreeHashMap",
     "BSTHashMap",
     "DynamicArrayHashMap",
     "LinkedListHashMap",
+    "AdaptivePolicy",
+    "LoadFactorMaxChainPolicy",
+    "LoadFactorPolicy",
+    "FibonacciHash",
+    "KeyedHash",
+    "SplitMixHash",
+    "PickleSerializer",
+    "build_parallel",
+    "CacheInfo",
+    "HashMapCounters",
+    "HashMapStats",
 ]
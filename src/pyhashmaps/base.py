@@ -1,7 +1,29 @@
+from __future__ import annotations
+
+import sys
+import time
 from abc import abstractmethod
+from collections import Counter
 from collections.abc import Hashable, Iterable, Iterator, Mapping, MutableMapping
 from dataclasses import dataclass
-from typing import Any, Generic, Protocol, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .stats import (
+    HashMapCounters,
+    HashMapStats,
+    displacement_stats,
+    instrumented_class,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .hashing import HashStrategy
 
 
 class Comparable(Hashable, Protocol):
@@ -54,6 +76,20 @@ class Chain(Protocol[K, V]):
     def delete(self, key: K, hash_: int) -> None:
         ...
 
+    def search_path(self, key: K, hash_: int) -> Iterator[HashEntry[K, V]]:
+        """
+        Yield the items `.find()` looks at while searching for `key`, ending
+        with the matching one if there is any.
+        """
+        ...
+
+    def rebuild_order(self) -> Iterator[HashEntry[K, V]]:
+        """
+        Yield the items in an order which `.append_at_end()` turns back into a
+        chain of the same shape. It's used to pickle the chain.
+        """
+        ...
+
     def append_at_end(self, item: HashEntry[K, V]) -> None:
         """
         Append the `item` at the end.
@@ -71,11 +107,34 @@ class BaseHashMap(MutableMapping[K, V]):
     using either methods(open addressing, separete chaining)
     """
 
-    def __init__(self, initial_size: int) -> None:
+    shrink_factor: float
+    # Set while `delete_many()` runs, so that the table is shrunk only once.
+    _shrink_suspended: bool = False
+
+    # Attributes holding the table, which are pickled as the flat sequences
+    # returned by `_snapshot()` instead. Tables which are flat arrays already
+    # are pickled as they are.
+    _storage_attributes: tuple[str, ...] = ()
+
+    # Whether lookups change the hashmap, like the recency order of a cache,
+    # so that they can't run alongside writers.
+    _mutating_reads = False
+
+    def __init__(
+        self, initial_size: int, hash_strategy: HashStrategy | None = None
+    ) -> None:
         if not (isinstance(initial_size, int) and initial_size > 0):
             raise ValueError("initial_size must be a positive integer.")
+        if hash_strategy is None:
+            hash_strategy = hash
+        self.hash_strategy = hash_strategy
         self.size = initial_size
+        # The table never shrinks below the size it was created with.
+        self._min_size = initial_size
         self._len = 0
+        self._resize_count = 0
+        self._resize_time = 0.0
+        self.counters: HashMapCounters | None = None
 
     def __len__(self) -> int:
         return self._len
@@ -85,13 +144,246 @@ class BaseHashMap(MutableMapping[K, V]):
         items = ", ".join(f"{k!r}: {v!r}" for k, v in self.items())
         return f"{class_name}({{{items}}})"
 
+    def __getitem__(self, key: K) -> V:
+        return self._get_hashed(key, self._hash_func(key))
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._set_hashed(key, self._hash_func(key), value)
+
+    def __delitem__(self, key: K) -> None:
+        self._del_hashed(key, self._hash_func(key))
+
+    def get_many(self, keys: Iterable[K], default: V | None = None) -> list[V | None]:
+        """Return the values of `keys`, or `default` for the missing ones."""
+        keys, hashes = self._prepare_keys(keys)
+        result: list[V | None] = [default] * len(keys)
+        get_hashed = self._get_hashed
+        for i in self._bucket_order(hashes):
+            try:
+                result[i] = get_hashed(keys[i], hashes[i])
+            except KeyError:
+                pass
+        return result
+
+    def contains_many(self, keys: Iterable[K]) -> list[bool]:
+        """Return whether each of `keys` is in the hashmap."""
+        keys, hashes = self._prepare_keys(keys)
+        result = [False] * len(keys)
+        get_hashed = self._get_hashed
+        for i in self._bucket_order(hashes):
+            try:
+                get_hashed(keys[i], hashes[i])
+            except KeyError:
+                continue
+            result[i] = True
+        return result
+
+    def set_many(self, keys: Iterable[K], values: Iterable[V]) -> None:
+        """
+        Set the items of two parallel iterables.
+
+        The table is resized at most once, before anything is inserted. When a
+        key appears more than once, its last value wins.
+        """
+        keys, hashes = self._prepare_keys(keys)
+        if np is not None and isinstance(values, np.ndarray):
+            values = values.tolist()
+        values = list(values)
+        if len(keys) != len(values):
+            raise ValueError("keys and values must have the same length.")
+
+        self.reserve(len(self) + len(keys))
+        set_hashed = self._set_hashed
+        for i in self._bucket_order(hashes):
+            set_hashed(keys[i], hashes[i], values[i])
+
+    def delete_many(self, keys: Iterable[K]) -> int:
+        """
+        Delete the items of `keys` which are in the hashmap and return how many
+        were deleted.
+
+        The table isn't shrunk until all of them are gone.
+        """
+        keys, hashes = self._prepare_keys(keys)
+        deleted = 0
+        del_hashed = self._del_hashed
+        self._shrink_suspended = True
+        try:
+            for i in self._bucket_order(hashes):
+                try:
+                    del_hashed(keys[i], hashes[i])
+                except KeyError:
+                    continue
+                deleted += 1
+        finally:
+            self._shrink_suspended = False
+        if self._need_decrease():
+            self.shrink_to_fit()
+        return deleted
+
+    def stats(self) -> HashMapStats:
+        """
+        Describe how full the table is and how far the items are from where
+        their search starts.
+
+        It walks the whole table, so it's meant for diagnostics rather than
+        for hot paths.
+        """
+        lengths, displacements = self._histograms()
+        max_displacement, mean_displacement = displacement_stats(displacements)
+        return HashMapStats(
+            size=self.size,
+            length=self._len,
+            load_factor=self._len / self.size,
+            tombstones=self._tombstone_count(),
+            length_histogram=lengths,
+            max_displacement=max_displacement,
+            mean_displacement=mean_displacement,
+            resize_count=self._resize_count,
+            resize_time=self._resize_time,
+        )
+
+    def enable_counters(
+        self,
+        export: Callable[[HashMapCounters], None] | None = None,
+        interval: int = 10_000,
+    ) -> HashMapCounters:
+        """
+        Start counting hits, misses, probes and comparisons and return the
+        counters. If `export` is given, it's called with them after every
+        `interval` operations.
+
+        The class of the hashmap is swapped for a subclass which does the
+        counting, so hashmaps without counters don't pay anything for them.
+        """
+        if not (isinstance(interval, int) and interval > 0):
+            raise ValueError("interval must be a positive integer.")
+        if self.counters is None:
+            self.counters = HashMapCounters()
+            self.__class__ = instrumented_class(type(self))
+        self._export = export
+        self._export_interval = interval
+        return self.counters
+
+    def disable_counters(self) -> HashMapCounters | None:
+        """Stop counting and return the final counters, if there were any."""
+        counters = self.counters
+        if counters is not None:
+            self.__class__ = self._plain_class  # type: ignore[attr-defined]
+            self.counters = None
+        return counters
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """
+        Pickle the settings of the hashmap, including its `hash_strategy`, and
+        the flat sequences of hashes, keys and values of its table, which are
+        put back in place without hashing or probing any key.
+
+        Counters aren't pickled, so the copy starts without them.
+        """
+        snapshot = self._snapshot() if self._storage_attributes else None
+        state = self.__dict__.copy()
+        for name in (*self._storage_attributes, "_export", "_export_interval"):
+            state.pop(name, None)
+        state["counters"] = None
+        cls = getattr(type(self), "_plain_class", type(self))
+        return _restore, (cls, state, snapshot)
+
+    def _snapshot(self) -> Any:
+        """
+        Return the contents of `_storage_attributes` as flat sequences for
+        `_load_snapshot()`.
+        """
+        raise NotImplementedError
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        """Rebuild `_storage_attributes` from what `_snapshot()` returned."""
+        raise NotImplementedError
+
+    def _prepare_keys(self, keys: Iterable[K]) -> tuple[list[K], list[int]]:
+        """Materialize `keys` and hash all of them."""
+        if (
+            np is not None
+            and isinstance(keys, np.ndarray)
+            and keys.dtype.kind in "iu"
+            and self.hash_strategy is hash
+        ):
+            return _hash_int_array(keys)
+        keys = list(keys)
+        return keys, list(map(self.hash_strategy, keys))
+
+    def _bucket_order(self, hashes: list[int]) -> list[int]:
+        """
+        Return the positions of `hashes` sorted by the bucket they fall into,
+        so that the table is visited from one end to the other.
+        """
+        size = self.size
+        buckets = [h % size for h in hashes]
+        return sorted(range(len(hashes)), key=buckets.__getitem__)
+
+    @abstractmethod
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        """`__getitem__` for a key whose hash is already computed."""
+        pass
+
+    @abstractmethod
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        """`__setitem__` for a key whose hash is already computed."""
+        pass
+
+    @abstractmethod
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        """`__delitem__` for a key whose hash is already computed."""
+        pass
+
     def _hash_func(self, key: K) -> int:
         """
         Hash function used for hashing keys.
 
-        For simplicity, the built-in `hash()` function is used.
+        It's the built-in `hash()` function unless another `hash_strategy`
+        is given.
+        """
+        return self.hash_strategy(key)
+
+    @abstractmethod
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        """
+        Repeat the search for `key` and return the number of probes and key
+        comparisons it takes, and whether the key was found.
+        """
+        pass
+
+    @abstractmethod
+    def _histograms(self) -> tuple[Counter[int], Counter[int]]:
+        """
+        Return the histogram of probe or chain lengths and the histogram of
+        item displacements reported by `stats()`.
+        """
+        pass
+
+    def _tombstone_count(self) -> int:
+        return 0
+
+    def _resize(self, new_size: int, incremental: bool = False) -> None:
         """
-        return hash(key)
+        Move the items into a table of `new_size`, keeping track of how many
+        times and for how long the hashmap has been resized.
+        """
+        start = time.perf_counter()
+        if incremental:
+            self._start_rehash(new_size)
+        else:
+            self._rehash(new_size)
+        self._resize_time += time.perf_counter() - start
+        self._resize_count += 1
+
+    @abstractmethod
+    def _rehash(self, new_size: int) -> None:
+        pass
+
+    @abstractmethod
+    def _start_rehash(self, new_size: int) -> None:
+        pass
 
     @abstractmethod
     def _increase_size(self) -> None:
@@ -100,3 +392,57 @@ class BaseHashMap(MutableMapping[K, V]):
         specified by subclasses.
         """
         pass
+
+    @abstractmethod
+    def _decrease_size(self) -> None:
+        """
+        decreases the size of the hash table based on the criteria
+        specified by subclasses.
+        """
+        pass
+
+    @abstractmethod
+    def shrink_to_fit(self) -> None:
+        """
+        Shrink the hash table to the smallest size which still holds the
+        current items comfortably.
+        """
+        pass
+
+    @abstractmethod
+    def _need_decrease(self) -> bool:
+        pass
+
+    @abstractmethod
+    def reserve(self, n: int) -> None:
+        """
+        Grow the hash table once so that it holds `n` items without being
+        resized again.
+        """
+        pass
+
+
+def _restore(
+    cls: type[BaseHashMap[K, V]], state: dict[str, Any], snapshot: Any
+) -> BaseHashMap[K, V]:
+    """Unpickle a hashmap pickled by `BaseHashMap.__reduce__()`."""
+    hashmap = cls.__new__(cls)
+    hashmap.__dict__.update(state)
+    if hashmap._storage_attributes:
+        hashmap._load_snapshot(snapshot)
+    return hashmap
+
+
+def _hash_int_array(array: Any) -> tuple[list[Any], list[int]]:
+    """
+    Hash a NumPy integer array the way the built-in `hash()` hashes its
+    elements, which is the identity below the modulus of `sys.hash_info`.
+    """
+    keys = array.tolist()
+    modulus = sys.hash_info.modulus
+    if array.size and (array.min() <= -modulus or array.max() >= modulus):
+        return keys, list(map(hash, keys))
+    hashes = array.astype(np.int64)
+    # -1 is reserved for errors in CPython.
+    hashes[hashes == -1] = -2
+    return keys, hashes.tolist()
@@ -0,0 +1,554 @@
+from __future__ import annotations
+
+import time
+from array import array
+from collections.abc import ItemsView, ValuesView
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Generic, cast
+
+from .base import HashEntry, HashMapArgument, K, V
+from .chains import DynamicArray
+from .separate_chaining import SeparateChainingHashMap
+from .stats import CacheInfo
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from .hashing import HashStrategy
+    from .resize_policies import ResizePolicy
+
+# Number of expired items a write to a `TTLHashMap` drops at most. Since every
+# write adds at most one item, that's enough for expired items not to pile up.
+EXPIRE_BATCH = 2
+
+_MISSING: Any = object()
+
+
+@dataclass(slots=True)
+class CacheEntry(HashEntry[K, V]):
+    """
+    A `HashEntry` which is also a node of the doubly linked list that orders
+    the items of a cache.
+    """
+
+    prev: CacheEntry[K, V] | None = field(default=None, repr=False, compare=False)
+    next: CacheEntry[K, V] | None = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class LFUEntry(CacheEntry[K, V]):
+    frequency: FrequencyNode | None = field(default=None, repr=False, compare=False)
+
+
+@dataclass(slots=True)
+class TTLEntry(CacheEntry[K, V]):
+    expires: float = field(default=0.0, repr=False, compare=False)
+
+
+class EntryList(Generic[K, V]):
+    """
+    A circular doubly linked list threaded through the `prev` and `next`
+    fields of its entries, so that any entry can be removed in O(1).
+    """
+
+    def __init__(self) -> None:
+        root: CacheEntry[Any, Any] = CacheEntry(0, None, None)
+        root.prev = root.next = root
+        self.root = root
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[CacheEntry[K, V]]:
+        root = self.root
+        entry = cast(CacheEntry[K, V], root.next)
+        while entry is not root:
+            # Read ahead, so that the entry can be removed by the caller.
+            next_entry = cast(CacheEntry[K, V], entry.next)
+            yield entry
+            entry = next_entry
+
+    def first(self) -> CacheEntry[K, V]:
+        return cast(CacheEntry[K, V], self.root.next)
+
+    def append(self, entry: CacheEntry[K, V]) -> None:
+        root = self.root
+        last = cast(CacheEntry[K, V], root.prev)
+        entry.prev, entry.next = last, root
+        last.next = root.prev = entry
+        self.count += 1
+
+    def remove(self, entry: CacheEntry[K, V]) -> None:
+        prev = cast(CacheEntry[K, V], entry.prev)
+        next_ = cast(CacheEntry[K, V], entry.next)
+        prev.next, next_.prev = next_, prev
+        self.count -= 1
+
+    def move_to_end(self, entry: CacheEntry[K, V]) -> None:
+        self.remove(entry)
+        self.append(entry)
+
+
+@dataclass(slots=True, eq=False)
+class FrequencyNode:
+    """The entries of an `LFUHashMap` which have been used `count` times."""
+
+    count: int
+    entries: EntryList[Any, Any] = field(default_factory=EntryList)
+    prev: FrequencyNode | None = field(default=None, repr=False)
+    next: FrequencyNode | None = field(default=None, repr=False)
+
+
+class CacheItemsView(ItemsView[K, V]):
+    """An items view which doesn't count as a use of the items."""
+
+    _mapping: CacheHashMap[K, V]
+
+    def __contains__(self, item: object) -> bool:
+        key, value = cast(tuple[K, V], item)
+        entry = self._mapping._find_entry(key, self._mapping._hash_func(key))
+        return entry is not None and (entry.value is value or entry.value == value)
+
+    def __iter__(self) -> Iterator[tuple[K, V]]:
+        for entry in self._mapping._ordered_entries():
+            yield entry.key, entry.value
+
+
+class CacheValuesView(ValuesView[V]):
+    """A values view which doesn't count as a use of the items."""
+
+    _mapping: CacheHashMap[Any, V]
+
+    def __iter__(self) -> Iterator[V]:
+        for entry in self._mapping._ordered_entries():
+            yield entry.value
+
+
+class CacheHashMap(SeparateChainingHashMap[K, V]):
+    """
+    Base class of the hashmaps which hold at most `maxsize` items and evict
+    one when a new key would exceed it.
+
+    The items are linked in the order in which they're evicted, so lookups,
+    updates and evictions all take a single hash of the key. Iteration
+    follows the same order. Without subclass hooks, that order is the order
+    of insertion.
+    """
+
+    chain = DynamicArray
+    _storage_attributes = ("slots", "_old_slots", "_entries")
+    _entry_class: type[CacheEntry[Any, Any]] = CacheEntry
+    _mutating_reads = True
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        maxsize: int | None = 128,
+        initial_size: int = 40,
+        max_chain_size: int = 5,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        resize_policy: ResizePolicy | None = None,
+        hash_strategy: HashStrategy | None = None,
+    ) -> None:
+        if maxsize is not None and not (isinstance(maxsize, int) and maxsize > 0):
+            raise ValueError("maxsize must be a positive integer or None.")
+        self.maxsize = maxsize
+        self._hits = self._misses = self._evictions = self._expirations = 0
+        self._init_order()
+        super().__init__(
+            mapping_or_iterable,
+            initial_size=initial_size,
+            max_chain_size=max_chain_size,
+            shrink_factor=shrink_factor,
+            incremental_resize=incremental_resize,
+            resize_policy=resize_policy,
+            hash_strategy=hash_strategy,
+        )
+
+    def __iter__(self) -> Iterator[K]:
+        for entry in self._ordered_entries():
+            yield entry.key
+
+    def __contains__(self, key: object) -> bool:
+        # Unlike a lookup, a membership test doesn't count as a use, and neither
+        # does going through the items or values.
+        return self._find_entry(cast(K, key), self._hash_func(cast(K, key))) is not None
+
+    def pop(self, key: K, default: V = _MISSING) -> V:
+        # Removing an item isn't a use of it either, so unlike `self[key]` it
+        # doesn't count as a hit or raise the item's frequency.
+        hash_ = self._hash_func(key)
+        entry = self._find_entry(key, hash_)
+        if entry is None:
+            if default is _MISSING:
+                raise KeyError(repr(key))
+            return default
+        self._del_hashed(key, hash_)
+        return entry.value
+
+    def popitem(self) -> tuple[K, V]:
+        """Remove and return the item which would be evicted next."""
+        for entry in self._ordered_entries():
+            break
+        else:
+            raise KeyError("popitem(): hashmap is empty")
+        self._del_hashed(entry.key, entry.hash_value)
+        return entry.key, entry.value
+
+    def contains_many(self, keys: Iterable[K]) -> list[bool]:
+        keys, hashes = self._prepare_keys(keys)
+        find_entry = self._find_entry
+        return [find_entry(k, h) is not None for k, h in zip(keys, hashes)]
+
+    def items(self) -> CacheItemsView[K, V]:
+        return CacheItemsView(self)
+
+    def values(self) -> CacheValuesView[V]:
+        return CacheValuesView(self)
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        entry = self._find_entry(key, hash_)
+        if entry is None:
+            self._misses += 1
+            raise KeyError(repr(key))
+        self._hits += 1
+        self._on_hit(entry)
+        return entry.value
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        entry = self._find_entry(key, hash_)
+        if entry is not None:
+            entry.value = value
+            self._on_update(entry)
+            return
+
+        if self.maxsize is not None and self._len >= self.maxsize:
+            self._remove(self._victim())
+            self._evictions += 1
+        entry = self._entry_class(hash_, key, value)
+        chain = self._chain_for(hash_)
+        chain.append_at_end(entry)
+        self._link(entry)
+        self._len += 1
+
+        if self._old_slots is not None:
+            self._migrate(self._rehash_step)
+        if self._need_increase(len(chain)):
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        entry = self._find_entry(key, hash_)
+        if entry is None:
+            raise KeyError(repr(key))
+        self._remove(entry)
+
+        if self._old_slots is not None:
+            self._migrate(self._rehash_step)
+        if self._need_decrease():
+            self._decrease_size()
+
+    def reserve(self, n: int) -> None:
+        # A cache never holds more than `maxsize` items, however many
+        # `set_many()` is given.
+        if self.maxsize is not None:
+            n = min(n, self.maxsize)
+        super().reserve(n)
+
+    def _bucket_order(self, hashes: list[int]) -> list[int]:
+        # Batches are used in the given order, so that which items they evict
+        # doesn't depend on the hashes of their keys.
+        return list(range(len(hashes)))
+
+    def cache_info(self) -> CacheInfo:
+        """Return the counters of the cache since it was created."""
+        return CacheInfo(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            expirations=self._expirations,
+            maxsize=self.maxsize,
+            currsize=len(self),
+        )
+
+    def _find_entry(self, key: K, hash_: int) -> CacheEntry[K, V] | None:
+        try:
+            entry = self._chain_for(hash_).find(key, hash_)
+        except KeyError:
+            return None
+        return cast(CacheEntry[K, V], entry)
+
+    def _remove(self, entry: CacheEntry[K, V]) -> None:
+        """Drop `entry` from its chain and from the eviction order."""
+        self._chain_for(entry.hash_value).delete(entry.key, entry.hash_value)
+        self._unlink(entry)
+        self._len -= 1
+
+    # Hooks which keep the eviction order. `_victim()` is the next entry to be
+    # evicted and the first one `_ordered_entries()` yields.
+
+    def _init_order(self) -> None:
+        self._entries: EntryList[K, V] = EntryList()
+
+    def _ordered_entries(self) -> Iterator[CacheEntry[K, V]]:
+        return iter(self._entries)
+
+    def _victim(self) -> CacheEntry[K, V]:
+        return self._entries.first()
+
+    def _link(self, entry: CacheEntry[K, V]) -> None:
+        self._entries.append(entry)
+
+    def _unlink(self, entry: CacheEntry[K, V]) -> None:
+        self._entries.remove(entry)
+
+    def _on_hit(self, entry: CacheEntry[K, V]) -> None:
+        pass
+
+    def _on_update(self, entry: CacheEntry[K, V]) -> None:
+        pass
+
+    def _snapshot(self) -> tuple[Any, ...]:
+        """
+        Return the hashes, keys and values of the items in eviction order,
+        followed by what `_order_snapshot()` adds.
+        """
+        self._finish_rehash()
+        entries = list(self._ordered_entries())
+        return (
+            array("q", [e.hash_value for e in entries]),
+            [e.key for e in entries],
+            [e.value for e in entries],
+            *self._order_snapshot(entries),
+        )
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        hashes, keys, values, *order = snapshot
+        self.slots = [self.chain() for _ in range(self.size)]
+        self._old_slots = None
+        self._init_order()
+        entries = list(map(self._entry_class, hashes, keys, values))
+        for entry in entries:
+            self.slots[entry.hash_value % self.size].append_at_end(entry)
+        self._load_order(entries, *order)
+
+    def _order_snapshot(self, entries: list[CacheEntry[K, V]]) -> tuple[Any, ...]:
+        return ()
+
+    def _load_order(self, entries: Iterable[CacheEntry[K, V]], *order: Any) -> None:
+        for entry in entries:
+            self._link(entry)
+
+
+class LRUHashMap(CacheHashMap[K, V]):
+    """A cache which evicts the least recently used item."""
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        maxsize: int = 128,
+        **kwargs: Any,
+    ) -> None:
+        if maxsize is None:
+            raise ValueError("maxsize must be a positive integer.")
+        super().__init__(mapping_or_iterable, maxsize=maxsize, **kwargs)
+
+    def _on_hit(self, entry: CacheEntry[K, V]) -> None:
+        self._entries.move_to_end(entry)
+
+    _on_update = _on_hit
+
+
+class LFUHashMap(CacheHashMap[K, V]):
+    """
+    A cache which evicts the least frequently used item, or the least
+    recently used one among those used as rarely.
+
+    Entries are kept in a list of `FrequencyNode`s sorted by use count, so a
+    use moves an entry to the next node in O(1).
+    """
+
+    _storage_attributes = ("slots", "_old_slots", "_frequencies")
+    _entry_class = LFUEntry
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        maxsize: int = 128,
+        **kwargs: Any,
+    ) -> None:
+        if maxsize is None:
+            raise ValueError("maxsize must be a positive integer.")
+        super().__init__(mapping_or_iterable, maxsize=maxsize, **kwargs)
+
+    def frequency(self, key: K) -> int:
+        """Return how many times `key` has been used, without using it."""
+        entry = self._find_entry(key, self._hash_func(key))
+        if entry is None:
+            raise KeyError(repr(key))
+        return cast(FrequencyNode, cast(LFUEntry[K, V], entry).frequency).count
+
+    def _init_order(self) -> None:
+        root = FrequencyNode(0)
+        root.prev = root.next = root
+        self._frequencies = root
+
+    def _ordered_entries(self) -> Iterator[CacheEntry[K, V]]:
+        root = self._frequencies
+        node = cast(FrequencyNode, root.next)
+        while node is not root:
+            next_node = cast(FrequencyNode, node.next)
+            yield from node.entries
+            node = next_node
+
+    def _victim(self) -> CacheEntry[K, V]:
+        return cast(FrequencyNode, self._frequencies.next).entries.first()
+
+    def _insert_node(self, after: FrequencyNode, count: int) -> FrequencyNode:
+        """Return the node of `count` which follows `after`, adding it if needed."""
+        node = cast(FrequencyNode, after.next)
+        if node is self._frequencies or node.count != count:
+            node = FrequencyNode(count, prev=after, next=node)
+            cast(FrequencyNode, after.next).prev = node
+            after.next = node
+        return node
+
+    def _link(self, entry: CacheEntry[K, V]) -> None:
+        node = self._insert_node(self._frequencies, 1)
+        node.entries.append(entry)
+        cast(LFUEntry[K, V], entry).frequency = node
+
+    def _unlink(self, entry: CacheEntry[K, V]) -> None:
+        node = cast(FrequencyNode, cast(LFUEntry[K, V], entry).frequency)
+        node.entries.remove(entry)
+        if not node.entries:
+            self._drop_node(node)
+
+    def _drop_node(self, node: FrequencyNode) -> None:
+        prev, next_ = cast(FrequencyNode, node.prev), cast(FrequencyNode, node.next)
+        prev.next, next_.prev = next_, prev
+
+    def _on_hit(self, entry: CacheEntry[K, V]) -> None:
+        lfu_entry = cast(LFUEntry[K, V], entry)
+        node = cast(FrequencyNode, lfu_entry.frequency)
+        new_node = self._insert_node(node, node.count + 1)
+        node.entries.remove(entry)
+        new_node.entries.append(entry)
+        lfu_entry.frequency = new_node
+        if not node.entries:
+            self._drop_node(node)
+
+    _on_update = _on_hit
+
+    def _order_snapshot(self, entries: list[CacheEntry[K, V]]) -> tuple[Any, ...]:
+        counts = [
+            cast(FrequencyNode, cast(LFUEntry[K, V], e).frequency).count
+            for e in entries
+        ]
+        return (array("q", counts),)
+
+    def _load_order(self, entries: Iterable[CacheEntry[K, V]], *order: Any) -> None:
+        (counts,) = order
+        for entry, count in zip(entries, counts):
+            # The entries come sorted by count.
+            node = self._insert_node(cast(FrequencyNode, self._frequencies.prev), count)
+            node.entries.append(entry)
+            cast(LFUEntry[K, V], entry).frequency = node
+
+
+class TTLHashMap(CacheHashMap[K, V]):
+    """
+    A cache whose items expire `ttl` seconds after they were last set, as
+    measured by `timer`. With a `maxsize`, the item closest to expiring is
+    evicted to make room.
+
+    Expiry is lazy: an expired item is dropped when it's looked up, and
+    every write drops at most `EXPIRE_BATCH` of the oldest expired items.
+    Only `len()`, iteration, pickling and `expire()` drop all of them, which takes
+    time proportional to the number of expired items, never to the size of
+    the cache.
+    """
+
+    _entry_class = TTLEntry
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        ttl: float,
+        maxsize: int | None = None,
+        timer: Callable[[], float] = time.monotonic,
+        **kwargs: Any,
+    ) -> None:
+        if not ttl > 0:
+            raise ValueError("ttl must be positive.")
+        self.ttl = ttl
+        self.timer = timer
+        super().__init__(mapping_or_iterable, maxsize=maxsize, **kwargs)
+
+    def __len__(self) -> int:
+        self.expire()
+        return self._len
+
+    def _ordered_entries(self) -> Iterator[CacheEntry[K, V]]:
+        self.expire()
+        return super()._ordered_entries()
+
+    def expire(self) -> None:
+        """Drop every expired item."""
+        self._expire(None)
+
+    def _expire(self, limit: int | None) -> None:
+        entries, now = self._entries, self.timer()
+        dropped = 0
+        while entries and dropped != limit:
+            entry = cast(TTLEntry[K, V], entries.first())
+            if entry.expires > now:
+                break
+            self._remove(entry)
+            self._expirations += 1
+            dropped += 1
+
+    def _find_entry(self, key: K, hash_: int) -> CacheEntry[K, V] | None:
+        entry = super()._find_entry(key, hash_)
+        if entry is not None and cast(TTLEntry[K, V], entry).expires <= self.timer():
+            self._remove(entry)
+            self._expirations += 1
+            return None
+        return entry
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        self._expire(EXPIRE_BATCH)
+        super()._set_hashed(key, hash_, value)
+
+    def _link(self, entry: CacheEntry[K, V]) -> None:
+        # The ttl is the same for every item, so appending keeps the list
+        # sorted by expiry time.
+        cast(TTLEntry[K, V], entry).expires = self.timer() + self.ttl
+        self._entries.append(entry)
+
+    def _on_update(self, entry: CacheEntry[K, V]) -> None:
+        cast(TTLEntry[K, V], entry).expires = self.timer() + self.ttl
+        self._entries.move_to_end(entry)
+
+    def _order_snapshot(self, entries: list[CacheEntry[K, V]]) -> tuple[Any, ...]:
+        # The clock of another process may not agree with this one, so the
+        # time left is pickled instead of the expiry time.
+        now = self.timer()
+        left = [cast(TTLEntry[K, V], e).expires - now for e in entries]
+        return (array("d", left),)
+
+    def _load_order(self, entries: Iterable[CacheEntry[K, V]], *order: Any) -> None:
+        (left,) = order
+        now = self.timer()
+        for entry, seconds in zip(entries, left):
+            cast(TTLEntry[K, V], entry).expires = now + seconds
+            self._entries.append(entry)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Generic, cast
+from functools import cache
+from typing import TYPE_CHECKING, Any, Generic, cast
 
 from .base import Chain, Comp_K, HashEntry, K, V, is_same
 
@@ -27,6 +28,33 @@ class BSTNode(Generic[Comp_K, V]):
     parent: BSTNode[Comp_K, V] | None = field(default=None, repr=False, compare=False)
 
 
+@dataclass(slots=True)
+class AVLNode(Generic[Comp_K, V]):
+    """Node implementation used in the AVLTree class"""
+
+    data: HashEntry[Comp_K, V]
+    left: AVLNode[Comp_K, V] | None = field(default=None, repr=False, compare=False)
+    right: AVLNode[Comp_K, V] | None = field(default=None, repr=False, compare=False)
+    height: int = field(default=1, repr=False, compare=False)
+
+
+def _level_order(
+    root: BSTNode[Comp_K, V] | AVLNode[Comp_K, V] | None,
+) -> Iterator[HashEntry[Comp_K, V]]:
+    """Yield the items of a tree level by level, from the root down."""
+    level: list[BSTNode[Comp_K, V] | AVLNode[Comp_K, V]] = []
+    if root is not None:
+        level.append(root)
+    while level:
+        yield from (node.data for node in level)
+        level = [
+            child
+            for node in level
+            for child in (node.left, node.right)
+            if child is not None
+        ]
+
+
 class DynamicArray(Chain[K, V]):
     def __init__(self) -> None:
         self.lst: list[HashEntry[K, V]] = []
@@ -58,6 +86,15 @@ class DynamicArray(Chain[K, V]):
                 return
         raise KeyError(repr(key))
 
+    def search_path(self, key: K, hash_: int) -> Iterator[HashEntry[K, V]]:
+        for e in self.lst:
+            yield e
+            if hash_ == e.hash_value and is_same(e.key, key):
+                return
+
+    def rebuild_order(self) -> Iterator[HashEntry[K, V]]:
+        return iter(self.lst)
+
     def append_at_end(self, item: HashEntry[K, V]) -> None:
         self.lst.append(item)
 
@@ -111,6 +148,8 @@ class LinkedList(Chain[K, V]):
                 else:
                     previous_node = cast(LinkedListNode[K, V], previous_node)
                     previous_node.next = current_node.next
+                if current_node is self.tail:
+                    self.tail = None if self.head is None else previous_node
                 self.count -= 1
                 break
             previous_node = current_node
@@ -118,6 +157,16 @@ class LinkedList(Chain[K, V]):
         else:
             raise KeyError(repr(key))
 
+    def search_path(self, key: K, hash_: int) -> Iterator[HashEntry[K, V]]:
+        current_node = self.head
+        while current_node:
+            yield current_node.data
+            if hash_ == current_node.data.hash_value and is_same(
+                current_node.data.key, key
+            ):
+                return
+            current_node = current_node.next
+
     def insert_tail(self, data: HashEntry[K, V]) -> None:
         node = LinkedListNode(data)
         if self.tail:
@@ -127,6 +176,9 @@ class LinkedList(Chain[K, V]):
             self.head = self.tail = node
         self.count += 1
 
+    def rebuild_order(self) -> Iterator[HashEntry[K, V]]:
+        return iter(self)
+
     def append_at_end(self, item: HashEntry[K, V]) -> None:
         self.insert_tail(item)
 
@@ -199,11 +251,15 @@ class BinarySearchTree(Chain[Comp_K, V]):
     def inorder_traversal(
         self, node: BSTNode[Comp_K, V] | None
     ) -> Generator[HashEntry[Comp_K, V], None, None]:
-        if node is None:
-            return
-        yield from self.inorder_traversal(node.left)
-        yield node.data
-        yield from self.inorder_traversal(node.right)
+        # Iterative, since an unbalanced tree can be as deep as it is long.
+        stack: list[BSTNode[Comp_K, V]] = []
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
 
     def find_node(self, key: Comp_K, hash_: int) -> BSTNode[Comp_K, V]:
         current_node = self.root
@@ -219,6 +275,21 @@ class BinarySearchTree(Chain[Comp_K, V]):
 
         raise KeyError(repr(key))
 
+    def search_path(
+        self, key: Comp_K, hash_: int
+    ) -> Iterator[HashEntry[Comp_K, V]]:
+        current_node = self.root
+        while current_node is not None:
+            yield current_node.data
+            if hash_ == current_node.data.hash_value and is_same(
+                current_node.data.key, key
+            ):
+                return
+            if key < current_node.data.key:
+                current_node = current_node.left
+            else:
+                current_node = current_node.right
+
     def is_right_child(self, node: BSTNode[Comp_K, V]) -> bool:
         node.parent = cast(BSTNode[Comp_K, V], node.parent)
         if node.parent.right is not None:
@@ -244,7 +315,281 @@ class BinarySearchTree(Chain[Comp_K, V]):
             node = node.right
         return node
 
+    def rebuild_order(self) -> Iterator[HashEntry[Comp_K, V]]:
+        # Inserting a parent before its children gives the same tree back.
+        return _level_order(self.root)
+
     def append_at_end(self, item: HashEntry[Comp_K, V]) -> None:
         # Delegates to `insert` since there is no faster way of doing it except
         # removing the `is_same` from `.insert` which is a micro optimization.
         self.insert(item)
+
+
+class AVLTree(Chain[Comp_K, V]):
+    """
+    A self-balancing binary search tree. The heights of the two subtrees of
+    every node differ by at most one, so all operations are O(log n) even when
+    the keys arrive in sorted order.
+    """
+
+    def __init__(self) -> None:
+        self.root: AVLNode[Comp_K, V] | None = None
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[HashEntry[Comp_K, V]]:
+        stack: list[AVLNode[Comp_K, V]] = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
+
+    def find(self, key: Comp_K, hash_: int) -> HashEntry[Comp_K, V]:
+        node = self.root
+        while node is not None:
+            if hash_ == node.data.hash_value and is_same(node.data.key, key):
+                return node.data
+            node = node.left if key < node.data.key else node.right
+        raise KeyError(repr(key))
+
+    def search_path(
+        self, key: Comp_K, hash_: int
+    ) -> Iterator[HashEntry[Comp_K, V]]:
+        node = self.root
+        while node is not None:
+            yield node.data
+            if hash_ == node.data.hash_value and is_same(node.data.key, key):
+                return
+            node = node.left if key < node.data.key else node.right
+
+    def insert(self, item: HashEntry[Comp_K, V]) -> None:
+        self.root = self._insert(self.root, item)
+
+    def delete(self, key: Comp_K, hash_: int) -> None:
+        self.root = self._delete(self.root, key, hash_)
+        self.count -= 1
+
+    def rebuild_order(self) -> Iterator[HashEntry[Comp_K, V]]:
+        return _level_order(self.root)
+
+    def append_at_end(self, item: HashEntry[Comp_K, V]) -> None:
+        self.insert(item)
+
+    # The recursive helpers below only go as deep as the tree is high, which is
+    # logarithmic in the number of nodes.
+
+    def _insert(
+        self, node: AVLNode[Comp_K, V] | None, item: HashEntry[Comp_K, V]
+    ) -> AVLNode[Comp_K, V]:
+        if node is None:
+            self.count += 1
+            return AVLNode(item)
+        if item.hash_value == node.data.hash_value and is_same(
+            item.key, node.data.key
+        ):
+            node.data = item
+            return node
+        if item.key < node.data.key:
+            node.left = self._insert(node.left, item)
+        else:
+            node.right = self._insert(node.right, item)
+        return self._rebalance(node)
+
+    def _delete(
+        self, node: AVLNode[Comp_K, V] | None, key: Comp_K, hash_: int
+    ) -> AVLNode[Comp_K, V] | None:
+        if node is None:
+            raise KeyError(repr(key))
+        if hash_ == node.data.hash_value and is_same(node.data.key, key):
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            successor = node.right
+            while successor.left is not None:
+                successor = successor.left
+            node.data = successor.data
+            node.right = self._delete_min(node.right)
+        elif key < node.data.key:
+            node.left = self._delete(node.left, key, hash_)
+        else:
+            node.right = self._delete(node.right, key, hash_)
+        return self._rebalance(node)
+
+    def _delete_min(self, node: AVLNode[Comp_K, V]) -> AVLNode[Comp_K, V] | None:
+        if node.left is None:
+            return node.right
+        node.left = self._delete_min(node.left)
+        return self._rebalance(node)
+
+    @staticmethod
+    def _height(node: AVLNode[Comp_K, V] | None) -> int:
+        return 0 if node is None else node.height
+
+    def _update_height(self, node: AVLNode[Comp_K, V]) -> None:
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+
+    def _rotate_right(self, node: AVLNode[Comp_K, V]) -> AVLNode[Comp_K, V]:
+        pivot = cast(AVLNode[Comp_K, V], node.left)
+        node.left = pivot.right
+        pivot.right = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rotate_left(self, node: AVLNode[Comp_K, V]) -> AVLNode[Comp_K, V]:
+        pivot = cast(AVLNode[Comp_K, V], node.right)
+        node.right = pivot.left
+        pivot.left = node
+        self._update_height(node)
+        self._update_height(pivot)
+        return pivot
+
+    def _rebalance(self, node: AVLNode[Comp_K, V]) -> AVLNode[Comp_K, V]:
+        self._update_height(node)
+        balance = self._height(node.left) - self._height(node.right)
+        if balance > 1:
+            left = cast(AVLNode[Comp_K, V], node.left)
+            if self._height(left.left) < self._height(left.right):
+                node.left = self._rotate_left(left)
+            return self._rotate_right(node)
+        if balance < -1:
+            right = cast(AVLNode[Comp_K, V], node.right)
+            if self._height(right.right) < self._height(right.left):
+                node.right = self._rotate_right(right)
+            return self._rotate_left(node)
+        return node
+
+
+# Built-in types whose `<` is a total order on their values, apart from NaN.
+# Other keys may be partially ordered, like frozensets, whose `<` returns
+# False instead of raising and would silently corrupt a search tree.
+_TOTALLY_ORDERED = (int, float, str, bytes)
+
+
+@cache
+def _total_order(cls: type) -> type | None:
+    """
+    Return the type of `_TOTALLY_ORDERED` which `cls` compares like, or None
+    if `cls` isn't one of them or overrides how they compare.
+    """
+    for base in _TOTALLY_ORDERED:
+        if (
+            issubclass(cls, base)
+            and cls.__lt__ is base.__lt__
+            and cls.__eq__ is base.__eq__
+        ):
+            return base
+    return None
+
+
+class AdaptiveChain(Chain[K, V]):
+    """
+    A chain which starts out as a `DynamicArray` and turns itself into an
+    `AVLTree` once it holds more than `treeify_threshold` items, as long as
+    their keys are all ints, floats, strings or bytes of the same kind. It
+    turns back into a `DynamicArray` when it shrinks to `untreeify_threshold`
+    items.
+    """
+
+    treeify_threshold = 8
+    untreeify_threshold = 6
+
+    def __init__(self) -> None:
+        self.chain: DynamicArray[K, V] | AVLTree[Any, V] = DynamicArray()
+        # The type the keys of the tree are ordered as.
+        self._key_type: type | None = None
+        # Set once the keys turned out not to be totally ordered, so that the
+        # chain doesn't check them again on every insert.
+        self._unorderable = False
+
+    def __len__(self) -> int:
+        return len(self.chain)
+
+    def __iter__(self) -> Iterator[HashEntry[K, V]]:
+        return iter(self.chain)
+
+    def find(self, key: K, hash_: int) -> HashEntry[K, V]:
+        if isinstance(self.chain, AVLTree) and not self._fits_tree(key):
+            # `key` isn't ordered like the keys of the tree, but it may still
+            # be equal to one of them.
+            for e in self.chain:
+                if hash_ == e.hash_value and is_same(e.key, key):
+                    return e
+            raise KeyError(repr(key))
+        return self.chain.find(key, hash_)
+
+    def search_path(self, key: K, hash_: int) -> Iterator[HashEntry[K, V]]:
+        if isinstance(self.chain, AVLTree) and not self._fits_tree(key):
+            # Like `.find()`, scan every item instead.
+            path = []
+            for e in self.chain:
+                path.append(e)
+                if hash_ == e.hash_value and is_same(e.key, key):
+                    break
+            return iter(path)
+        return self.chain.search_path(key, hash_)
+
+    def insert(self, item: HashEntry[K, V]) -> None:
+        if isinstance(self.chain, AVLTree):
+            if self._fits_tree(item.key):
+                self.chain.insert(item)
+                return
+            self._unorderable = True
+            self._untreeify()
+        self.chain.insert(item)
+        if len(self.chain) > self.treeify_threshold:
+            self._treeify()
+
+    def delete(self, key: K, hash_: int) -> None:
+        if isinstance(self.chain, AVLTree):
+            if not self._fits_tree(key):
+                # An equal key of another type is only found by a scan.
+                self._untreeify()
+            else:
+                self.chain.delete(key, hash_)
+                if len(self.chain) <= self.untreeify_threshold:
+                    self._untreeify()
+                return
+        self.chain.delete(key, hash_)
+
+    def rebuild_order(self) -> Iterator[HashEntry[K, V]]:
+        return self.chain.rebuild_order()
+
+    def append_at_end(self, item: HashEntry[K, V]) -> None:
+        if isinstance(self.chain, AVLTree):
+            self.insert(item)
+            return
+        self.chain.append_at_end(item)
+        if len(self.chain) > self.treeify_threshold:
+            self._treeify()
+
+    def _fits_tree(self, key: K) -> bool:
+        # NaN is the only value of these types which isn't equal to itself,
+        # and it isn't ordered against anything.
+        return _total_order(type(key)) is self._key_type and key == key
+
+    def _treeify(self) -> None:
+        if self._unorderable:
+            return
+        self._key_type = _total_order(type(next(iter(self.chain)).key))
+        if self._key_type is None or not all(
+            self._fits_tree(item.key) for item in self.chain
+        ):
+            self._unorderable = True
+            return
+        tree: AVLTree[Any, V] = AVLTree()
+        for item in self.chain:
+            tree.append_at_end(item)
+        self.chain = tree
+
+    def _untreeify(self) -> None:
+        array: DynamicArray[K, V] = DynamicArray()
+        array.lst = list(self.chain)
+        self.chain = array
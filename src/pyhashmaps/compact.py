@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import ctypes
+from array import array
+from typing import TYPE_CHECKING, Any, cast
+
+from .base import HashEntry, K, V, is_same
+from .open_addressing import DELETED, EMPTY, NotExist, OpenAddressingHashMap
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+# Markers stored in the index table instead of a position in `_entries`.
+IX_EMPTY = -1
+IX_DELETED = -2
+
+
+def _index_typecode(size: int) -> str:
+    """
+    Return the typecode of the smallest signed array which can hold every
+    position of a table with `size` slots.
+    """
+    if size <= 1 << 7:
+        return "b"
+    if size <= 1 << 15:
+        return "h"
+    if size <= 1 << 31:
+        return "i" if array("i").itemsize == 4 else "l"
+    return "q"
+
+
+class CompactHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Open addressing in the layout of CPython's `dict`: the table only holds
+    small integers which point into a dense list of entries kept in insertion
+    order.
+
+    Iteration walks the entries instead of the table, so it neither depends
+    on the size of the table nor changes order when it's resized. A resize
+    only rebuilds the index table, whose item size is picked from its size.
+    Deleted entries leave a hole in `_entries`, counted in `_deleted`, until
+    the next resize.
+
+    Slots are probed at triangular-number offsets, so the size is a power of
+    two.
+    """
+
+    _supports_incremental_resize = False
+    _power_of_two_size = True
+    # `_indices` is pickled as it is.
+    _storage_attributes = ("_entries",)
+
+    @property
+    def slots(self) -> list[HashEntry[K, V] | NotExist]:  # type: ignore[override]
+        entries = self._entries
+        return [
+            EMPTY if ix == IX_EMPTY else DELETED if ix == IX_DELETED else entries[ix]
+            for ix in self._indices
+        ]
+
+    def __iter__(self) -> Iterator[K]:
+        for e in self._entries:
+            if e is not None:
+                yield e.key
+
+    def __reversed__(self) -> Iterator[K]:
+        for e in reversed(self._entries):
+            if e is not None:
+                yield e.key
+
+    def popitem(self) -> tuple[K, V]:
+        """Remove and return the item inserted last, like `dict.popitem()`."""
+        for e in reversed(self._entries):
+            if e is not None:
+                del self[e.key]
+                return e.key, e.value
+        raise KeyError("popitem(): hashmap is empty")
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        return cast(HashEntry[K, V], self._entries[self._indices[idx]]).value
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        indices, entries, size = self._indices, self._entries, self.size
+        idx, stride, increment = self._probe_params(hash_, size)
+        first_deleted = -1
+        while True:
+            ix = indices[idx]
+            if ix == IX_EMPTY:
+                break
+            if ix == IX_DELETED:
+                if first_deleted == -1:
+                    first_deleted = idx
+            else:
+                e = cast(HashEntry[K, V], entries[ix])
+                if hash_ == e.hash_value and is_same(e.key, key):
+                    e.value = value
+                    return
+            idx = (idx + stride) % size
+            stride += increment
+
+        if first_deleted != -1:
+            idx = first_deleted
+        # The hole the deleted entry left in `_entries` stays until the next
+        # resize, so `_deleted` doesn't go down.
+        indices[idx] = len(entries)
+        entries.append(HashEntry(hash_, key, value))
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        self._entries[self._indices[idx]] = None
+        self._indices[idx] = IX_DELETED
+        self._len -= 1
+        self._deleted += 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        indices_size = len(self._indices) * self._indices.itemsize
+        entries_size = len(self._entries) * (4 * pointer_size)
+        return object.__sizeof__(self) + indices_size + entries_size
+
+    def _init_storage(self) -> None:
+        self._indices = self._empty_indices(self.size)
+        self._entries: list[HashEntry[K, V] | None] = []
+
+    @staticmethod
+    def _empty_indices(size: int) -> array[int]:
+        return array(_index_typecode(size), [IX_EMPTY]) * size
+
+    def _snapshot(self) -> tuple[array[int], array[int], list[K], list[V]]:
+        """
+        Return the positions of the holes in `_entries`, followed by the
+        hashes, keys and values of the other entries.
+        """
+        holes: array[int] = array("q")
+        hashes: array[int] = array("q")
+        keys: list[K] = []
+        values: list[V] = []
+        for ix, e in enumerate(self._entries):
+            if e is None:
+                holes.append(ix)
+            else:
+                hashes.append(e.hash_value)
+                keys.append(e.key)
+                values.append(e.value)
+        return holes, hashes, keys, values
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        holes, hashes, keys, values = snapshot
+        is_hole = bytearray(len(hashes) + len(holes))
+        for ix in holes:
+            is_hole[ix] = 1
+        items = map(HashEntry, hashes, keys, values)
+        self._entries = [None if hole else next(items) for hole in is_hole]
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, 1, 1
+
+    def _find_index(self, key: K, hash_: int) -> int:
+        """Return the slot of the table which points to `key`, or -1."""
+        indices, entries, size = self._indices, self._entries, self.size
+        idx, stride, increment = self._probe_params(hash_, size)
+        while True:
+            ix = indices[idx]
+            if ix == IX_EMPTY:
+                return -1
+            if ix != IX_DELETED:
+                e = cast(HashEntry[K, V], entries[ix])
+                if hash_ == e.hash_value and is_same(e.key, key):
+                    return idx
+            idx = (idx + stride) % size
+            stride += increment
+
+    def _bucket_order(self, hashes: list[int]) -> list[int]:
+        # `set_many()` has to insert in the given order to keep it.
+        return list(range(len(hashes)))
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        # Reading `.slots` would build the whole table.
+        indices, entries, size = self._indices, self._entries, self.size
+        idx, stride, increment = self._probe_params(hash_, size)
+        probes = comparisons = 0
+        while True:
+            ix = indices[idx]
+            probes += 1
+            if ix == IX_EMPTY:
+                return probes, comparisons, False
+            if ix != IX_DELETED:
+                e = cast(HashEntry[K, V], entries[ix])
+                if hash_ == e.hash_value:
+                    comparisons += 1
+                    if is_same(e.key, key):
+                        return probes, comparisons, True
+            idx = (idx + stride) % size
+            stride += increment
+
+    def _rehash(self, new_size: int) -> None:
+        entries = [e for e in self._entries if e is not None]
+        indices = self._empty_indices(new_size)
+
+        for ix, e in enumerate(entries):
+            idx, stride, increment = self._probe_params(e.hash_value, new_size)
+            while indices[idx] != IX_EMPTY:
+                idx = (idx + stride) % new_size
+                stride += increment
+            indices[idx] = ix
+
+        self._indices, self._entries = indices, entries
+        self.size = new_size
+        self._deleted = 0
+
+    def _probing_sequence(
+        self, key: K, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        idx = hash_ % size
+        i = 1
+        while True:
+            yield idx
+            idx = (idx + i) % size
+            i += 1
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import ctypes
+import random
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any, cast
+
+from .base import HashEntry, HashMapArgument, K, V, is_same
+from .hashing import SplitMixHash
+from .open_addressing import EMPTY, NotExist, OpenAddressingHashMap
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+    from .hashing import HashStrategy
+
+BUCKET_SIZE = 4
+STASH_SIZE = 4
+# Number of evictions an insert may cause before the item it's left holding
+# goes to the stash.
+MAX_DISPLACEMENTS = 64
+
+# Number of sets of hash functions a rehash tries before it gives up on
+# keeping the stash within `STASH_SIZE`.
+_REHASH_ATTEMPTS = 4
+
+
+class CuckooHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Bucketized cuckoo hashing: every key may only live in one of `ways`
+    buckets of `BUCKET_SIZE` slots, picked by as many seeded hash functions,
+    or in a stash of at most `STASH_SIZE` items. A lookup never inspects more
+    than `ways * BUCKET_SIZE + STASH_SIZE` slots, whether it finds the key or
+    not.
+
+    When all the buckets of a new key are full, it takes the slot of a random
+    item in them, which then moves to one of its own buckets, and so on. After
+    `MAX_DISPLACEMENTS` evictions, the item left over goes to the stash. A full
+    stash makes the table rehash, with new hash functions if the current ones
+    can't place every item.
+
+    The hash functions are applied to the hash of the key, so rehashing never
+    calls `hash_strategy` again. Deletions leave no tombstones.
+    """
+
+    _supports_incremental_resize = False
+    _power_of_two_size = True
+    _storage_attributes = ("slots", "_old_slots", "_stash")
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        initial_size: int = 64,
+        resize_factor: float = 0.8,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        hash_strategy: HashStrategy | None = None,
+        ways: int = 2,
+    ) -> None:
+        if not (isinstance(ways, int) and ways >= 2):
+            raise ValueError("ways must be an integer greater than 1.")
+        self._ways = ways
+        self._hash_functions = self._new_hash_functions()
+        self._max_stash = STASH_SIZE
+        if isinstance(initial_size, int) and initial_size > 0:
+            initial_size = max(initial_size, BUCKET_SIZE)
+        super().__init__(
+            mapping_or_iterable,
+            initial_size=initial_size,
+            resize_factor=resize_factor,
+            shrink_factor=shrink_factor,
+            incremental_resize=incremental_resize,
+            hash_strategy=hash_strategy,
+        )
+
+    def __iter__(self) -> Iterator[K]:
+        for item in self.slots:
+            if isinstance(item, HashEntry):
+                yield item.key
+        for item in self._stash:
+            yield item.key
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._find_index(key, hash_)
+        if idx != -1:
+            return cast(HashEntry[K, V], self.slots[idx]).value
+        idx = self._find_in_stash(key, hash_)
+        if idx != -1:
+            return self._stash[idx].value
+        raise KeyError(repr(key))
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        idx = self._find_index(key, hash_)
+        if idx != -1:
+            cast(HashEntry[K, V], self.slots[idx]).value = value
+            return
+        idx = self._find_in_stash(key, hash_)
+        if idx != -1:
+            self._stash[idx].value = value
+            return
+
+        homeless = self._displace(self.slots, self.size, HashEntry(hash_, key, value))
+        if homeless is not None:
+            self._stash.append(homeless)
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+        elif len(self._stash) > self._max_stash:
+            self._resize(self.size)
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._find_index(key, hash_)
+        if idx != -1:
+            self.slots[idx] = EMPTY
+            if self._stash:
+                self._drain_stash()
+        else:
+            idx = self._find_in_stash(key, hash_)
+            if idx == -1:
+                raise KeyError(repr(key))
+            del self._stash[idx]
+
+        self._len -= 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        return super().__sizeof__() + len(self._stash) * (3 * pointer_size)
+
+    def _init_storage(self) -> None:
+        super()._init_storage()
+        self._stash: list[HashEntry[K, V]] = []
+
+    def _new_hash_functions(self) -> list[SplitMixHash]:
+        return [SplitMixHash() for _ in range(self._ways)]
+
+    def _buckets(self, hash_: int, size: int) -> list[int]:
+        """Return the first slot of every bucket `hash_` may be stored in."""
+        n_buckets = size // BUCKET_SIZE
+        return [h(hash_) % n_buckets * BUCKET_SIZE for h in self._hash_functions]
+
+    def _find_index(self, key: K, hash_: int) -> int:
+        slots = self.slots
+        for start in self._buckets(hash_, self.size):
+            for idx in range(start, start + BUCKET_SIZE):
+                slot = slots[idx]
+                if (
+                    isinstance(slot, HashEntry)
+                    and hash_ == slot.hash_value
+                    and is_same(slot.key, key)
+                ):
+                    return idx
+        return -1
+
+    def _find_in_stash(self, key: K, hash_: int) -> int:
+        for idx, item in enumerate(self._stash):
+            if hash_ == item.hash_value and is_same(item.key, key):
+                return idx
+        return -1
+
+    @staticmethod
+    def _free_slot(slots: list[HashEntry[K, V] | NotExist], buckets: list[int]) -> int:
+        for start in buckets:
+            for idx in range(start, start + BUCKET_SIZE):
+                if slots[idx] is EMPTY:
+                    return idx
+        return -1
+
+    def _displace(
+        self, slots: list[HashEntry[K, V] | NotExist], size: int, item: HashEntry[K, V]
+    ) -> HashEntry[K, V] | None:
+        """
+        Put `item` in `slots`, evicting other items if its buckets are full.
+
+        Return the item left without a slot after `MAX_DISPLACEMENTS`
+        evictions, or None if everything found a place.
+        """
+        for _ in range(MAX_DISPLACEMENTS):
+            buckets = self._buckets(item.hash_value, size)
+            idx = self._free_slot(slots, buckets)
+            if idx != -1:
+                slots[idx] = item
+                return None
+            idx = random.choice(buckets) + random.randrange(BUCKET_SIZE)
+            slots[idx], item = item, cast(HashEntry[K, V], slots[idx])
+        return item
+
+    def _drain_stash(self) -> None:
+        """Move the stashed items whose buckets have a free slot into the table."""
+        slots, stash = self.slots, self._stash
+        for i in reversed(range(len(stash))):
+            idx = self._free_slot(slots, self._buckets(stash[i].hash_value, self.size))
+            if idx != -1:
+                slots[idx] = stash.pop(i)
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        probes = comparisons = 0
+        sequence = self._probing_sequence(key, hash_, self.size)
+        candidates = [self.slots[idx] for idx in sequence]
+        for slot in [*candidates, *self._stash]:
+            probes += 1
+            if isinstance(slot, HashEntry) and hash_ == slot.hash_value:
+                comparisons += 1
+                if is_same(slot.key, key):
+                    return probes, comparisons, True
+        return probes, comparisons, False
+
+    def _histograms(self) -> tuple[Counter[int], Counter[int]]:
+        probe_lengths, _ = super()._histograms()
+        # Stashed items are found after every slot of their buckets.
+        n_candidates = self._ways * BUCKET_SIZE
+        for i in range(len(self._stash)):
+            probe_lengths[n_candidates + i + 1] += 1
+        displacements = Counter({n - 1: c for n, c in probe_lengths.items()})
+        return probe_lengths, displacements
+
+    def _rehash(self, new_size: int) -> None:
+        items = [item for item in self.slots if isinstance(item, HashEntry)]
+        items += self._stash
+
+        for attempt in range(_REHASH_ATTEMPTS):
+            if attempt:
+                self._hash_functions = self._new_hash_functions()
+            slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * new_size
+            stash = []
+            for item in items:
+                homeless = self._displace(slots, new_size, item)
+                if homeless is not None:
+                    stash.append(homeless)
+            if len(stash) <= STASH_SIZE:
+                break
+
+        self.slots, self._stash = slots, stash
+        self.size = new_size
+        self._deleted = 0
+        # Only a hash strategy which gives many keys the same hash can leave
+        # more items in the stash; letting it grow keeps inserts cheap then.
+        self._max_stash = max(STASH_SIZE, 2 * len(stash))
+
+    def _probing_sequence(
+        self, key: K, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        for start in self._buckets(hash_, size):
+            yield from range(start, start + BUCKET_SIZE)
+
+    def _snapshot(self) -> tuple[Any, array[int], list[K], list[V]]:
+        """
+        Return the snapshot of the table, and the hashes, keys and values of
+        the stash.
+        """
+        stash = self._stash
+        return (
+            super()._snapshot(),
+            array("q", [item.hash_value for item in stash]),
+            [item.key for item in stash],
+            [item.value for item in stash],
+        )
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        table, hashes, keys, values = snapshot
+        super()._load_snapshot(table)
+        self._stash = list(map(HashEntry, hashes, keys, values))
@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, MutableMapping
+from typing import TYPE_CHECKING, Any, Union
+
+from .base import BaseHashMap, HashEntry, HashMapArgument, K, V, is_same
+from .hashing import _MASK64
+
+if TYPE_CHECKING:
+    from .hashing import HashStrategy
+
+# Every level of the trie consumes `BITS` bits of the hash, so a node has up
+# to 32 children and the trie is at most 13 levels deep for 64-bit hashes.
+BITS = 5
+_MASK = (1 << BITS) - 1
+
+
+class BitmapNode:
+    """
+    A node of the trie. Bit `i` of `bitmap` is set if the node has a child
+    for the `i`th value of the next `BITS` bits of the hash, and `array` holds
+    the children in the order of their bits. A child is either a `HashEntry`
+    or another node.
+
+    Nodes are never changed once they're shared by a `HAMTHashMap`. Only the
+    builder whose `owner` token created a node may change it in place.
+    """
+
+    __slots__ = ("bitmap", "array", "owner")
+
+    def __init__(self, bitmap: int, array: list[Any], owner: object | None) -> None:
+        self.bitmap = bitmap
+        self.array = array
+        self.owner = owner
+
+    def __iter__(self) -> Iterator[HashEntry[Any, Any]]:
+        for child in self.array:
+            if isinstance(child, HashEntry):
+                yield child
+            else:
+                yield from child
+
+    def find(self, hash_: int, shift: int, key: Any) -> HashEntry[Any, Any] | None:
+        node: Node = self
+        while isinstance(node, BitmapNode):
+            bit = 1 << ((hash_ >> shift) & _MASK)
+            if not node.bitmap & bit:
+                return None
+            child = node.array[(node.bitmap & (bit - 1)).bit_count()]
+            if isinstance(child, HashEntry):
+                if child.hash_value == hash_ and is_same(child.key, key):
+                    return child
+                return None
+            node, shift = child, shift + BITS
+        return node.find(hash_, shift, key)
+
+    def assoc(
+        self, owner: object | None, shift: int, entry: HashEntry[Any, Any]
+    ) -> tuple[Node, bool]:
+        """
+        Return the node with `entry` set, and whether its key is new. The
+        node is changed in place if `owner` owns it, and copied otherwise.
+        """
+        bit = 1 << ((entry.hash_value >> shift) & _MASK)
+        idx = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            node = self._editable(owner)
+            node.array.insert(idx, entry)
+            node.bitmap |= bit
+            return node, True
+
+        child = self.array[idx]
+        if isinstance(child, HashEntry):
+            if child.hash_value == entry.hash_value and is_same(child.key, entry.key):
+                if child.value is entry.value:
+                    return self, False
+                # Like a dict, keep the key which was set first.
+                new_child: Any = HashEntry(child.hash_value, child.key, entry.value)
+                added = False
+            else:
+                new_child = _merge(owner, shift + BITS, child, entry)
+                added = True
+        else:
+            new_child, added = child.assoc(owner, shift + BITS, entry)
+            if new_child is child:
+                return self, added
+
+        node = self._editable(owner)
+        node.array[idx] = new_child
+        return node, added
+
+    def without(
+        self, owner: object | None, shift: int, hash_: int, key: Any
+    ) -> Node | HashEntry[Any, Any] | None:
+        """
+        Return the node without `key`, or its only entry left, or None if it's
+        empty. Raise `KeyError` if `key` isn't there.
+        """
+        bit = 1 << ((hash_ >> shift) & _MASK)
+        if not self.bitmap & bit:
+            raise KeyError(repr(key))
+        idx = (self.bitmap & (bit - 1)).bit_count()
+        child = self.array[idx]
+        if isinstance(child, HashEntry):
+            if not (child.hash_value == hash_ and is_same(child.key, key)):
+                raise KeyError(repr(key))
+            new_child = None
+        else:
+            new_child = child.without(owner, shift + BITS, hash_, key)
+            if new_child is child:
+                return self
+
+        if new_child is None:
+            if len(self.array) == 1:
+                return None
+            if len(self.array) == 2 and isinstance(self.array[1 - idx], HashEntry):
+                # Entries move up to their parent, so that the trie has no
+                # node holding a single entry.
+                return self.array[1 - idx]
+            node = self._editable(owner)
+            del node.array[idx]
+            node.bitmap ^= bit
+            return node
+        if isinstance(new_child, HashEntry) and len(self.array) == 1:
+            return new_child
+        node = self._editable(owner)
+        node.array[idx] = new_child
+        return node
+
+    def _editable(self, owner: object | None) -> BitmapNode:
+        if owner is not None and self.owner is owner:
+            return self
+        return BitmapNode(self.bitmap, self.array.copy(), owner)
+
+
+class CollisionNode:
+    """The entries of the keys which have the same 64-bit hash."""
+
+    __slots__ = ("hash_value", "entries", "owner")
+
+    def __init__(
+        self, hash_value: int, entries: list[HashEntry[Any, Any]], owner: object | None
+    ) -> None:
+        self.hash_value = hash_value
+        self.entries = entries
+        self.owner = owner
+
+    def __iter__(self) -> Iterator[HashEntry[Any, Any]]:
+        return iter(self.entries)
+
+    def find(self, hash_: int, shift: int, key: Any) -> HashEntry[Any, Any] | None:
+        if hash_ == self.hash_value:
+            for entry in self.entries:
+                if is_same(entry.key, key):
+                    return entry
+        return None
+
+    def assoc(
+        self, owner: object | None, shift: int, entry: HashEntry[Any, Any]
+    ) -> tuple[Node, bool]:
+        if entry.hash_value != self.hash_value:
+            # The new key goes next to this node, one level further down.
+            bit = 1 << ((self.hash_value >> shift) & _MASK)
+            return BitmapNode(bit, [self], owner).assoc(owner, shift, entry)
+
+        for i, old in enumerate(self.entries):
+            if is_same(old.key, entry.key):
+                if old.value is entry.value:
+                    return self, False
+                node = self._editable(owner)
+                node.entries[i] = HashEntry(old.hash_value, old.key, entry.value)
+                return node, False
+        node = self._editable(owner)
+        node.entries.append(entry)
+        return node, True
+
+    def without(
+        self, owner: object | None, shift: int, hash_: int, key: Any
+    ) -> Node | HashEntry[Any, Any] | None:
+        if hash_ != self.hash_value:
+            raise KeyError(repr(key))
+        for i, entry in enumerate(self.entries):
+            if is_same(entry.key, key):
+                break
+        else:
+            raise KeyError(repr(key))
+        if len(self.entries) == 2:
+            return self.entries[1 - i]
+        node = self._editable(owner)
+        del node.entries[i]
+        return node
+
+    def _editable(self, owner: object | None) -> CollisionNode:
+        if owner is not None and self.owner is owner:
+            return self
+        return CollisionNode(self.hash_value, self.entries.copy(), owner)
+
+
+Node = Union[BitmapNode, CollisionNode]
+
+
+def _merge(
+    owner: object | None,
+    shift: int,
+    entry1: HashEntry[Any, Any],
+    entry2: HashEntry[Any, Any],
+) -> Node:
+    """Return the smallest subtrie holding two entries with different keys."""
+    if entry1.hash_value == entry2.hash_value:
+        return CollisionNode(entry1.hash_value, [entry1, entry2], owner)
+    frag1 = (entry1.hash_value >> shift) & _MASK
+    frag2 = (entry2.hash_value >> shift) & _MASK
+    if frag1 == frag2:
+        child = _merge(owner, shift + BITS, entry1, entry2)
+        return BitmapNode(1 << frag1, [child], owner)
+    array = [entry1, entry2] if frag1 < frag2 else [entry2, entry1]
+    return BitmapNode((1 << frag1) | (1 << frag2), array, owner)
+
+
+def _as_root(owner: object | None, result: Node | HashEntry[Any, Any] | None) -> Node:
+    """Turn what `without()` returned for the root back into a node."""
+    if result is None:
+        return BitmapNode(0, [], owner)
+    if isinstance(result, HashEntry):
+        return BitmapNode(1 << (result.hash_value & _MASK), [result], owner)
+    return result
+
+
+class _Trie:
+    """The lookups shared by `HAMTHashMap` and `HAMTBuilder`."""
+
+    hash_strategy: HashStrategy
+    _root: Node
+    _len: int
+
+    _hash_func = BaseHashMap._hash_func
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        items = ", ".join(f"{k!r}: {v!r}" for k, v in self.items())  # type: ignore
+        return f"{class_name}({{{items}}})"
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for entry in self._root:
+            yield entry.key
+
+    def __getitem__(self, key: Any) -> Any:
+        entry = self._root.find(self._hash(key), 0, key)
+        if entry is None:
+            raise KeyError(repr(key))
+        return entry.value
+
+    def _hash(self, key: Any) -> int:
+        # The trie branches on 64 bits of the hash.
+        return self._hash_func(key) & _MASK64
+
+
+class HAMTHashMap(_Trie, Mapping[K, V]):
+    """
+    An immutable hashmap stored as a hash array mapped trie.
+
+    `set()`, `delete()` and `update()` return a new hashmap, which shares
+    every node with the old one except the O(log n) nodes on the paths to
+    the keys they changed. Copying a `HAMTHashMap` is free: a snapshot is the
+    hashmap itself.
+
+    `builder()` returns a mutable `HAMTBuilder` for batches of changes, which
+    changes the nodes it created in place instead of copying them on every
+    write. `build()` then returns the result as a `HAMTHashMap`.
+    """
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        hash_strategy: HashStrategy | None = None,
+    ) -> None:
+        if hash_strategy is None:
+            hash_strategy = hash
+        self.hash_strategy = hash_strategy
+        self._root = BitmapNode(0, [], None)
+        self._len = 0
+        if mapping_or_iterable is not None:
+            built = self.update(mapping_or_iterable)
+            self._root, self._len = built._root, built._len
+
+    def __copy__(self) -> HAMTHashMap[K, V]:
+        return self
+
+    def set(self, key: K, value: V) -> HAMTHashMap[K, V]:
+        """Return a hashmap with `key` set to `value`."""
+        root, added = self._root.assoc(None, 0, HashEntry(self._hash(key), key, value))
+        if root is self._root:
+            return self
+        return self._with_root(root, self._len + added)
+
+    def delete(self, key: K) -> HAMTHashMap[K, V]:
+        """Return a hashmap without `key`. Raise `KeyError` if it's missing."""
+        result = self._root.without(None, 0, self._hash(key), key)
+        return self._with_root(_as_root(None, result), self._len - 1)
+
+    def update(self, mapping_or_iterable: HashMapArgument[K, V]) -> HAMTHashMap[K, V]:
+        """Return a hashmap with the items of `mapping_or_iterable` set."""
+        builder = self.builder()
+        builder.update(mapping_or_iterable)
+        return builder.build()
+
+    def builder(self) -> HAMTBuilder[K, V]:
+        """Return a mutable builder which starts from this hashmap."""
+        return HAMTBuilder(self)
+
+    def _with_root(self, root: Node, length: int) -> HAMTHashMap[K, V]:
+        hashmap = object.__new__(type(self))
+        hashmap.hash_strategy = self.hash_strategy
+        hashmap._root = root
+        hashmap._len = length
+        return hashmap
+
+
+class HAMTBuilder(_Trie, MutableMapping[K, V]):
+    """
+    A mutable copy of a `HAMTHashMap`, which never changes the hashmap.
+
+    The first write to a node shared with a hashmap copies it, like
+    `HAMTHashMap.set()` does, but the copy is owned by the builder and later
+    writes change it in place. `build()` hands the nodes over to a new
+    `HAMTHashMap` and takes a new owner token, so that the builder can go on
+    without changing the hashmap it built.
+    """
+
+    def __init__(self, hashmap: HAMTHashMap[K, V]) -> None:
+        self.hash_strategy = hashmap.hash_strategy
+        self._hashmap = hashmap
+        self._root = hashmap._root
+        self._len = hashmap._len
+        self._owner = object()
+
+    def __setitem__(self, key: K, value: V) -> None:
+        entry = HashEntry(self._hash(key), key, value)
+        self._root, added = self._root.assoc(self._owner, 0, entry)
+        self._len += added
+
+    def __delitem__(self, key: K) -> None:
+        result = self._root.without(self._owner, 0, self._hash(key), key)
+        self._root = _as_root(self._owner, result)
+        self._len -= 1
+
+    def build(self) -> HAMTHashMap[K, V]:
+        """Return a `HAMTHashMap` holding the items of the builder."""
+        self._owner = object()
+        if self._root is not self._hashmap._root:
+            self._hashmap = self._hashmap._with_root(self._root, self._len)
+        return self._hashmap
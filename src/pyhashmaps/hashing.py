@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+from collections.abc import Hashable
+from typing import Protocol
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_RATIO = 0x9E3779B97F4A7C15
+
+
+class HashStrategy(Protocol):
+    """
+    A protocol for the callables which turn keys into hash values.
+
+    The built-in `hash()` satisfies it and is what every hashmap uses by
+    default. Hash values have to fit in a signed 64-bit integer.
+    """
+
+    def __call__(self, key: Hashable, /) -> int:
+        ...
+
+
+class SeededHash:
+    """
+    Base class for strategies which mix the result of `hash()` with a seed.
+
+    Without an explicit `seed`, every instance draws a random one, so the
+    bucket of a key can't be predicted from outside the process.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self.seed = secrets.randbits(64) if seed is None else seed & _MASK64
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(seed={self.seed})"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SeededHash):
+            return type(self) is type(other) and self.seed == other.seed
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((type(self), self.seed))
+
+    def __call__(self, key: Hashable, /) -> int:
+        # Dropping the lowest bit keeps the result a non-negative signed
+        # 64-bit integer.
+        return self._mix(hash(key) ^ self.seed) >> 1
+
+    def _mix(self, x: int) -> int:
+        raise NotImplementedError
+
+
+class FibonacciHash(SeededHash):
+    """
+    Multiplicative hashing by 2**64 divided by the golden ratio.
+
+    The low bits of a product only depend on the low bits of its factors, so
+    the high half is folded back in; otherwise keys sharing their low bits
+    would still share a bucket.
+    """
+
+    def _mix(self, x: int) -> int:
+        x = (x * _GOLDEN_RATIO) & _MASK64
+        return x ^ (x >> 32)
+
+
+class SplitMixHash(SeededHash):
+    """
+    The xorshift-multiply finalizer of SplitMix64. Every bit of the input
+    affects every bit of the output.
+    """
+
+    def _mix(self, x: int) -> int:
+        x &= _MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+        return x ^ (x >> 31)
+
+
+class KeyedHash(SplitMixHash):
+    """
+    Hashes `bytes` and `str` keys with keyed BLAKE2b, and other keys like
+    `SplitMixHash` does.
+
+    It's much slower than the other strategies, but an attacker who doesn't
+    know the seed can't craft colliding `str`/`bytes` keys, whatever the
+    interpreter's own hash randomization is set to.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        super().__init__(seed)
+        self._key = self.seed.to_bytes(8, "little")
+
+    def __call__(self, key: Hashable, /) -> int:
+        # The prefixes keep `"a"` and `b"a"` apart.
+        if isinstance(key, str):
+            data = b"s" + key.encode("utf-8", "surrogatepass")
+        elif isinstance(key, bytes):
+            data = b"b" + key
+        else:
+            return super().__call__(key)
+        digest = hashlib.blake2b(data, digest_size=8, key=self._key).digest()
+        return int.from_bytes(digest, "little") >> 1
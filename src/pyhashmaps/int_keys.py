@@ -0,0 +1,397 @@
+from __future__ import annotations
+
+import operator
+import sys
+from array import array
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, cast
+
+from .base import HashEntry, V
+from .open_addressing import DELETED, EMPTY, NotExist, OpenAddressingHashMap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterator
+
+# The two smallest 64-bit integers mark empty and deleted slots. Keys which
+# happen to be equal to them, or don't fit in 64 bits, are kept in `_specials`
+# instead.
+EMPTY_KEY = -(1 << 63)
+DELETED_KEY = EMPTY_KEY + 1
+MAX_KEY = (1 << 63) - 1
+
+_NUMPY_DTYPES = {"q": "int64", "d": "float64"}
+
+
+class IntKeyHashMap(OpenAddressingHashMap[int, V]):
+    """
+    Linear probing for integer keys which fit in 64 bits, kept in an
+    `array('q')` instead of `HashEntry` objects. There are no hashes to store
+    since they're computed from the keys again when the table is resized.
+
+    Keys come back as plain `int`s, even when they're given as NumPy
+    integers. Keys which aren't integers raise `TypeError` when they're
+    inserted and are never found. The few integers
+    which can't be stored in the table go to a small `dict` on the side.
+
+    When NumPy is installed, `get_many()`, `contains_many()` and `set_many()`
+    probe NumPy integer arrays for all keys at once.
+    """
+
+    _supports_incremental_resize = False
+    # The arrays are pickled as they are.
+    _storage_attributes = ()
+
+    # Typecode of the `array` holding the values, or None for a list.
+    _value_typecode: str | None = None
+
+    @property
+    def slots(self) -> list[HashEntry[int, V] | NotExist]:  # type: ignore[override]
+        hash_func = self.hash_strategy
+        return [
+            EMPTY
+            if k == EMPTY_KEY
+            else DELETED
+            if k == DELETED_KEY
+            else HashEntry(hash_func(k), k, v)
+            for k, v in zip(self._keys, self._values)
+        ]
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._specials
+        for k in self._keys:
+            if k > DELETED_KEY:
+                yield k
+
+    def _get_hashed(self, key: int, hash_: int) -> V:
+        if not isinstance(key, int):
+            try:
+                key = operator.index(key)
+            except TypeError:
+                raise KeyError(repr(key)) from None
+            hash_ = self._hash_func(key)
+        if DELETED_KEY < key <= MAX_KEY:
+            idx = self._find_index(key, hash_)
+            if idx != -1:
+                return cast(V, self._values[idx])
+        elif key in self._specials:
+            return self._specials[key]
+        raise KeyError(repr(key))
+
+    def _set_hashed(self, key: int, hash_: int, value: V) -> None:
+        if not isinstance(key, int):
+            try:
+                key = operator.index(key)
+            except TypeError:
+                raise TypeError(
+                    f"{self.__class__.__name__} keys must be integers, "
+                    f"not {type(key).__name__!r}."
+                ) from None
+            hash_ = self._hash_func(key)
+        if not DELETED_KEY < key <= MAX_KEY:
+            if key not in self._specials:
+                self._len += 1
+            self._specials[key] = value
+            return
+
+        keys, size = self._keys, self.size
+        idx = hash_ % size
+        first_deleted = -1
+        while True:
+            k = keys[idx]
+            if k == key:
+                self._values[idx] = value
+                return
+            if k == EMPTY_KEY:
+                break
+            if k == DELETED_KEY and first_deleted == -1:
+                first_deleted = idx
+            idx = (idx + 1) % size
+
+        if first_deleted != -1:
+            idx = first_deleted
+        # The value goes first: if either store fails, the slot is still free.
+        self._values[idx] = value
+        keys[idx] = key
+        if first_deleted != -1:
+            self._deleted -= 1
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: int, hash_: int) -> None:
+        if not isinstance(key, int):
+            try:
+                key = operator.index(key)
+            except TypeError:
+                raise KeyError(repr(key)) from None
+            hash_ = self._hash_func(key)
+        if not DELETED_KEY < key <= MAX_KEY:
+            if key not in self._specials:
+                raise KeyError(repr(key))
+            del self._specials[key]
+            self._len -= 1
+            return
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        self._keys[idx] = DELETED_KEY
+        if self._value_typecode is None:
+            self._values[idx] = None
+        self._len -= 1
+        self._deleted += 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def get_many(self, keys: Iterable[int], default: V | None = None) -> list[V | None]:
+        array_ = self._as_int64(keys)
+        if array_ is None:
+            return super().get_many(self._as_ints(keys), default)
+        positions = self._lookup_array(array_)
+        found = positions >= 0
+        if self._value_typecode is None:
+            values = self._values
+            return [values[p] if p >= 0 else default for p in positions.tolist()]
+        result = self._values_array()[np.where(found, positions, 0)].tolist()
+        for i in np.flatnonzero(~found).tolist():
+            result[i] = default
+        return result
+
+    def contains_many(self, keys: Iterable[int]) -> list[bool]:
+        array_ = self._as_int64(keys)
+        if array_ is None:
+            return super().contains_many(self._as_ints(keys))
+        return cast(list[bool], (self._lookup_array(array_) >= 0).tolist())
+
+    def set_many(self, keys: Iterable[int], values: Iterable[V]) -> None:
+        array_ = self._as_int64(keys)
+        if array_ is None:
+            super().set_many(self._as_ints(keys), values)
+            return
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        if len(array_) != len(values):
+            raise ValueError("keys and values must have the same length.")
+        if self._value_typecode is not None:
+            values = self._to_value_dtype(values)
+
+        # Keep the last occurrence of every key, so that its last value wins.
+        _, reversed_idx = np.unique(array_[::-1], return_index=True)
+        last = len(array_) - 1 - reversed_idx
+        array_ = array_[last]
+        if isinstance(values, np.ndarray):
+            values = values[last]
+        else:
+            values = [values[i] for i in last.tolist()]
+
+        n = self._len + len(array_)
+        self.reserve(n)
+        # The new keys can only go to EMPTY slots here, so the tombstones must
+        # leave enough of them.
+        if n + self._deleted >= self.size * self.resize_factor:
+            self.compact()
+
+        positions = self._lookup_array(array_)
+        new = positions < 0
+        new_positions = self._claim_slots(array_[new])
+        self._len += len(new_positions)
+        if isinstance(values, np.ndarray):
+            self._store_values(positions[~new], values[~new])
+            self._store_values(new_positions, values[new])
+        else:
+            mask = new.tolist()
+            self._store_values(
+                positions[~new], [v for v, m in zip(values, mask) if not m]
+            )
+            self._store_values(new_positions, [v for v, m in zip(values, mask) if m])
+
+    def __sizeof__(self) -> int:
+        items_size = len(self._keys) * self._keys.itemsize
+        if isinstance(self._values, array):
+            items_size += len(self._values) * self._values.itemsize
+        else:
+            items_size += len(self._values) * sys.getsizeof(None)
+        return object.__sizeof__(self) + items_size
+
+    def _init_storage(self) -> None:
+        self._keys, self._values = self._empty_arrays(self.size)
+        self._specials: dict[int, V] = {}
+
+    def _empty_arrays(self, size: int) -> tuple[array[int], Any]:
+        keys = array("q", [EMPTY_KEY]) * size
+        if self._value_typecode is None:
+            return keys, [None] * size
+        return keys, array(self._value_typecode, bytes(8 * size))
+
+    def _find_index(self, key: int, hash_: int) -> int:
+        keys, size = self._keys, self.size
+        idx = hash_ % size
+        while True:
+            k = keys[idx]
+            if k == key:
+                return idx
+            if k == EMPTY_KEY:
+                return -1
+            idx = (idx + 1) % size
+
+    def _trace(self, key: int, hash_: int) -> tuple[int, int, bool]:
+        if not (isinstance(key, int) and DELETED_KEY < key <= MAX_KEY):
+            return 0, 0, key in self._specials
+        keys, size = self._keys, self.size
+        idx = hash_ % size
+        probes = 0
+        while True:
+            k = keys[idx]
+            probes += 1
+            if k == key:
+                return probes, 1, True
+            if k == EMPTY_KEY:
+                return probes, 0, False
+            idx = (idx + 1) % size
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, 1, 0
+
+    def _rehash(self, new_size: int) -> None:
+        new_keys, new_values = self._empty_arrays(new_size)
+        hash_func = self.hash_strategy
+
+        for k, v in zip(self._keys, self._values):
+            if k <= DELETED_KEY:
+                continue
+            idx = hash_func(k) % new_size
+            while new_keys[idx] != EMPTY_KEY:
+                idx = (idx + 1) % new_size
+            new_keys[idx] = k
+            new_values[idx] = v
+
+        self._keys, self._values = new_keys, new_values
+        self.size = new_size
+        self._deleted = 0
+
+    def _probing_sequence(
+        self, key: int, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        idx = hash_ % size
+        while True:
+            yield idx
+            idx = (idx + 1) % size
+
+    # Helpers of the NumPy code paths.
+
+    def _as_int64(self, keys: Iterable[int]) -> Any:
+        """
+        Return `keys` as an int64 NumPy array if the bulk operations can probe
+        them all at once, otherwise None.
+
+        That's the case for integer arrays whose hashes are the keys
+        themselves and which hold no sentinel.
+        """
+        if not (
+            np is not None
+            and isinstance(keys, np.ndarray)
+            and keys.dtype.kind in "iu"
+            and self.hash_strategy is hash
+        ):
+            return None
+        if keys.size:
+            # Below the modulus of `sys.hash_info`, `hash()` of an integer is
+            # the integer itself, except -1.
+            modulus = sys.hash_info.modulus
+            if keys.max() >= modulus or keys.min() <= max(-modulus, DELETED_KEY):
+                return None
+        return keys.astype(np.int64).ravel()
+
+    def _as_ints(self, keys: Iterable[int]) -> Iterable[int]:
+        """
+        Turn a NumPy array which the bulk operations can't probe at once into
+        a list of Python scalars for the generic implementation.
+        """
+        if np is not None and isinstance(keys, np.ndarray):
+            return cast(list[int], keys.ravel().tolist())
+        return keys
+
+    def _homes(self, keys: Any) -> Any:
+        hashes = keys.copy()
+        hashes[hashes == -1] = -2
+        return hashes % self.size
+
+    def _lookup_array(self, keys: Any) -> Any:
+        """Return the slot of every key in `keys`, or -1 for missing ones."""
+        table = np.frombuffer(self._keys, dtype=np.int64)
+        size = self.size
+        positions = self._homes(keys)
+        result = np.full(len(keys), -1, dtype=np.int64)
+        active = np.arange(len(keys))
+        while active.size:
+            current = positions[active]
+            found = table[current]
+            hit = found == keys[active]
+            result[active[hit]] = current[hit]
+            active = active[~(hit | (found == EMPTY_KEY))]
+            positions[active] = (positions[active] + 1) % size
+        return result
+
+    def _claim_slots(self, keys: Any) -> Any:
+        """
+        Write `keys`, none of which is in the table, into EMPTY slots and
+        return their positions.
+
+        Every round, each key looks at the next slot of its probe sequence. If
+        several keys look at the same EMPTY slot, the first one takes it and
+        the others move on.
+        """
+        table = np.frombuffer(self._keys, dtype=np.int64)
+        size = self.size
+        positions = self._homes(keys)
+        result = np.empty(len(keys), dtype=np.int64)
+        active = np.arange(len(keys))
+        while active.size:
+            current = positions[active]
+            free = table[current] == EMPTY_KEY
+            slots, first = np.unique(current[free], return_index=True)
+            winners = active[free][first]
+            table[slots] = keys[winners]
+            result[winners] = slots
+            claimed = np.zeros(len(keys), dtype=bool)
+            claimed[winners] = True
+            active = active[~claimed[active]]
+            positions[active] = (positions[active] + 1) % size
+        return result
+
+    def _values_array(self) -> Any:
+        return np.frombuffer(
+            self._values, dtype=_NUMPY_DTYPES[cast(str, self._value_typecode)]
+        )
+
+    def _to_value_dtype(self, values: Any) -> Any:
+        dtype = np.dtype(_NUMPY_DTYPES[cast(str, self._value_typecode)])
+        values = np.asarray(values)
+        if not np.can_cast(values.dtype, dtype, "same_kind"):
+            raise TypeError(f"values must be convertible to {dtype.name}.")
+        return values.astype(dtype)
+
+    def _store_values(self, positions: Any, values: Any) -> None:
+        if self._value_typecode is not None:
+            self._values_array()[positions] = values
+            return
+        slots = self._values
+        for p, v in zip(positions.tolist(), values):
+            slots[p] = v
+
+
+class IntIntHashMap(IntKeyHashMap[int]):
+    """An `IntKeyHashMap` whose values are 64-bit integers in an `array('q')`."""
+
+    _value_typecode = "q"
+
+
+class IntFloatHashMap(IntKeyHashMap[float]):
+    """An `IntKeyHashMap` whose values are floats in an `array('d')`."""
+
+    _value_typecode = "d"
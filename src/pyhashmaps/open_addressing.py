@@ -1,15 +1,20 @@
 from __future__ import annotations
 
 import ctypes
+import math
 from abc import abstractmethod
+from array import array
+from collections import Counter
 from enum import Enum
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, cast
 
 from .base import BaseHashMap, HashEntry, HashMapArgument, K, V, is_same
 
 if TYPE_CHECKING:
     from collections.abc import Generator, Iterator
 
+    from .hashing import HashStrategy
+
 
 class NotExist(Enum):
     empty = 0
@@ -26,6 +31,20 @@ DELETED = NotExist.deleted
 
 
 class OpenAddressingHashMap(BaseHashMap[K, V]):
+    # Whether the class keeps its items in `slots` and can therefore spread
+    # a resize over several operations.
+    _supports_incremental_resize = True
+
+    # Number of old slots migrated by every insert or delete while an
+    # incremental resize is in progress.
+    _rehash_step = 16
+
+    # Whether the size of the table is rounded up to a power of two, which
+    # some probing strategies need to reach every slot.
+    _power_of_two_size = False
+
+    _storage_attributes = ("slots", "_old_slots")
+
     def __init__(
         self,
         mapping_or_iterable: HashMapArgument[K, V] | None = None,
@@ -33,102 +52,404 @@ class OpenAddressingHashMap(BaseHashMap[K, V]):
         *,
         initial_size: int = 64,
         resize_factor: float = 0.7,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        hash_strategy: HashStrategy | None = None,
     ) -> None:
-        super().__init__(initial_size)
+        super().__init__(initial_size, hash_strategy)
+        if self._power_of_two_size:
+            # Growing and shrinking only ever double or halve the size, and
+            # never go below `_min_size`, so it stays a power of two.
+            self.size = self._min_size = 1 << (initial_size - 1).bit_length()
 
         if not 0.0 < resize_factor < 1.0:
             raise ValueError("resize_factor must be between 0 and 1.")
+        # Halving the table doubles its load factor, so it has to stay below
+        # `resize_factor` afterwards or the next insert would grow it back.
+        if shrink_factor is None:
+            shrink_factor = min(0.1, resize_factor / 4)
+        elif not 0.0 <= shrink_factor < resize_factor / 2:
+            raise ValueError("shrink_factor must be between 0 and resize_factor / 2.")
+        if incremental_resize and not self._supports_incremental_resize:
+            raise ValueError(
+                f"{self.__class__.__name__} doesn't support incremental resizing."
+            )
         self.resize_factor = resize_factor
-        self.slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * self.size
+        self.shrink_factor = shrink_factor
+        self.incremental_resize = incremental_resize
+        self._deleted = 0
+
+        # The table being drained while an incremental resize is in progress.
+        self._old_slots: list[HashEntry[K, V] | NotExist] | None = None
+        self._old_size = 0
+        self._rehash_idx = 0
+
+        self._init_storage()
         if mapping_or_iterable is not None:
             self.update(mapping_or_iterable)
 
     def __iter__(self) -> Iterator[K]:
+        if self._old_slots is not None:
+            for item in self._old_slots:
+                if isinstance(item, HashEntry):
+                    yield item.key
         for item in self.slots:
             if isinstance(item, HashEntry):
                 yield item.key
 
-    def __getitem__(self, key: K) -> V:
-        h = self._hash_func(key)
-        prob_sequence_gen = self._probing_sequence(key, h, self.size)
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._lookup(self.slots, self.size, key, hash_)
+        if idx != -1:
+            return cast(HashEntry[K, V], self.slots[idx]).value
+
+        if self._old_slots is not None:
+            idx = self._lookup(self._old_slots, self._old_size, key, hash_)
+            if idx != -1:
+                return cast(HashEntry[K, V], self._old_slots[idx]).value
+
+        raise KeyError(repr(key))
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        if self._old_slots is not None:
+            idx = self._lookup(self._old_slots, self._old_size, key, hash_)
+            if idx != -1:
+                cast(HashEntry[K, V], self._old_slots[idx]).value = value
+                return
+
+        found, idx = self._probe_insert(key, hash_)
+        if found:
+            cast(HashEntry[K, V], self.slots[idx]).value = value
+            return
+
+        if self.slots[idx] is DELETED:
+            self._deleted -= 1
+        self.slots[idx] = HashEntry(hash_, key, value)
+        self._len += 1
+
+        if self._old_slots is not None:
+            self._migrate(self._rehash_step)
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._lookup(self.slots, self.size, key, hash_)
+        if idx != -1:
+            self.slots[idx] = DELETED
+            self._deleted += 1
+        else:
+            if self._old_slots is not None:
+                idx = self._lookup(self._old_slots, self._old_size, key, hash_)
+            if idx == -1:
+                raise KeyError(repr(key))
+            # Tombstones of the old table are discarded along with it.
+            cast(list[HashEntry[K, V] | NotExist], self._old_slots)[idx] = DELETED
+
+        self._len -= 1
+        if self._old_slots is not None:
+            self._migrate(self._rehash_step)
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        instance_size = super().__sizeof__()
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        slots_count = len(self.slots) + len(self._old_slots or ())
+        items_size = slots_count * (3 * pointer_size)
+        return instance_size + items_size
+
+    def _init_storage(self) -> None:
+        """Allocate the empty table for the current `size`."""
+        self.slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * self.size
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int] | None:
+        """
+        Describe the probe sequence of `hash_` as `(start, stride, increment)`.
+
+        The sequence starts at `start`, every next index is the previous one
+        plus `stride` modulo `size`, and `stride` grows by `increment` after
+        every step. This lets the probing loops do plain index arithmetic.
+
+        Returning None makes them fall back to `_probing_sequence()`, so
+        subclasses with other kinds of sequences only have to implement that.
+        """
+        return None
+
+    def _lookup(
+        self, slots: list[HashEntry[K, V] | NotExist], size: int, key: K, hash_: int
+    ) -> int:
+        """Return the index of `key` in `slots`, or -1 if it's not there."""
+        params = self._probe_params(hash_, size)
+        if params is None:
+            return self._lookup_by_sequence(slots, size, key, hash_)
+
+        idx, stride, increment = params
         while True:
-            idx = next(prob_sequence_gen)
-            slot = self.slots[idx]
+            slot = slots[idx]
             if slot is EMPTY:
-                raise KeyError(repr(key))
+                return -1
             if (
                 isinstance(slot, HashEntry)
-                and h == slot.hash_value
+                and hash_ == slot.hash_value
                 and is_same(slot.key, key)
             ):
-                return slot.value
-
-    def __setitem__(self, key: K, value: V) -> None:
-        h = self._hash_func(key)
-        hash_entry = HashEntry(h, key, value)
-
-        prob_sequence_gen = self._probing_sequence(key, h, self.size)
-        while True:
-            idx = next(prob_sequence_gen)
-            slot = self.slots[idx]
-
+                return idx
+            idx = (idx + stride) % size
+            stride += increment
+
+    def _lookup_by_sequence(
+        self, slots: list[HashEntry[K, V] | NotExist], size: int, key: K, hash_: int
+    ) -> int:
+        for idx in self._probing_sequence(key, hash_, size):
+            slot = slots[idx]
+            if slot is EMPTY:
+                return -1
             if (
                 isinstance(slot, HashEntry)
-                and h == slot.hash_value
+                and hash_ == slot.hash_value
                 and is_same(slot.key, key)
             ):
-                slot.value = value
-                break
+                return idx
+        raise AssertionError("unreachable")
+
+    def _probe_insert(self, key: K, hash_: int) -> tuple[bool, int]:
+        """
+        Return `(True, index)` if `key` is in the table. Otherwise return
+        `(False, index)` of the slot it should be inserted into, which is the
+        first tombstone on its probe sequence if there is any.
+        """
+        slots, size = self.slots, self.size
+        params = self._probe_params(hash_, size)
+        if params is None:
+            return self._probe_insert_by_sequence(key, hash_)
+
+        first_deleted = -1
+        idx, stride, increment = params
+        while True:
+            slot = slots[idx]
             if slot is EMPTY:
-                self.slots[idx] = hash_entry
-                self._len += 1
-
-                if self._need_increase():
-                    self._increase_size()
-                break
+                return False, idx if first_deleted == -1 else first_deleted
+            if slot is DELETED:
+                # Remember the first tombstone, but keep probing: the key may
+                # still live further down the probe sequence.
+                if first_deleted == -1:
+                    first_deleted = idx
+            elif (
+                isinstance(slot, HashEntry)
+                and hash_ == slot.hash_value
+                and is_same(slot.key, key)
+            ):
+                return True, idx
+            idx = (idx + stride) % size
+            stride += increment
 
-    def __delitem__(self, key: K) -> None:
-        h = self._hash_func(key)
-        prob_sequence_gen = self._probing_sequence(key, h, self.size)
-        while True:
-            idx = next(prob_sequence_gen)
+    def _probe_insert_by_sequence(self, key: K, hash_: int) -> tuple[bool, int]:
+        first_deleted = -1
+        for idx in self._probing_sequence(key, hash_, self.size):
             slot = self.slots[idx]
             if slot is EMPTY:
-                raise KeyError(repr(key))
-            if (
+                return False, idx if first_deleted == -1 else first_deleted
+            if slot is DELETED:
+                if first_deleted == -1:
+                    first_deleted = idx
+            elif (
                 isinstance(slot, HashEntry)
-                and h == slot.hash_value
+                and hash_ == slot.hash_value
                 and is_same(slot.key, key)
             ):
-                self.slots[idx] = DELETED
-                break
-
-        self._len -= 1
-
-    def __sizeof__(self) -> int:
-        instance_size = super().__sizeof__()
-        pointer_size = ctypes.sizeof(ctypes.c_void_p)
-        items_size = len(self.slots) * (3 * pointer_size)
-        return instance_size + items_size
+                return True, idx
+        raise AssertionError("unreachable")
+
+    def _free_index(
+        self, slots: list[HashEntry[K, V] | NotExist], size: int, item: HashEntry[K, V]
+    ) -> int:
+        """Return the first EMPTY or DELETED slot on the probe sequence of `item`."""
+        params = self._probe_params(item.hash_value, size)
+        if params is None:
+            for idx in self._probing_sequence(item.key, item.hash_value, size):
+                if not isinstance(slots[idx], HashEntry):
+                    return idx
+            raise AssertionError("unreachable")
+
+        idx, stride, increment = params
+        while isinstance(slots[idx], HashEntry):
+            idx = (idx + stride) % size
+            stride += increment
+        return idx
+
+    def _place(self, item: HashEntry[K, V]) -> None:
+        """Put an item, known not to be in the table, in the first free slot."""
+        idx = self._free_index(self.slots, self.size, item)
+        if self.slots[idx] is DELETED:
+            self._deleted -= 1
+        self.slots[idx] = item
+
+    def _tables(self) -> list[tuple[list[HashEntry[K, V] | NotExist], int]]:
+        """Return the current table and the one being drained, with their sizes."""
+        tables = [(self.slots, self.size)]
+        if self._old_slots is not None:
+            tables.append((self._old_slots, self._old_size))
+        return tables
+
+    def _tombstone_count(self) -> int:
+        return self._deleted
+
+    def _histograms(self) -> tuple[Counter[int], Counter[int]]:
+        probe_lengths: Counter[int] = Counter()
+        for slots, size in self._tables():
+            for idx, item in enumerate(slots):
+                if not isinstance(item, HashEntry):
+                    continue
+                sequence = self._probing_sequence(item.key, item.hash_value, size)
+                for probes, i in enumerate(sequence, 1):
+                    if i == idx:
+                        break
+                probe_lengths[probes] += 1
+        displacements = Counter({n - 1: c for n, c in probe_lengths.items()})
+        return probe_lengths, displacements
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        probes = comparisons = 0
+        for slots, size in self._tables():
+            for idx in self._probing_sequence(key, hash_, size):
+                slot = slots[idx]
+                probes += 1
+                if slot is EMPTY:
+                    break
+                if isinstance(slot, HashEntry) and hash_ == slot.hash_value:
+                    comparisons += 1
+                    if is_same(slot.key, key):
+                        return probes, comparisons, True
+        return probes, comparisons, False
 
     def _need_increase(self) -> bool:
-        return len(self) / self.size >= self.resize_factor
+        # Tombstones lengthen probe sequences just like live entries do.
+        return (self._len + self._deleted) / self.size >= self.resize_factor
 
     def _increase_size(self) -> None:
-        new_size = self.size * 2
+        # If the live entries alone are far below the threshold, it was the
+        # tombstones that filled the table; clearing them is enough.
+        if self._len / self.size < self.resize_factor / 2:
+            new_size = self.size
+        else:
+            new_size = self.size * 2
+
+        self._resize(new_size, self.incremental_resize)
+
+    def _need_decrease(self) -> bool:
+        return (
+            not self._shrink_suspended
+            and self.size > self._min_size
+            and self._len < self.size * self.shrink_factor
+        )
+
+    def _decrease_size(self) -> None:
+        new_size = max(self.size // 2, self._min_size)
+        self._resize(new_size, self.incremental_resize)
+
+    def _rehash(self, new_size: int) -> None:
+        self._finish_rehash()
         new_slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * new_size
 
         for item in self.slots:
             if isinstance(item, HashEntry):
-                h = self._hash_func(item.key)
-                for idx in self._probing_sequence(item.key, h, new_size):
-                    slot = new_slots[idx]
-                    if slot is EMPTY:
-                        new_slots[idx] = item
-                        break
+                new_slots[self._free_index(new_slots, new_size, item)] = item
 
         self.slots = new_slots
         self.size = new_size
+        self._deleted = 0
+
+    def _start_rehash(self, new_size: int) -> None:
+        """
+        Switch to an empty table of `new_size` and keep the current one around
+        until `_migrate()` has moved all of its items over.
+        """
+        self._finish_rehash()
+        self._old_slots = self.slots
+        self._old_size = self.size
+        self._rehash_idx = 0
+        self.slots = [EMPTY] * new_size
+        self.size = new_size
+        self._deleted = 0
+
+    def _migrate(self, n_slots: int) -> None:
+        """Move the items of the next `n_slots` slots of the old table."""
+        old_slots = cast(list[HashEntry[K, V] | NotExist], self._old_slots)
+        stop = min(self._rehash_idx + n_slots, self._old_size)
+        for i in range(self._rehash_idx, stop):
+            item = old_slots[i]
+            if isinstance(item, HashEntry):
+                # A tombstone keeps the probe sequences of the remaining
+                # old items intact.
+                old_slots[i] = DELETED
+                self._place(item)
+        self._rehash_idx = stop
+        if stop == self._old_size:
+            self._old_slots = None
+
+    def _finish_rehash(self) -> None:
+        if self._old_slots is not None:
+            self._migrate(self._old_size)
+
+    def _snapshot(
+        self,
+    ) -> tuple[array[int], array[int], list[K], list[V], array[int]]:
+        """
+        Return the positions, hashes, keys and values of the items, and the
+        positions of the tombstones.
+        """
+        self._finish_rehash()
+        positions: array[int] = array("q")
+        hashes: array[int] = array("q")
+        keys: list[K] = []
+        values: list[V] = []
+        deleted: array[int] = array("q")
+        for idx, slot in enumerate(self.slots):
+            if isinstance(slot, HashEntry):
+                positions.append(idx)
+                hashes.append(slot.hash_value)
+                keys.append(slot.key)
+                values.append(slot.value)
+            elif slot is DELETED:
+                deleted.append(idx)
+        return positions, hashes, keys, values, deleted
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        positions, hashes, keys, values, deleted = snapshot
+        slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * self.size
+        for idx in deleted:
+            slots[idx] = DELETED
+        for idx, item in zip(positions, map(HashEntry, hashes, keys, values)):
+            slots[idx] = item
+        self.slots = slots
+        self._old_slots = None
+
+    def compact(self) -> None:
+        """
+        Rehash the items in place to clear the tombstones left by deletions.
+
+        The size of the table does not change.
+        """
+        self._resize(self.size)
+
+    def reserve(self, n: int) -> None:
+        new_size = self.size
+        while n >= new_size * self.resize_factor:
+            new_size *= 2
+        if new_size != self.size:
+            self._resize(new_size)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Halve the table while the items still fit under `resize_factor`, and
+        clear the tombstones.
+        """
+        new_size = self.size
+        while (
+            new_size // 2 >= self._min_size
+            and self._len < new_size // 2 * self.resize_factor
+        ):
+            new_size //= 2
+        self._resize(new_size)
 
     @abstractmethod
     def _probing_sequence(
@@ -138,6 +459,9 @@ class OpenAddressingHashMap(BaseHashMap[K, V]):
 
 
 class LinearProbingHashMap(OpenAddressingHashMap[K, V]):
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, 1, 0
+
     def _probing_sequence(
         self, key: K, hash_: int, size: int
     ) -> Generator[int, None, None]:
@@ -148,18 +472,37 @@ class LinearProbingHashMap(OpenAddressingHashMap[K, V]):
 
 
 class QuadraticProbingHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Probes the slots at the triangular numbers 0, 1, 3, 6, 10, ... from the
+    home slot.
+
+    On a table whose size is a power of two, the first `size` of them fall on
+    different slots, so an insert always finds a free slot if there is one.
+    The size is rounded up to a power of two for that reason.
+    """
+
+    _power_of_two_size = True
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, 1, 1
+
     def _probing_sequence(
         self, key: K, hash_: int, size: int
     ) -> Generator[int, None, None]:
         idx = hash_ % size
-        i = 0
+        i = 1
         while True:
-            yield idx % size
-            idx += i**2
+            yield idx
+            idx = (idx + i) % size
             i += 1
 
 
 class DoubleHashingHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Probes from the home slot in steps whose length is given by a second hash
+    function, so keys which share a home slot take different paths afterwards.
+    """
+
     def __init__(
         self,
         mapping_or_iterable: HashMapArgument[K, V] | None = None,
@@ -167,22 +510,387 @@ class DoubleHashingHashMap(OpenAddressingHashMap[K, V]):
         *,
         initial_size: int = 64,
         resize_factor: float = 0.7,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        hash_strategy: HashStrategy | None = None,
         prime_number: int = 7,
     ) -> None:
         self._prime = prime_number
         super().__init__(
-            mapping_or_iterable, initial_size=initial_size, resize_factor=resize_factor
+            mapping_or_iterable,
+            initial_size=initial_size,
+            resize_factor=resize_factor,
+            shrink_factor=shrink_factor,
+            incremental_resize=incremental_resize,
+            hash_strategy=hash_strategy,
         )
 
     def _hash_func2(self, h1_hash: int) -> int:
         return self._prime - (h1_hash % self._prime)
 
+    def _stride(self, hash_: int, size: int) -> int:
+        """
+        Return the distance between two probes of `hash_`.
+
+        It's `_hash_func2()` moved up to the nearest value coprime with `size`,
+        so the sequence visits every slot before it comes back to the start.
+        """
+        stride = self._hash_func2(hash_) % size or 1
+        while math.gcd(stride, size) != 1:
+            stride += 1
+        return stride
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, self._stride(hash_, size), 0
+
     def _probing_sequence(
         self, key: K, hash_: int, size: int
     ) -> Generator[int, None, None]:
-        h1 = hash_
-        h2 = self._hash_func2(hash_)
-        i = 0
+        idx = hash_ % size
+        stride = self._stride(hash_, size)
         while True:
-            yield ((h1 % size) + (h2 % size) + i) % size
-            i += 1
+            yield idx
+            idx = (idx + stride) % size
+
+
+class RobinHoodHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Linear probing where an inserted item takes over the slot of any item which
+    is closer to its home slot, so probe lengths stay close to each other.
+
+    The probe distance of every item is kept in `_distances`. A lookup stops
+    as soon as it reaches an item with a shorter distance than its own, and
+    deletions shift the following items back instead of leaving tombstones.
+    """
+
+    _supports_incremental_resize = False
+    _storage_attributes = ("slots", "_old_slots", "_distances")
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        return cast(HashEntry[K, V], self.slots[idx]).value
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        slots, distances, size = self.slots, self._distances, self.size
+        idx = hash_ % size
+        dist = 0
+        while True:
+            slot = slots[idx]
+            if not isinstance(slot, HashEntry) or distances[idx] < dist:
+                break
+            if hash_ == slot.hash_value and is_same(slot.key, key):
+                slot.value = value
+                return
+            idx = (idx + 1) % size
+            dist += 1
+
+        self._place(slots, distances, HashEntry(hash_, key, value), idx, dist)
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+
+        slots, distances, size = self.slots, self._distances, self.size
+        next_idx = (idx + 1) % size
+        while isinstance(slots[next_idx], HashEntry) and distances[next_idx] > 0:
+            slots[idx] = slots[next_idx]
+            distances[idx] = distances[next_idx] - 1
+            idx = next_idx
+            next_idx = (next_idx + 1) % size
+        slots[idx] = EMPTY
+        distances[idx] = 0
+
+        self._len -= 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        return super().__sizeof__() + len(self._distances) * pointer_size
+
+    def _init_storage(self) -> None:
+        super()._init_storage()
+        self._distances: list[int] = [0] * self.size
+
+    def _find_index(self, key: K, hash_: int) -> int:
+        slots, distances, size = self.slots, self._distances, self.size
+        idx = hash_ % size
+        dist = 0
+        while True:
+            slot = slots[idx]
+            # Had the key been here, it would have taken this slot over.
+            if not isinstance(slot, HashEntry) or distances[idx] < dist:
+                return -1
+            if hash_ == slot.hash_value and is_same(slot.key, key):
+                return idx
+            idx = (idx + 1) % size
+            dist += 1
+
+    @staticmethod
+    def _place(
+        slots: list[HashEntry[K, V] | NotExist],
+        distances: list[int],
+        item: HashEntry[K, V],
+        idx: int,
+        dist: int,
+    ) -> None:
+        """
+        Put `item`, which is `dist` slots away from its home slot, at `idx` and
+        carry the displaced items forward until an empty slot is reached.
+        """
+        size = len(slots)
+        while True:
+            slot = slots[idx]
+            if not isinstance(slot, HashEntry):
+                slots[idx] = item
+                distances[idx] = dist
+                return
+            if distances[idx] < dist:
+                slots[idx], item = item, slot
+                distances[idx], dist = dist, distances[idx]
+            idx = (idx + 1) % size
+            dist += 1
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        super()._load_snapshot(snapshot)
+        positions, hashes = snapshot[:2]
+        self._distances = [0] * self.size
+        for idx, hash_ in zip(positions, hashes):
+            self._distances[idx] = (idx - hash_) % self.size
+
+    def _rehash(self, new_size: int) -> None:
+        new_slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * new_size
+        new_distances = [0] * new_size
+
+        for item in self.slots:
+            if isinstance(item, HashEntry):
+                self._place(
+                    new_slots, new_distances, item, item.hash_value % new_size, 0
+                )
+
+        self.slots = new_slots
+        self._distances = new_distances
+        self.size = new_size
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        slots, distances, size = self.slots, self._distances, self.size
+        idx = hash_ % size
+        probes = comparisons = dist = 0
+        while True:
+            slot = slots[idx]
+            probes += 1
+            if not isinstance(slot, HashEntry) or distances[idx] < dist:
+                return probes, comparisons, False
+            if hash_ == slot.hash_value:
+                comparisons += 1
+                if is_same(slot.key, key):
+                    return probes, comparisons, True
+            idx = (idx + 1) % size
+            dist += 1
+
+    def _probing_sequence(
+        self, key: K, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        idx = hash_ % size
+        while True:
+            yield idx % size
+            idx += 1
+
+
+class ArrayOpenAddressingHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Open addressing which keeps hashes, keys and values in three parallel
+    arrays instead of one `HashEntry` object per item.
+
+    Hashes go to an `array('q')` and `EMPTY`/`DELETED` markers are stored in the
+    keys list. `HashEntry` objects are only built when `.slots` is read.
+
+    The probing strategy comes from the class it's combined with, e.g.
+    `ArrayLinearProbingHashMap(ArrayOpenAddressingHashMap, LinearProbingHashMap)`.
+    """
+
+    _supports_incremental_resize = False
+    # The arrays are pickled as they are.
+    _storage_attributes = ()
+
+    @property
+    def slots(self) -> list[HashEntry[K, V] | NotExist]:  # type: ignore[override]
+        return [
+            k if isinstance(k, NotExist) else HashEntry(h, k, v)
+            for h, k, v in zip(self._hashes, self._keys, self._values)
+        ]
+
+    def __iter__(self) -> Iterator[K]:
+        for k in self._keys:
+            if not isinstance(k, NotExist):
+                yield k
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        return cast(V, self._values[idx])
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        found, idx = self._probe_insert(key, hash_)
+        if found:
+            self._values[idx] = value
+            return
+
+        if self._keys[idx] is DELETED:
+            self._deleted -= 1
+        self._hashes[idx] = hash_
+        self._keys[idx] = key
+        self._values[idx] = value
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        self._keys[idx] = DELETED
+        self._values[idx] = None
+        self._len -= 1
+        self._deleted += 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        items_size = len(self._keys) * (self._hashes.itemsize + 2 * pointer_size)
+        return object.__sizeof__(self) + items_size
+
+    def _init_storage(self) -> None:
+        self._hashes, self._keys, self._values = self._empty_arrays(self.size)
+
+    @staticmethod
+    def _empty_arrays(
+        size: int,
+    ) -> tuple[array[int], list[K | NotExist], list[V | None]]:
+        return array("q", bytes(8 * size)), [EMPTY] * size, [None] * size
+
+    def _find_index(self, key: K, hash_: int) -> int:
+        hashes, keys, size = self._hashes, self._keys, self.size
+        params = self._probe_params(hash_, size)
+        if params is None:
+            for idx in self._probing_sequence(key, hash_, size):
+                k = keys[idx]
+                if k is EMPTY:
+                    return -1
+                if k is not DELETED and hash_ == hashes[idx] and is_same(k, key):
+                    return idx
+            raise AssertionError("unreachable")
+
+        idx, stride, increment = params
+        while True:
+            k = keys[idx]
+            if k is EMPTY:
+                return -1
+            if k is not DELETED and hash_ == hashes[idx] and is_same(k, key):
+                return idx
+            idx = (idx + stride) % size
+            stride += increment
+
+    def _tables(self) -> list[tuple[list[HashEntry[K, V] | NotExist], int]]:
+        return [(self.slots, self.size)]
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        # Reading `.slots` would build an entry for every slot.
+        hashes, keys = self._hashes, self._keys
+        probes = comparisons = 0
+        for idx in self._probing_sequence(key, hash_, self.size):
+            k = keys[idx]
+            probes += 1
+            if k is EMPTY:
+                break
+            if k is not DELETED and hash_ == hashes[idx]:
+                comparisons += 1
+                if is_same(k, key):
+                    return probes, comparisons, True
+        return probes, comparisons, False
+
+    def _probe_insert(self, key: K, hash_: int) -> tuple[bool, int]:
+        hashes, keys, size = self._hashes, self._keys, self.size
+        params = self._probe_params(hash_, size)
+        if params is None:
+            return self._probe_insert_by_sequence(key, hash_)
+
+        first_deleted = -1
+        idx, stride, increment = params
+        while True:
+            k = keys[idx]
+            if k is EMPTY:
+                return False, idx if first_deleted == -1 else first_deleted
+            if k is DELETED:
+                if first_deleted == -1:
+                    first_deleted = idx
+            elif hash_ == hashes[idx] and is_same(k, key):
+                return True, idx
+            idx = (idx + stride) % size
+            stride += increment
+
+    def _probe_insert_by_sequence(self, key: K, hash_: int) -> tuple[bool, int]:
+        hashes, keys = self._hashes, self._keys
+        first_deleted = -1
+        for idx in self._probing_sequence(key, hash_, self.size):
+            k = keys[idx]
+            if k is EMPTY:
+                return False, idx if first_deleted == -1 else first_deleted
+            if k is DELETED:
+                if first_deleted == -1:
+                    first_deleted = idx
+            elif hash_ == hashes[idx] and is_same(k, key):
+                return True, idx
+        raise AssertionError("unreachable")
+
+    def _rehash(self, new_size: int) -> None:
+        new_hashes, new_keys, new_values = self._empty_arrays(new_size)
+
+        for h, k, v in zip(self._hashes, self._keys, self._values):
+            if isinstance(k, NotExist):
+                continue
+            params = self._probe_params(h, new_size)
+            if params is None:
+                for idx in self._probing_sequence(k, h, new_size):
+                    if new_keys[idx] is EMPTY:
+                        break
+            else:
+                idx, stride, increment = params
+                while new_keys[idx] is not EMPTY:
+                    idx = (idx + stride) % new_size
+                    stride += increment
+            new_hashes[idx] = h
+            new_keys[idx] = k
+            new_values[idx] = v
+
+        self._hashes, self._keys, self._values = new_hashes, new_keys, new_values
+        self.size = new_size
+        self._deleted = 0
+
+
+class ArrayLinearProbingHashMap(
+    ArrayOpenAddressingHashMap[K, V], LinearProbingHashMap[K, V]
+):
+    pass
+
+
+class ArrayQuadraticProbingHashMap(
+    ArrayOpenAddressingHashMap[K, V], QuadraticProbingHashMap[K, V]
+):
+    pass
+
+
+class ArrayDoubleHashingHashMap(
+    ArrayOpenAddressingHashMap[K, V], DoubleHashingHashMap[K, V]
+):
+    pass
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import gc
+import os
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import repeat
+from typing import Any
+
+from .base import BaseHashMap, HashMapArgument, K, V
+from .open_addressing import LinearProbingHashMap, OpenAddressingHashMap
+
+
+def _place_partition(
+    homes: array[int], lo: int, hi: int
+) -> tuple[array[int], array[int]]:
+    """
+    Lay out the items whose home slot is in `[lo, hi)` as linear probing
+    would, if they were inserted by home slot into a table holding nothing
+    else.
+
+    Return the indices of the items in `homes` and their slots, both sorted
+    by slot. The last slots may run past `hi` when a cluster overflows.
+    """
+    indices = sorted(
+        [i for i, home in enumerate(homes) if lo <= home < hi],
+        key=homes.__getitem__,
+    )
+    slots = array("q", bytes(8 * len(indices)))
+    next_free = lo
+    for j, i in enumerate(indices):
+        home = homes[i]
+        slot = home if home > next_free else next_free
+        slots[j] = slot
+        next_free = slot + 1
+    return array("q", indices), slots
+
+
+def _join_partitions(
+    results: Iterator[tuple[array[int], array[int]]], size: int
+) -> tuple[array[int], array[int]]:
+    """
+    Concatenate the layouts of consecutive partitions into the layout of a
+    table of `size` slots.
+    """
+    indices: array[int] = array("q")
+    slots: array[int] = array("q")
+    next_free = 0
+    for part_indices, part_slots in results:
+        # A cluster which overflowed the previous partition pushes the first
+        # items of this one along. Once one of them keeps its slot, the ones
+        # after it do too.
+        j = 0
+        while j < len(part_slots) and part_slots[j] < next_free:
+            part_slots[j] = next_free
+            next_free += 1
+            j += 1
+        if part_slots:
+            next_free = part_slots[-1] + 1
+        indices.extend(part_indices)
+        slots.extend(part_slots)
+
+    # The items pushed past the end of the table wrap around to the first
+    # free slots, which follow the slots taken at the start of the table.
+    wrapped = len(slots)
+    while wrapped and slots[wrapped - 1] >= size:
+        wrapped -= 1
+    slot = k = 0
+    for j in range(wrapped, len(slots)):
+        while k < wrapped and slots[k] == slot:
+            slot += 1
+            k += 1
+        slots[j] = slot
+        slot += 1
+    return indices, slots
+
+
+def _has_plain_layout(cls: type[BaseHashMap[Any, Any]]) -> bool:
+    """Whether `cls` keeps its items in `slots` exactly like linear probing."""
+    return (
+        issubclass(cls, LinearProbingHashMap)
+        and "slots" in cls._storage_attributes
+        and cls._probe_params is LinearProbingHashMap._probe_params
+        and cls._load_snapshot is OpenAddressingHashMap._load_snapshot
+    )
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    # Every object allocated while the table is built would otherwise make
+    # the collector walk all the entries created so far, again and again.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def build_parallel(
+    mapping_or_iterable: HashMapArgument[K, V],
+    /,
+    *,
+    cls: type[BaseHashMap[Any, Any]] = LinearProbingHashMap,
+    workers: int | None = None,
+    chunk_size: int = 100_000,
+    **kwargs: Any,
+) -> BaseHashMap[K, V]:
+    """
+    Build a `cls(**kwargs)` hashmap holding the items of `mapping_or_iterable`
+    in a table sized for all of them at once. When a key appears more than
+    once, its last value wins.
+
+    For `LinearProbingHashMap`, the table is cut into partitions of
+    consecutive slots, at least `chunk_size` items each, and `workers`
+    processes (one per CPU by default) lay out the items whose home slot
+    falls into each of them. Only the home slots go to the workers and only
+    the slot of every item comes back. The main process joins the
+    partitions, moves the items which overflowed one partition into the
+    next, and fills the table without probing or comparing any key.
+
+    The keys are hashed in the main process, since sending them to the
+    workers costs more than hashing them. Other classes, and builds which
+    don't fill two partitions, use `set_many()`.
+    """
+    if workers is not None and not (isinstance(workers, int) and workers > 0):
+        raise ValueError("workers must be a positive integer.")
+    if not (isinstance(chunk_size, int) and chunk_size > 0):
+        raise ValueError("chunk_size must be a positive integer.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    hashmap = cls(**kwargs)
+    with _gc_paused():
+        items = dict(mapping_or_iterable)
+        keys, values = list(items), list(items.values())
+        parts = min(workers, len(keys) // chunk_size)
+        if parts < 2 or not _has_plain_layout(cls):
+            hashmap.set_many(keys, values)
+            return hashmap
+
+        hashmap.reserve(len(keys))
+        size = hashmap.size
+        keys, hashes = hashmap._prepare_keys(keys)
+        homes = array("q", [h % size for h in hashes])
+        bounds = [size * p // parts for p in range(parts + 1)]
+        with ProcessPoolExecutor(parts) as executor:
+            results = executor.map(_place_partition, repeat(homes), bounds, bounds[1:])
+            indices, slots = _join_partitions(results, size)
+
+        # Going through the items in their own order rather than by slot reads
+        # the keys and values in the order they sit in memory.
+        positions = array("q", bytes(8 * len(keys)))
+        for i, slot in zip(indices, slots):
+            positions[i] = slot
+        hashmap._load_snapshot((positions, hashes, keys, values, array("q")))
+        hashmap._len = len(keys)
+    return hashmap
@@ -0,0 +1,487 @@
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import pickle
+import struct
+from typing import TYPE_CHECKING, Any, Protocol, cast
+
+from .base import HashEntry, HashMapArgument, K, V
+from .hashing import KeyedHash
+from .open_addressing import DELETED, EMPTY, NotExist, OpenAddressingHashMap
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Iterator
+
+MAGIC = b"PYHMMAP1"
+
+# Magic, size, length, tombstones, end of the heap, bytes of dead records,
+# minimum size, seed, resize factor and shrink factor.
+_HEADER = struct.Struct("<8s7Q2d")
+HEADER_SIZE = 128
+
+# A slot holds the hash of a key and the offset of its record in the file.
+# Records are stored after the header, so no record starts at these offsets.
+_SLOT = struct.Struct("<qQ")
+OFFSET_EMPTY = 0
+OFFSET_DELETED = 1
+
+# A record holds the lengths of the serialized key and value, then both.
+_RECORD = struct.Struct("<II")
+
+# Dead records are only dropped once they take up this many bytes and half of
+# the heap.
+_MIN_WASTE = 1 << 20
+
+
+class Serializer(Protocol):
+    """
+    A protocol for the objects which turn keys and values into bytes and back.
+
+    Keys are compared by their serialized bytes, so a key has to give the same
+    bytes in every process which opens the file.
+    """
+
+    def dumps(self, obj: Any, /) -> bytes:
+        ...
+
+    def loads(self, data: bytes, /) -> Any:
+        ...
+
+
+class PickleSerializer:
+    """
+    Serialize with `pickle` at a fixed protocol, so that the bytes of a key
+    don't change with the default protocol of the interpreter.
+    """
+
+    def __init__(self, protocol: int = 4) -> None:
+        self.protocol = protocol
+
+    def dumps(self, obj: Any, /) -> bytes:
+        return pickle.dumps(obj, self.protocol)
+
+    def loads(self, data: bytes, /) -> Any:
+        return pickle.loads(data)
+
+
+class MmapHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Linear probing over a table kept in a file and accessed through `mmap`.
+
+    The file holds a header, the table, whose slots hold the hash of a key and
+    the offset of its record, and an append-only heap of records holding the
+    serialized key and value. Opening an existing file only maps it: the
+    slots and records are paged in by the lookups which touch them. Updates
+    and deletions leave dead records behind until the next resize or
+    `compact()`, which write a new file and atomically replace the old one.
+
+    Keys are hashed with a `KeyedHash` of their serialized bytes. Its seed is
+    random unless `seed` is given, and is stored in the file, so the hashes
+    stay valid in other processes. Use
+    the same serializer every time the file is opened; the default one
+    unpickles records, so only open trusted files.
+
+    `flag` works like in `dbm.open()`: "r" opens an existing file read-only,
+    "w" opens it for reading and writing, "c" also creates it if it doesn't
+    exist and "n" always creates a new, empty file. The other arguments only
+    apply to new files. Any number of processes can open a file read-only at
+    the same time, as long as there is at most one writer. Readers read the
+    header again before every lookup and map the file again when the writer
+    has grown it. Since a resize replaces the file, readers keep seeing its
+    old contents until they open it again.
+    """
+
+    _supports_incremental_resize = False
+
+    hash_strategy: KeyedHash
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        flag: str = "c",
+        initial_size: int = 64,
+        resize_factor: float = 0.7,
+        shrink_factor: float | None = None,
+        seed: int | None = None,
+        serializer: Serializer | None = None,
+    ) -> None:
+        if flag not in ("r", "w", "c", "n"):
+            raise ValueError("flag must be one of 'r', 'w', 'c' or 'n'.")
+        self.path = os.fspath(path)
+        self.readonly = flag == "r"
+        self.serializer = PickleSerializer() if serializer is None else serializer
+        self._create = flag == "n" or (flag == "c" and not os.path.exists(self.path))
+        super().__init__(
+            mapping_or_iterable,
+            initial_size=initial_size,
+            resize_factor=resize_factor,
+            shrink_factor=shrink_factor,
+            hash_strategy=KeyedHash(seed),
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # The file is the snapshot: the copy maps it again.
+        self.flush()
+        cls = getattr(type(self), "_plain_class", type(self))
+        flag = "r" if self.readonly else "w"
+        return _reopen, (cls, self.path, flag, self.serializer)
+
+    def __enter__(self) -> MmapHashMap[K, V]:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def flush(self) -> None:
+        """Write the changes made through the mapping to the file."""
+        if not self.readonly:
+            self._mm.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self._mm.close()
+        if self.readonly:
+            self._file.close()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._len
+
+    @property
+    def slots(self) -> list[HashEntry[K, V] | NotExist]:  # type: ignore[override]
+        self._refresh()
+        slots: list[HashEntry[K, V] | NotExist] = []
+        for idx in range(self.size):
+            hash_, offset = _SLOT.unpack_from(self._mm, self._slot_position(idx))
+            if offset == OFFSET_EMPTY:
+                slots.append(EMPTY)
+            elif offset == OFFSET_DELETED:
+                slots.append(DELETED)
+            else:
+                key, value = self._read_record(offset)
+                slots.append(HashEntry(hash_, key, value))
+        return slots
+
+    def __iter__(self) -> Iterator[K]:
+        loads = self.serializer.loads
+        for _, offset in self._live_slots():
+            yield loads(self._key_bytes(offset))
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        key_bytes = self.serializer.dumps(key)
+        self._refresh()
+        idx = self._find_index(key_bytes, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        _, offset = _SLOT.unpack_from(self._mm, self._slot_position(idx))
+        return cast(V, self._read_record(offset)[1])
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        self._check_writable()
+        key_bytes = self.serializer.dumps(key)
+        value_bytes = self.serializer.dumps(value)
+
+        found, idx = self._probe_slot(key_bytes, hash_)
+        position = self._slot_position(idx)
+        _, old_offset = _SLOT.unpack_from(self._mm, position)
+        # Appending may remap the file, so `self._mm` is read again below.
+        offset = self._append(key_bytes, value_bytes)
+        if found:
+            self._waste += self._record_size(old_offset)
+        else:
+            if old_offset == OFFSET_DELETED:
+                self._deleted -= 1
+            self._len += 1
+        _SLOT.pack_into(self._mm, position, hash_, offset)
+        self._write_header()
+
+        if self._need_increase():
+            self._increase_size()
+        elif self._need_compact():
+            self.compact()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        self._check_writable()
+        idx = self._find_index(self.serializer.dumps(key), hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        position = self._slot_position(idx)
+        _, offset = _SLOT.unpack_from(self._mm, position)
+        _SLOT.pack_into(self._mm, position, 0, OFFSET_DELETED)
+        self._waste += self._record_size(offset)
+        self._len -= 1
+        self._deleted += 1
+        self._write_header()
+
+        if self._need_decrease():
+            self._decrease_size()
+        elif self._need_compact():
+            self.compact()
+
+    def __sizeof__(self) -> int:
+        # The table and the records live in the page cache, not in the heap
+        # of the interpreter.
+        return object.__sizeof__(self)
+
+    def _hash_func(self, key: K) -> int:
+        # Like every other mapping, only take hashable keys, even though their
+        # own hash isn't used.
+        hash(key)
+        return self.hash_strategy(self.serializer.dumps(key))
+
+    def _prepare_keys(self, keys: Iterable[K]) -> tuple[list[K], list[int]]:
+        keys = list(keys)
+        return keys, list(map(self._hash_func, keys))
+
+    def _init_storage(self) -> None:
+        if self._create:
+            self._end = HEADER_SIZE + self.size * _SLOT.size
+            self._waste = 0
+            with open(self.path, "wb") as f:
+                f.write(_HEADER.pack(*self._header_fields()))
+                f.truncate(self._end)
+        self._map()
+        if self._create:
+            return
+
+        (
+            magic,
+            self.size,
+            self._len,
+            self._deleted,
+            self._end,
+            self._waste,
+            self._min_size,
+            seed,
+            self.resize_factor,
+            self.shrink_factor,
+        ) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path!r} is not a {self.__class__.__name__} file.")
+        self.hash_strategy = KeyedHash(seed)
+
+    def _map(self) -> None:
+        if self.readonly:
+            # Readers keep the file open, so that `_remap()` maps the same file
+            # again even after a resize has replaced the one at `path`.
+            self._file = open(self.path, "rb")
+            self._remap()
+            return
+        with open(self.path, "r+b") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+
+    def _remap(self) -> None:
+        # The old mapping isn't closed: a lookup in progress may still read
+        # the table through it, and it's unmapped once nothing refers to it.
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _refresh(self) -> None:
+        """
+        Read the header again if the file is opened read-only, since another
+        process may be writing to it, and map the file again if its heap
+        grew past the mapping.
+        """
+        if not self.readonly:
+            return
+        header = _HEADER.unpack_from(self._mm, 0)
+        if header[4] > len(self._mm):
+            self._remap()
+            header = _HEADER.unpack_from(self._mm, 0)
+        self.size, self._len, self._deleted, self._end, self._waste = header[1:6]
+
+    def _check_writable(self) -> None:
+        if self.readonly:
+            raise io.UnsupportedOperation(f"{self.path!r} is opened read-only.")
+
+    def _header_fields(self) -> tuple[Any, ...]:
+        return (
+            MAGIC,
+            self.size,
+            self._len,
+            self._deleted,
+            self._end,
+            self._waste,
+            self._min_size,
+            self.hash_strategy.seed,
+            self.resize_factor,
+            self.shrink_factor,
+        )
+
+    def _write_header(self) -> None:
+        _HEADER.pack_into(self._mm, 0, *self._header_fields())
+
+    @staticmethod
+    def _slot_position(idx: int) -> int:
+        return HEADER_SIZE + idx * _SLOT.size
+
+    def _live_slots(self) -> Generator[tuple[int, int], None, None]:
+        """Yield the hash and record offset of every item, in table order."""
+        self._refresh()
+        mm = self._mm
+        for idx in range(self.size):
+            hash_, offset = _SLOT.unpack_from(mm, self._slot_position(idx))
+            if offset > OFFSET_DELETED:
+                yield hash_, offset
+
+    def _read(self, start: int, stop: int) -> bytes:
+        if stop > len(self._mm):
+            self._remap()
+        return self._mm[start:stop]
+
+    def _record_lengths(self, offset: int) -> tuple[int, int]:
+        """Return the lengths of the serialized key and value of a record."""
+        if offset + _RECORD.size > len(self._mm):
+            # A writer may point a slot at a record appended after the header
+            # was last read, past the end of the mapping.
+            self._remap()
+        return cast(tuple[int, int], _RECORD.unpack_from(self._mm, offset))
+
+    def _key_bytes(self, offset: int) -> bytes:
+        key_length = self._record_lengths(offset)[0]
+        start = offset + _RECORD.size
+        return self._read(start, start + key_length)
+
+    def _read_record(self, offset: int) -> tuple[K, V]:
+        key_length, value_length = self._record_lengths(offset)
+        start = offset + _RECORD.size
+        middle = start + key_length
+        loads = self.serializer.loads
+        return (
+            loads(self._read(start, middle)),
+            loads(self._read(middle, middle + value_length)),
+        )
+
+    def _record_size(self, offset: int) -> int:
+        key_length, value_length = self._record_lengths(offset)
+        return _RECORD.size + key_length + value_length
+
+    def _append(self, key_bytes: bytes, value_bytes: bytes) -> int:
+        """Write a record at the end of the heap and return its offset."""
+        offset = self._end
+        end = offset + _RECORD.size + len(key_bytes) + len(value_bytes)
+        if end > len(self._mm):
+            # Grow the file geometrically so that appends stay amortized O(1).
+            self._mm.close()
+            os.truncate(self.path, max(end, 2 * self._end))
+            self._map()
+        mm = self._mm
+        _RECORD.pack_into(mm, offset, len(key_bytes), len(value_bytes))
+        start = offset + _RECORD.size
+        mm[start : start + len(key_bytes)] = key_bytes
+        mm[start + len(key_bytes) : end] = value_bytes
+        self._end = end
+        return offset
+
+    def _need_compact(self) -> bool:
+        heap_size = self._end - self._slot_position(self.size)
+        return self._waste >= max(_MIN_WASTE, heap_size // 2)
+
+    def _find_index(self, key_bytes: bytes, hash_: int) -> int:
+        mm, size = self._mm, self.size
+        idx = hash_ % size
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(mm, self._slot_position(idx))
+            if offset == OFFSET_EMPTY:
+                return -1
+            if (
+                slot_hash == hash_
+                and offset != OFFSET_DELETED
+                and self._key_bytes(offset) == key_bytes
+            ):
+                return idx
+            idx = (idx + 1) % size
+
+    def _probe_slot(self, key_bytes: bytes, hash_: int) -> tuple[bool, int]:
+        mm, size = self._mm, self.size
+        idx = hash_ % size
+        first_deleted = -1
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(mm, self._slot_position(idx))
+            if offset == OFFSET_EMPTY:
+                return False, idx if first_deleted == -1 else first_deleted
+            if offset == OFFSET_DELETED:
+                if first_deleted == -1:
+                    first_deleted = idx
+            elif slot_hash == hash_ and self._key_bytes(offset) == key_bytes:
+                return True, idx
+            idx = (idx + 1) % size
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        # Reading `.slots` would load every record of the file.
+        key_bytes = self.serializer.dumps(key)
+        self._refresh()
+        mm, size = self._mm, self.size
+        idx = hash_ % size
+        probes = comparisons = 0
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(mm, self._slot_position(idx))
+            probes += 1
+            if offset == OFFSET_EMPTY:
+                return probes, comparisons, False
+            if slot_hash == hash_ and offset != OFFSET_DELETED:
+                comparisons += 1
+                if self._key_bytes(offset) == key_bytes:
+                    return probes, comparisons, True
+            idx = (idx + 1) % size
+
+    def _probe_params(self, hash_: int, size: int) -> tuple[int, int, int]:
+        return hash_ % size, 1, 0
+
+    def _rehash(self, new_size: int) -> None:
+        """
+        Write the live records and a table of `new_size` to a new file, then
+        replace the current one with it.
+
+        Slots are placed with the hashes stored in the table, so no key is
+        deserialized or hashed again.
+        """
+        self._check_writable()
+        table = bytearray(new_size * _SLOT.size)
+        end = HEADER_SIZE + len(table)
+        tmp_path = self.path + ".tmp"
+        mm = self._mm
+        try:
+            with open(tmp_path, "wb") as f:
+                f.seek(end)
+                for hash_, offset in self._live_slots():
+                    record_size = self._record_size(offset)
+                    f.write(mm[offset : offset + record_size])
+                    idx = hash_ % new_size
+                    while _SLOT.unpack_from(table, idx * _SLOT.size)[1]:
+                        idx = (idx + 1) % new_size
+                    _SLOT.pack_into(table, idx * _SLOT.size, hash_, end)
+                    end += record_size
+                f.seek(HEADER_SIZE)
+                f.write(table)
+
+                self.size, self._deleted, self._end, self._waste = new_size, 0, end, 0
+                f.seek(0)
+                f.write(_HEADER.pack(*self._header_fields()))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        mm.close()
+        os.replace(tmp_path, self.path)
+        self._map()
+
+    def _probing_sequence(
+        self, key: K, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        idx = hash_ % size
+        while True:
+            yield idx
+            idx = (idx + 1) % size
+
+
+def _reopen(
+    cls: type[MmapHashMap[K, V]], path: str, flag: str, serializer: Serializer
+) -> MmapHashMap[K, V]:
+    """Unpickle a `MmapHashMap` by opening its file again."""
+    return cls(path, flag=flag, serializer=serializer)
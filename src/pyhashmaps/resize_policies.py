@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:
+    from .separate_chaining import SeparateChainingHashMap
+
+
+class ResizePolicy(Protocol):
+    """
+    A protocol for the objects which decide when a `SeparateChainingHashMap`
+    has to grow.
+
+    `max_load_factor` is the average chain length the policy tolerates, it's
+    used to size the table up front in `SeparateChainingHashMap.reserve()`.
+    """
+
+    max_load_factor: float
+
+    def need_increase(
+        self, hashmap: SeparateChainingHashMap[Any, Any], chain_size: int
+    ) -> bool:
+        """
+        Called after a new item is inserted into a chain, which is now
+        `chain_size` items long.
+        """
+        ...
+
+
+class LoadFactorPolicy:
+    """Grow when the average chain length reaches `max_load_factor`."""
+
+    def __init__(self, max_load_factor: float = 1.0) -> None:
+        if not max_load_factor > 0:
+            raise ValueError("max_load_factor must be positive.")
+        self.max_load_factor = max_load_factor
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(max_load_factor={self.max_load_factor})"
+
+    def need_increase(
+        self, hashmap: SeparateChainingHashMap[Any, Any], chain_size: int
+    ) -> bool:
+        return hashmap._len >= hashmap.size * self.max_load_factor
+
+
+class LoadFactorMaxChainPolicy(LoadFactorPolicy):
+    """
+    Grow when the average chain length reaches `max_load_factor`, or when a
+    chain reaches `max_chain_size` items while the table is at least
+    `min_load_factor` full.
+
+    The lower bound keeps a few colliding keys from doubling an almost empty
+    table over and over.
+    """
+
+    def __init__(
+        self,
+        max_load_factor: float = 1.0,
+        max_chain_size: int = 5,
+        min_load_factor: float = 0.5,
+    ) -> None:
+        super().__init__(max_load_factor)
+        if not (isinstance(max_chain_size, int) and max_chain_size > 0):
+            raise ValueError("max_chain_size must be a positive integer.")
+        if not 0.0 <= min_load_factor <= max_load_factor:
+            raise ValueError("min_load_factor must be between 0 and max_load_factor.")
+        self.max_chain_size = max_chain_size
+        self.min_load_factor = min_load_factor
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_load_factor={self.max_load_factor}, "
+            f"max_chain_size={self.max_chain_size}, "
+            f"min_load_factor={self.min_load_factor})"
+        )
+
+    def need_increase(
+        self, hashmap: SeparateChainingHashMap[Any, Any], chain_size: int
+    ) -> bool:
+        if super().need_increase(hashmap, chain_size):
+            return True
+        return (
+            chain_size >= self.max_chain_size
+            and hashmap._len >= hashmap.size * self.min_load_factor
+        )
+
+
+class AdaptivePolicy(LoadFactorPolicy):
+    """
+    Grow when the average chain length reaches `max_load_factor`, or when a
+    chain reaches `max_chain_size` items and more than one chain, and at least
+    `long_chain_ratio` of all chains, are half as long.
+
+    A single hot chain is a collision problem which a bigger table can't fix,
+    while many long chains mean the table is simply too small. The chain
+    lengths are only inspected when the triggering chain reaches a power of
+    two, which keeps the cost of a hot chain logarithmic.
+    """
+
+    def __init__(
+        self,
+        max_load_factor: float = 1.0,
+        max_chain_size: int = 8,
+        long_chain_ratio: float = 0.01,
+    ) -> None:
+        super().__init__(max_load_factor)
+        if not (isinstance(max_chain_size, int) and max_chain_size > 1):
+            raise ValueError("max_chain_size must be an integer bigger than 1.")
+        if not 0.0 < long_chain_ratio <= 1.0:
+            raise ValueError("long_chain_ratio must be between 0 and 1.")
+        self.max_chain_size = max_chain_size
+        self.long_chain_ratio = long_chain_ratio
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(max_load_factor={self.max_load_factor}, "
+            f"max_chain_size={self.max_chain_size}, "
+            f"long_chain_ratio={self.long_chain_ratio})"
+        )
+
+    def need_increase(
+        self, hashmap: SeparateChainingHashMap[Any, Any], chain_size: int
+    ) -> bool:
+        if super().need_increase(hashmap, chain_size):
+            return True
+        if chain_size < self.max_chain_size or chain_size & (chain_size - 1):
+            return False
+        histogram = hashmap.chain_length_histogram()
+        threshold = self.max_chain_size // 2
+        long_chains = sum(n for length, n in histogram.items() if length >= threshold)
+        return long_chains > 1 and long_chains >= hashmap.size * self.long_chain_ratio
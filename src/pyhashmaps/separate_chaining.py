@@ -1,18 +1,46 @@
 from __future__ import annotations
 
 import ctypes
-from typing import TYPE_CHECKING
+from array import array
+from collections import Counter
+from itertools import islice
+from typing import TYPE_CHECKING, Any, cast
 
-from .base import BaseHashMap, Chain, Comp_K, HashEntry, HashMapArgument, K, V
-from .chains import BinarySearchTree, DynamicArray, LinkedList
+from .base import (
+    BaseHashMap,
+    Chain,
+    Comp_K,
+    HashEntry,
+    HashMapArgument,
+    K,
+    V,
+    is_same,
+)
+from .chains import (
+    AdaptiveChain,
+    AVLTree,
+    BinarySearchTree,
+    DynamicArray,
+    LinkedList,
+)
+from .resize_policies import LoadFactorMaxChainPolicy
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
 
+    from .hashing import HashStrategy
+    from .resize_policies import ResizePolicy
+
 
 class SeparateChainingHashMap(BaseHashMap[K, V]):
     chain: type[Chain[K, V]]
 
+    # Number of old chains migrated by every insert or delete while an
+    # incremental resize is in progress.
+    _rehash_step = 4
+
+    _storage_attributes = ("slots", "_old_slots")
+
     def __init__(
         self,
         mapping_or_iterable: HashMapArgument[K, V] | None = None,
@@ -20,31 +48,51 @@ class SeparateChainingHashMap(BaseHashMap[K, V]):
         *,
         initial_size: int = 40,
         max_chain_size: int = 5,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        resize_policy: ResizePolicy | None = None,
+        hash_strategy: HashStrategy | None = None,
     ) -> None:
-        super().__init__(initial_size)
-        self._max_chain_size = max_chain_size
+        super().__init__(initial_size, hash_strategy)
+        if resize_policy is None:
+            resize_policy = LoadFactorMaxChainPolicy(max_chain_size=max_chain_size)
+        # Leave a gap between shrinking and growing, or a few inserts and
+        # deletes around the boundary would resize the table every time.
+        if shrink_factor is None:
+            shrink_factor = min(0.1, resize_policy.max_load_factor / 4)
+        elif not 0.0 <= shrink_factor < resize_policy.max_load_factor / 2:
+            raise ValueError("shrink_factor must be between 0 and max_load_factor / 2.")
+        self.resize_policy = resize_policy
+        self.shrink_factor = shrink_factor
+        self.incremental_resize = incremental_resize
         self.slots: list[Chain[K, V]] = [self.chain() for _ in range(self.size)]
+
+        # The table being drained while an incremental resize is in progress.
+        # Its chains before `_rehash_idx` have already been moved.
+        self._old_slots: list[Chain[K, V]] | None = None
+        self._old_size = 0
+        self._rehash_idx = 0
+
         if mapping_or_iterable is not None:
             self.update(mapping_or_iterable)
 
     def __iter__(self) -> Iterator[K]:
+        if self._old_slots is not None:
+            for chain in self._old_slots[self._rehash_idx :]:
+                for item in chain:
+                    yield item.key
         for chain in self.slots:
             for item in chain:
                 yield item.key
 
-    def __getitem__(self, key: K) -> V:
-        h = self._hash_func(key)
-        idx = h % self.size
-
-        chain = self.slots[idx]
-        return chain.find(key, h).value
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        chain = self._chain_for(hash_)
+        return chain.find(key, hash_).value
 
-    def __setitem__(self, key: K, value: V) -> None:
-        h = self._hash_func(key)
-        idx = h % self.size
-        hash_entry = HashEntry(h, key, value)
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        hash_entry = HashEntry(hash_, key, value)
 
-        chain = self.slots[idx]
+        chain = self._chain_for(hash_)
 
         chain_length_before = len(chain)
         chain.insert(hash_entry)
@@ -53,36 +101,114 @@ class SeparateChainingHashMap(BaseHashMap[K, V]):
         if chain_length_before != chain_length_after:
             self._len += 1
 
+            if self._old_slots is not None:
+                self._migrate(self._rehash_step)
             if self._need_increase(chain_length_after):
                 self._increase_size()
 
-    def __delitem__(self, key: K) -> None:
-        h = self._hash_func(key)
-        idx = h % self.size
-
-        chain = self.slots[idx]
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        chain = self._chain_for(hash_)
 
         chain_length_before = len(chain)
-        chain.delete(key, h)
+        chain.delete(key, hash_)
         chain_length_after = len(chain)
 
         if chain_length_before != chain_length_after:
             self._len -= 1
 
+            if self._old_slots is not None:
+                self._migrate(self._rehash_step)
+            if self._need_decrease():
+                self._decrease_size()
+
     def __sizeof__(self) -> int:
         instance_size = super().__sizeof__()
         pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        chains = self.slots
+        if self._old_slots is not None:
+            # The old chains before `_rehash_idx` are already in `slots`.
+            chains = self._old_slots[self._rehash_idx :] + chains
         items_size = sum(
             pointer_size + sum(pointer_size * 3 for _hash_entry in bucket)
-            for bucket in self.slots
+            for bucket in chains
         )
         return instance_size + items_size
 
     def _need_increase(self, chain_size: int) -> bool:
-        return chain_size >= self._max_chain_size
+        return self.resize_policy.need_increase(self, chain_size)
+
+    def chain_length_histogram(self) -> Counter[int]:
+        """Return how many chains there are of each length."""
+        chains = self.slots
+        if self._old_slots is not None:
+            chains = self._old_slots[self._rehash_idx :] + chains
+        return Counter(len(chain) for chain in chains)
+
+    def _histograms(self) -> tuple[Counter[int], Counter[int]]:
+        chains = self.slots
+        if self._old_slots is not None:
+            chains = self._old_slots[self._rehash_idx :] + chains
+        displacements: Counter[int] = Counter()
+        for chain in chains:
+            for item in chain:
+                path = chain.search_path(item.key, item.hash_value)
+                displacements[sum(1 for _ in path) - 1] += 1
+        return self.chain_length_histogram(), displacements
+
+    def _trace(self, key: K, hash_: int) -> tuple[int, int, bool]:
+        probes = comparisons = 0
+        for e in self._chain_for(hash_).search_path(key, hash_):
+            probes += 1
+            if hash_ == e.hash_value:
+                comparisons += 1
+                if is_same(e.key, key):
+                    return probes, comparisons, True
+        return probes, comparisons, False
+
+    def _chain_for(self, hash_: int) -> Chain[K, V]:
+        if self._old_slots is not None:
+            idx = hash_ % self._old_size
+            if idx >= self._rehash_idx:
+                return self._old_slots[idx]
+        return self.slots[hash_ % self.size]
 
     def _increase_size(self) -> None:
-        new_size = self.size * 2
+        self._resize(self.size * 2, self.incremental_resize)
+
+    def _need_decrease(self) -> bool:
+        return (
+            not self._shrink_suspended
+            and self.size > self._min_size
+            and self._len < self.size * self.shrink_factor
+        )
+
+    def _decrease_size(self) -> None:
+        new_size = max(self.size // 2, self._min_size)
+        self._resize(new_size, self.incremental_resize)
+
+    def reserve(self, n: int) -> None:
+        new_size = self.size
+        while n >= new_size * self.resize_policy.max_load_factor:
+            new_size *= 2
+        if new_size != self.size:
+            self._resize(new_size)
+
+    def shrink_to_fit(self) -> None:
+        """
+        Halve the table while the items still fit under the policy's
+        `max_load_factor`.
+        """
+        max_load_factor = self.resize_policy.max_load_factor
+        new_size = self.size
+        while (
+            new_size // 2 >= self._min_size
+            and self._len < new_size // 2 * max_load_factor
+        ):
+            new_size //= 2
+        self._resize(new_size)
+
+    def _rehash(self, new_size: int) -> None:
+        self._finish_rehash()
         new_slots = [self.chain() for _ in range(new_size)]
 
         for chain in self.slots:
@@ -93,6 +219,61 @@ class SeparateChainingHashMap(BaseHashMap[K, V]):
         self.slots = new_slots
         self.size = new_size
 
+    def _start_rehash(self, new_size: int) -> None:
+        """
+        Switch to an empty table of `new_size` and keep the current one around
+        until `_migrate()` has moved all of its chains over.
+        """
+        self._finish_rehash()
+        self._old_slots = self.slots
+        self._old_size = self.size
+        self._rehash_idx = 0
+        self.slots = [self.chain() for _ in range(new_size)]
+        self.size = new_size
+
+    def _migrate(self, n_chains: int) -> None:
+        """Move the items of the next `n_chains` chains of the old table."""
+        old_slots = cast(list[Chain[K, V]], self._old_slots)
+        stop = min(self._rehash_idx + n_chains, self._old_size)
+        for chain in old_slots[self._rehash_idx : stop]:
+            for item in chain:
+                self.slots[item.hash_value % self.size].append_at_end(item)
+        self._rehash_idx = stop
+        if stop == self._old_size:
+            self._old_slots = None
+
+    def _finish_rehash(self) -> None:
+        if self._old_slots is not None:
+            self._migrate(self._old_size)
+
+    def _snapshot(self) -> tuple[array[int], array[int], list[K], list[V]]:
+        """
+        Return the length of every chain, followed by the hashes, keys and
+        values of all items, chain after chain.
+        """
+        self._finish_rehash()
+        lengths = array("q", map(len, self.slots))
+        hashes: array[int] = array("q")
+        keys: list[K] = []
+        values: list[V] = []
+        for chain in self.slots:
+            for item in chain.rebuild_order():
+                hashes.append(item.hash_value)
+                keys.append(item.key)
+                values.append(item.value)
+        return lengths, hashes, keys, values
+
+    def _load_snapshot(self, snapshot: Any) -> None:
+        lengths, hashes, keys, values = snapshot
+        items = map(HashEntry, hashes, keys, values)
+        self.slots = []
+        for length in lengths:
+            chain = self.chain()
+            for item in islice(items, length):
+                chain.append_at_end(item)
+            self.slots.append(chain)
+        self._old_slots = None
+
 
 class DynamicArrayHashMap(SeparateChainingHashMap[K, V]):
     chain: type[DynamicArray[K, V]] = DynamicArray
@@ -104,3 +285,41 @@ class LinkedListHashMap(SeparateChainingHashMap[K, V]):
 
 class BSTHashMap(SeparateChainingHashMap[Comp_K, V]):
     chain: type[BinarySearchTree[Comp_K, V]] = BinarySearchTree
+
+
+class AVLTreeHashMap(SeparateChainingHashMap[Comp_K, V]):
+    chain: type[AVLTree[Comp_K, V]] = AVLTree
+
+
+class AdaptiveHashMap(SeparateChainingHashMap[K, V]):
+    """
+    Every chain is a small `DynamicArray` which turns into an `AVLTree` when
+    it grows long and its keys are comparable.
+
+    The default `max_chain_size` is larger than in the other classes so that
+    colliding keys are handled by the tree instead of by resizing.
+    """
+
+    chain: type[AdaptiveChain[K, V]] = AdaptiveChain
+
+    def __init__(
+        self,
+        mapping_or_iterable: HashMapArgument[K, V] | None = None,
+        /,
+        *,
+        initial_size: int = 40,
+        max_chain_size: int = 64,
+        shrink_factor: float | None = None,
+        incremental_resize: bool = False,
+        resize_policy: ResizePolicy | None = None,
+        hash_strategy: HashStrategy | None = None,
+    ) -> None:
+        super().__init__(
+            mapping_or_iterable,
+            initial_size=initial_size,
+            max_chain_size=max_chain_size,
+            shrink_factor=shrink_factor,
+            incremental_resize=incremental_resize,
+            resize_policy=resize_policy,
+            hash_strategy=hash_strategy,
+        )
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping
+from functools import cache
+from typing import Any, Generic
+
+from .base import BaseHashMap, K, V
+from .hashing import _GOLDEN_RATIO, _MASK64, HashStrategy
+from .open_addressing import LinearProbingHashMap
+
+_MISSING: Any = object()
+
+
+def _rcu_resize(
+    self: BaseHashMap[Any, Any], new_size: int, incremental: bool = False
+) -> None:
+    """
+    Resize a copy of the hashmap and leave it in `_successor` for its shard to
+    publish. The table which readers may still be probing is left as it is.
+    """
+    successor = self._successor  # type: ignore[attr-defined]
+    if successor is None:
+        successor = object.__new__(type(self))
+        successor.__dict__.update(self.__dict__)
+        self._successor = successor  # type: ignore[attr-defined]
+    base = self._rcu_base  # type: ignore[attr-defined]
+    base._resize(successor, new_size, incremental)
+
+
+@cache
+def rcu_class(cls: type[BaseHashMap[Any, Any]]) -> type[BaseHashMap[Any, Any]]:
+    """
+    Return the subclass of `cls` which never resizes its table in place.
+
+    Every hashmap calls `_resize()` as the last step of the operation which
+    needs it, so the shard can swap the old hashmap for the resized one right
+    after the operation returns.
+    """
+    namespace = {
+        "__qualname__": cls.__qualname__,
+        "__module__": cls.__module__,
+        "_rcu_base": cls,
+        "_successor": None,
+        "_resize": _rcu_resize,
+    }
+    return type(cls.__name__, (cls,), namespace)
+
+
+class _Shard(Generic[K, V]):
+    __slots__ = ("map", "lock", "version")
+
+    def __init__(self, hashmap: BaseHashMap[K, V]) -> None:
+        self.map = hashmap
+        self.lock = threading.Lock()
+        # Odd while a writer is changing the shard.
+        self.version = 0
+
+
+class ShardedHashMap(MutableMapping[K, V]):
+    """
+    A thread-safe hashmap which spreads its keys over `shards` hashmaps of
+    `shard_class`, each with its own lock, so that threads working on
+    different shards don't wait for each other.
+
+    The shard of a key is picked by the high bits of its hash multiplied by
+    the golden ratio, which don't overlap with the low bits the shard uses to
+    find its slot.
+
+    Writers take the lock of their shard. Readers don't: they run the lookup
+    and check that no writer touched the shard in the meantime, and only
+    retry under the lock if one did. Lookups in caches such as `LRUHashMap`
+    change their order and counters, so with those shard classes readers
+    take the lock as well. Shards never resize their table in
+    place; the resized copy replaces the old hashmap in a single assignment,
+    RCU-style, so a reader which is still probing the old table sees it
+    intact.
+
+    `setdefault()`, `pop()`, `popitem()`, `update_if()` and
+    `compute_if_absent()` are atomic. Iteration takes a copy of the keys of
+    one shard at a time, so it never fails because of concurrent writers but
+    may or may not see their changes.
+    """
+
+    def __init__(
+        self,
+        mapping_or_iterable: Mapping[K, V] | Iterable[tuple[K, V]] | None = None,
+        /,
+        *,
+        shards: int = 16,
+        shard_class: type[BaseHashMap[Any, Any]] = LinearProbingHashMap,
+        hash_strategy: HashStrategy | None = None,
+        **shard_kwargs: Any,
+    ) -> None:
+        if not (isinstance(shards, int) and shards > 0 and shards & (shards - 1) == 0):
+            raise ValueError("shards must be a power of two.")
+        if hash_strategy is None:
+            hash_strategy = hash
+        self.hash_strategy = hash_strategy
+        self.shard_class = shard_class
+        self._locked_reads = shard_class._mutating_reads
+        self._shard_kwargs = shard_kwargs
+        self._shift = 64 - (shards.bit_length() - 1)
+        self._shards = [_Shard(self._new_shard_map()) for _ in range(shards)]
+
+        if mapping_or_iterable is not None:
+            self.update(mapping_or_iterable)
+
+    def __repr__(self) -> str:
+        class_name = self.__class__.__name__
+        items = ", ".join(f"{k!r}: {v!r}" for k, v in self.items())
+        return f"{class_name}({{{items}}})"
+
+    def __len__(self) -> int:
+        if self._locked_reads:
+            # `len()` drops the expired items of a `TTLHashMap`.
+            total = 0
+            for shard in self._shards:
+                with shard.lock:
+                    total += len(shard.map)
+            return total
+        return sum(len(shard.map) for shard in self._shards)
+
+    def __iter__(self) -> Iterator[K]:
+        for shard in self._shards:
+            with shard.lock:
+                keys = list(shard.map)
+            yield from keys
+
+    def __getitem__(self, key: K) -> V:
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        version = shard.version
+        if not (version & 1 or self._locked_reads):
+            # A writer may leave the table in an inconsistent state for a
+            # moment, in which the lookup can fail in any way. Its result only
+            # counts if the version hasn't changed.
+            try:
+                value = shard.map._get_hashed(key, hash_)
+            except Exception:
+                if shard.version == version:
+                    raise
+            else:
+                if shard.version == version:
+                    return value
+        with shard.lock:
+            return shard.map._get_hashed(key, hash_)
+
+    def __setitem__(self, key: K, value: V) -> None:
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        with shard.lock:
+            self._begin_write(shard)
+            try:
+                shard.map._set_hashed(key, hash_, value)
+            finally:
+                self._end_write(shard)
+
+    def __delitem__(self, key: K) -> None:
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        with shard.lock:
+            self._begin_write(shard)
+            try:
+                shard.map._del_hashed(key, hash_)
+            finally:
+                self._end_write(shard)
+
+    def setdefault(self, key: K, default: V = None) -> V:  # type: ignore[assignment]
+        return self.compute_if_absent(key, lambda _: default)
+
+    def pop(self, key: K, default: V = _MISSING) -> V:
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        with shard.lock:
+            try:
+                value = shard.map._get_hashed(key, hash_)
+            except KeyError:
+                if default is _MISSING:
+                    raise
+                return default
+            self._begin_write(shard)
+            try:
+                shard.map._del_hashed(key, hash_)
+            finally:
+                self._end_write(shard)
+            return value
+
+    def popitem(self) -> tuple[K, V]:
+        for shard in self._shards:
+            with shard.lock:
+                for key in shard.map:
+                    break
+                else:
+                    continue
+                hash_ = self.hash_strategy(key)
+                value = shard.map._get_hashed(key, hash_)
+                self._begin_write(shard)
+                try:
+                    shard.map._del_hashed(key, hash_)
+                finally:
+                    self._end_write(shard)
+                return key, value
+        raise KeyError("popitem(): hashmap is empty")
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                self._begin_write(shard)
+                shard.map = self._new_shard_map()
+                self._end_write(shard)
+
+    def update_if(self, key: K, predicate: Callable[[V], bool], value: V) -> bool:
+        """
+        Set `key` to `value` if it's in the hashmap and `predicate` returns
+        true for its current value. Return whether it was set.
+        """
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        with shard.lock:
+            try:
+                current = shard.map._get_hashed(key, hash_)
+            except KeyError:
+                return False
+            if not predicate(current):
+                return False
+            self._begin_write(shard)
+            try:
+                shard.map._set_hashed(key, hash_, value)
+            finally:
+                self._end_write(shard)
+            return True
+
+    def compute_if_absent(self, key: K, factory: Callable[[K], V]) -> V:
+        """
+        Return the value of `key`. If it's missing, set it to `factory(key)`
+        first. `factory` runs under the lock of the shard, so it's called at
+        most once per missing key and must not use the hashmap.
+        """
+        hash_ = self.hash_strategy(key)
+        shard = self._shard(hash_)
+        with shard.lock:
+            try:
+                return shard.map._get_hashed(key, hash_)
+            except KeyError:
+                pass
+            value = factory(key)
+            self._begin_write(shard)
+            try:
+                shard.map._set_hashed(key, hash_, value)
+            finally:
+                self._end_write(shard)
+            return value
+
+    def _new_shard_map(self) -> BaseHashMap[K, V]:
+        return rcu_class(self.shard_class)(
+            hash_strategy=self.hash_strategy, **self._shard_kwargs
+        )
+
+    def _shard(self, hash_: int) -> _Shard[K, V]:
+        return self._shards[((hash_ * _GOLDEN_RATIO) & _MASK64) >> self._shift]
+
+    @staticmethod
+    def _begin_write(shard: _Shard[K, V]) -> None:
+        shard.version += 1
+
+    @staticmethod
+    def _end_write(shard: _Shard[K, V]) -> None:
+        """Publish the resized hashmap, if the write left one."""
+        successor = shard.map._successor  # type: ignore[attr-defined]
+        if successor is not None:
+            shard.map = successor
+        shard.version += 1
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import sys
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, cast
+
+from .base import K, V
+from .hashing import KeyedHash
+from .persistent import (
+    _HEADER,
+    _RECORD,
+    _SLOT,
+    MAGIC,
+    MmapHashMap,
+    PickleSerializer,
+    Serializer,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# The smallest table a frozen hashmap gets.
+MIN_SIZE = 8
+
+
+def _attach(name: str) -> SharedMemory:
+    if sys.version_info >= (3, 13):
+        # Only the process which created the segment should unlink it.
+        return SharedMemory(name, track=False)
+    # Before Python 3.13, attaching registers the segment with the resource
+    # tracker, which unlinks it once every process using the tracker has
+    # exited. Processes started by `multiprocessing` share the tracker of their
+    # parent, so the segment outlives them.
+    return SharedMemory(name)
+
+
+class SharedHashMap(MmapHashMap[K, V]):
+    """
+    A read-only `MmapHashMap` kept in a `multiprocessing.shared_memory`
+    segment instead of a file.
+
+    `freeze()` copies any mapping into a new segment, with the same layout as
+    the file of a `MmapHashMap`: a table of hashes and record offsets, then
+    the serialized keys and values. Other processes attach to it by name, or
+    by unpickling the hashmap, which only sends the name, and their lookups
+    read the segment in place: only the records they touch are deserialized,
+    and the table takes the memory of a single copy however many processes
+    use it.
+
+    The hashmap returned by `freeze()` owns the segment, which lives until it
+    calls `unlink()`. `close()` only detaches a process from it.
+    """
+
+    _shm: SharedMemory | None = None
+
+    def __init__(self, name: str, /, *, serializer: Serializer | None = None) -> None:
+        super().__init__(name, flag="r", serializer=serializer)
+
+    @classmethod
+    def freeze(
+        cls,
+        mapping: Mapping[K, V],
+        /,
+        *,
+        resize_factor: float = 0.7,
+        seed: int | None = None,
+        serializer: Serializer | None = None,
+    ) -> SharedHashMap[K, V]:
+        """
+        Copy the items of `mapping` into a new shared memory segment and
+        return the hashmap attached to it. Keys are hashed with a random seed
+        unless `seed` is given.
+        """
+        if not 0.0 < resize_factor < 1.0:
+            raise ValueError("resize_factor must be between 0 and 1.")
+        if serializer is None:
+            serializer = PickleSerializer()
+        hash_strategy = KeyedHash(seed)
+        records = {
+            serializer.dumps(key): serializer.dumps(value)
+            for key, value in mapping.items()
+        }
+        size = max(MIN_SIZE, int(len(records) / resize_factor) + 1)
+        offset = cls._slot_position(size)
+        end = offset + sum(
+            _RECORD.size + len(key_bytes) + len(value_bytes)
+            for key_bytes, value_bytes in records.items()
+        )
+
+        shm = SharedMemory(create=True, size=end)
+        try:
+            buf = shm.buf
+            for key_bytes, value_bytes in records.items():
+                hash_ = hash_strategy(key_bytes)
+                idx = hash_ % size
+                while _SLOT.unpack_from(buf, cls._slot_position(idx))[1]:
+                    idx = (idx + 1) % size
+                _SLOT.pack_into(buf, cls._slot_position(idx), hash_, offset)
+
+                _RECORD.pack_into(buf, offset, len(key_bytes), len(value_bytes))
+                start = offset + _RECORD.size
+                middle = start + len(key_bytes)
+                offset = middle + len(value_bytes)
+                buf[start:middle] = key_bytes
+                buf[middle:offset] = value_bytes
+
+            header = (MAGIC, size, len(records), 0, end, 0, size, hash_strategy.seed)
+            _HEADER.pack_into(buf, 0, *header, resize_factor, 0.0)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+
+        hashmap = cls.__new__(cls)
+        hashmap._shm = shm
+        hashmap.__init__(shm.name, serializer=serializer)  # type: ignore[misc]
+        return hashmap
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        cls = getattr(type(self), "_plain_class", type(self))
+        return _reattach, (cls, self.name, self.serializer)
+
+    @property
+    def name(self) -> str:
+        """The name other processes attach to the segment with."""
+        return self.path
+
+    def close(self) -> None:
+        """Detach from the segment, which stays available to other processes."""
+        cast(SharedMemory, self._shm).close()
+
+    def unlink(self) -> None:
+        """
+        Destroy the segment once every process has closed it. Only the hashmap
+        returned by `freeze()` should call it.
+        """
+        cast(SharedMemory, self._shm).unlink()
+
+    def _map(self) -> None:
+        if self._shm is None:
+            self._shm = _attach(self.path)
+        self._mm = self._shm.buf
+
+    def _refresh(self) -> None:
+        # A frozen segment never changes, so there is nothing to read again.
+        pass
+
+    def _read(self, start: int, stop: int) -> bytes:
+        # Copy the bytes out of the segment, like slicing a mmap does, so that
+        # no view of it outlives `close()`.
+        return self._mm[start:stop].tobytes()
+
+
+def _reattach(
+    cls: type[SharedHashMap[K, V]], name: str, serializer: Serializer
+) -> SharedHashMap[K, V]:
+    """Unpickle a `SharedHashMap` by attaching to its segment again."""
+    return cls(name, serializer=serializer)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .base import BaseHashMap, K, V
+
+
+@dataclass(frozen=True, slots=True)
+class HashMapStats:
+    """
+    A snapshot of the shape of a hashmap, returned by `BaseHashMap.stats()`.
+
+    `length_histogram` maps a length to the number of items found after that
+    many probes (open addressing), or to the number of chains holding that
+    many items (separate chaining). The displacement of an item is the number
+    of slots or chain entries looked at before it, so it's 0 for an item which
+    is found right away.
+
+    `resize_count` and `resize_time` cover every rehash since the hashmap was
+    created, including `compact()`. The time of an incremental resize only
+    counts its start, not the migration spread over later operations.
+    """
+
+    size: int
+    length: int
+    load_factor: float
+    tombstones: int
+    length_histogram: Counter[int]
+    max_displacement: int
+    mean_displacement: float
+    resize_count: int
+    resize_time: float
+
+
+@dataclass(slots=True)
+class HashMapCounters:
+    """
+    Operation counters collected after `BaseHashMap.enable_counters()`.
+
+    A hit is a lookup, update or deletion of a key which is in the hashmap, a
+    miss is one of a key which isn't (inserting a new key is a miss). Probes
+    are the slots or chain entries looked at, comparisons are the keys
+    compared with `is_same()`.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    probes: int = 0
+    comparisons: int = 0
+
+    @property
+    def operations(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def probes_per_operation(self) -> float:
+        return self.probes / self.operations if self.operations else 0.0
+
+    @property
+    def comparisons_per_operation(self) -> float:
+        return self.comparisons / self.operations if self.operations else 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class CacheInfo:
+    """
+    Usage of a cache hashmap, returned by `cache_info()`.
+
+    Only lookups count as hits and misses; membership tests and assignments
+    don't. Evictions are the items dropped to stay within `maxsize`, and
+    expirations the ones dropped because they outlived their time to live.
+    """
+
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    maxsize: int | None
+    currsize: int
+
+
+def displacement_stats(displacements: Counter[int]) -> tuple[int, float]:
+    """Return the max and mean of a histogram of displacements."""
+    total = sum(displacements.values())
+    if not total:
+        return 0, 0.0
+    mean = sum(d * n for d, n in displacements.items()) / total
+    return max(displacements), mean
+
+
+# The methods of the counting subclasses built by `instrumented_class()`.
+# Every operation first retraces the search for its key with `_trace()`, then
+# runs the original implementation.
+
+
+def _get_hashed(self: Any, key: K, hash_: int) -> V:
+    _count(self, key, hash_)
+    return self._plain_class._get_hashed(self, key, hash_)
+
+
+def _set_hashed(self: Any, key: K, hash_: int, value: V) -> None:
+    _count(self, key, hash_)
+    self._plain_class._set_hashed(self, key, hash_, value)
+
+
+def _del_hashed(self: Any, key: K, hash_: int) -> None:
+    _count(self, key, hash_)
+    self._plain_class._del_hashed(self, key, hash_)
+
+
+def _count(hashmap: Any, key: K, hash_: int) -> None:
+    probes, comparisons, found = hashmap._trace(key, hash_)
+    counters: HashMapCounters = hashmap.counters
+    if found:
+        counters.hits += 1
+    else:
+        counters.misses += 1
+    counters.probes += probes
+    counters.comparisons += comparisons
+    export: Callable[[HashMapCounters], None] | None = hashmap._export
+    if export is not None and counters.operations % hashmap._export_interval == 0:
+        export(counters)
+
+
+@cache
+def instrumented_class(
+    cls: type[BaseHashMap[Any, Any]],
+) -> type[BaseHashMap[Any, Any]]:
+    """
+    Return the subclass of `cls` which counts operations.
+
+    It adds no attributes, so `BaseHashMap.enable_counters()` can switch the
+    class of an existing hashmap to it and back. Hashmaps which don't have
+    counters enabled never run any of its code.
+    """
+    namespace = {
+        "__qualname__": cls.__qualname__,
+        "__module__": cls.__module__,
+        "_plain_class": cls,
+        "_get_hashed": _get_hashed,
+        "_set_hashed": _set_hashed,
+        "_del_hashed": _del_hashed,
+    }
+    return type(cls.__name__, (cls,), namespace)
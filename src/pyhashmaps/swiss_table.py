@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import ctypes
+from typing import TYPE_CHECKING, cast
+
+from .base import HashEntry, K, V, is_same
+from .open_addressing import DELETED, EMPTY, NotExist, OpenAddressingHashMap
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+GROUP_WIDTH = 8
+
+# Control bytes. A full slot stores the 7-bit fingerprint of its hash, so the
+# high bit is only ever set for the two markers below.
+CTRL_EMPTY = 0b1000_0000
+CTRL_DELETED = 0b1111_1110
+
+_LSBS = 0x0101010101010101
+_MSBS = 0x8080808080808080
+_MASK64 = (1 << 64) - 1
+_GOLDEN_RATIO = 0x9E3779B97F4A7C15
+
+
+def _fingerprint(hash_: int) -> int:
+    """
+    Return the 7 bits of `hash_` stored in the control byte.
+
+    They are taken from the top of a multiplicative hash so that they don't
+    depend on the low bits which already pick the starting position.
+    """
+    return ((hash_ * _GOLDEN_RATIO) & _MASK64) >> 57
+
+
+class SwissTableHashMap(OpenAddressingHashMap[K, V]):
+    """
+    Open addressing with a separate array of one-byte control words.
+
+    Control bytes are scanned a group at a time by loading `GROUP_WIDTH` of them
+    into a single integer, and only the slots whose fingerprint matches the key
+    are ever dereferenced. Groups are probed linearly.
+    """
+
+    _supports_incremental_resize = False
+
+    def _get_hashed(self, key: K, hash_: int) -> V:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        return cast(HashEntry[K, V], self.slots[idx]).value
+
+    def _set_hashed(self, key: K, hash_: int, value: V) -> None:
+        idx = self._find_index(key, hash_)
+        if idx != -1:
+            cast(HashEntry[K, V], self.slots[idx]).value = value
+            return
+
+        idx = self._find_insert_index(self._ctrl, hash_, self.size)
+        if self._ctrl[idx] == CTRL_DELETED:
+            self._deleted -= 1
+        self._set_ctrl(self._ctrl, self.size, idx, _fingerprint(hash_))
+        self.slots[idx] = HashEntry(hash_, key, value)
+        self._len += 1
+
+        if self._need_increase():
+            self._increase_size()
+
+    def _del_hashed(self, key: K, hash_: int) -> None:
+        idx = self._find_index(key, hash_)
+        if idx == -1:
+            raise KeyError(repr(key))
+        self._set_ctrl(self._ctrl, self.size, idx, CTRL_DELETED)
+        self.slots[idx] = DELETED
+        self._len -= 1
+        self._deleted += 1
+        if self._need_decrease():
+            self._decrease_size()
+
+    def __sizeof__(self) -> int:
+        return super().__sizeof__() + len(self._ctrl)
+
+    def _init_storage(self) -> None:
+        super()._init_storage()
+        self._ctrl = self._empty_ctrl(self.size)
+
+    @staticmethod
+    def _empty_ctrl(size: int) -> bytearray:
+        # The first `GROUP_WIDTH` bytes are mirrored after the end so that a
+        # group starting near the end can be read with a single slice.
+        return bytearray([CTRL_EMPTY]) * (size + GROUP_WIDTH)
+
+    @staticmethod
+    def _set_ctrl(ctrl: bytearray, size: int, idx: int, value: int) -> None:
+        while idx < len(ctrl):
+            ctrl[idx] = value
+            idx += size
+
+    def _find_index(self, key: K, hash_: int) -> int:
+        ctrl, slots, size = self._ctrl, self.slots, self.size
+        pattern = _LSBS * _fingerprint(hash_)
+        pos = hash_ % size
+        while True:
+            group = int.from_bytes(ctrl[pos : pos + GROUP_WIDTH], "little")
+
+            # Sets the high bit of every byte equal to the fingerprint. It may
+            # also flag a byte right after a real match, which is harmless
+            # since every candidate is compared anyway.
+            x = group ^ pattern
+            matches = (x - _LSBS) & ~x & _MSBS
+            while matches:
+                bit = matches & -matches
+                idx = (pos + (bit.bit_length() >> 3) - 1) % size
+                slot = slots[idx]
+                if (
+                    isinstance(slot, HashEntry)
+                    and hash_ == slot.hash_value
+                    and is_same(slot.key, key)
+                ):
+                    return idx
+                matches ^= bit
+
+            # Any EMPTY byte in the group ends the probe sequence.
+            if group & ~(group << 6) & _MSBS:
+                return -1
+            pos = (pos + GROUP_WIDTH) % size
+
+    @staticmethod
+    def _find_insert_index(ctrl: bytearray, hash_: int, size: int) -> int:
+        pos = hash_ % size
+        while True:
+            group = int.from_bytes(ctrl[pos : pos + GROUP_WIDTH], "little")
+            # High bit of every EMPTY or DELETED byte.
+            available = group & ~(group << 7) & _MSBS
+            if available:
+                return (pos + ((available & -available).bit_length() >> 3) - 1) % size
+            pos = (pos + GROUP_WIDTH) % size
+
+    def _rehash(self, new_size: int) -> None:
+        new_slots: list[HashEntry[K, V] | NotExist] = [EMPTY] * new_size
+        new_ctrl = self._empty_ctrl(new_size)
+
+        for item in self.slots:
+            if isinstance(item, HashEntry):
+                h = item.hash_value
+                idx = self._find_insert_index(new_ctrl, h, new_size)
+                self._set_ctrl(new_ctrl, new_size, idx, _fingerprint(h))
+                new_slots[idx] = item
+
+        self.slots = new_slots
+        self._ctrl = new_ctrl
+        self.size = new_size
+        self._deleted = 0
+
+    def _probing_sequence(
+        self, key: K, hash_: int, size: int
+    ) -> Generator[int, None, None]:
+        pos = hash_ % size
+        while True:
+            for i in range(GROUP_WIDTH):
+                yield (pos + i) % size
+            pos = (pos + GROUP_WIDTH) % size
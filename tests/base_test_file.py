@@ -1,13 +1,25 @@
 # type: ignore
 # ruff: noqa
+import pickle
 import unittest
 from typing import TYPE_CHECKING
 
 from src.pyhashmaps.base import BaseHashMap
+from src.pyhashmaps.hashing import FibonacciHash, KeyedHash, SplitMixHash
 
 base = unittest.TestCase if TYPE_CHECKING else object
 
 
+class CountingHash:
+    """A hash strategy which counts how many keys it hashed."""
+
+    calls = 0
+
+    def __call__(self, key):
+        CountingHash.calls += 1
+        return hash(key)
+
+
 class BaseTestCase(base):
     cls: BaseHashMap
 
@@ -95,6 +107,126 @@ class BaseTestCase(base):
         dictionary = {"a": 10, "b": 20, "c": 30}
         self.assertEqual(hashmap, dictionary)
 
+    def test_hash_strategy(self):
+        for strategy in (FibonacciHash(1), SplitMixHash(2), KeyedHash(3)):
+            hashmap = self.cls(initial_size=8, hash_strategy=strategy)
+            for i in range(100):
+                hashmap[i * 64] = i
+                hashmap[i * 64 + 1] = i
+            for i in range(0, 100, 2):
+                del hashmap[i * 64]
+            self.assertEqual(len(hashmap), 150)
+            self.assertEqual(hashmap[6400 - 64], 99)
+            self.assertEqual(hashmap[42 * 64 + 1], 42)
+            self.assertNotIn(0, hashmap)
+            self.assertTrue(1.0 * 64 in hashmap)
+
+    def test_batch_operations(self):
+        hashmap = self.cls({1: "a"}, initial_size=8)
+        rehashes = 0
+        rehash = hashmap._rehash
+
+        def counting_rehash(new_size):
+            nonlocal rehashes
+            rehashes += 1
+            rehash(new_size)
+
+        hashmap._rehash = counting_rehash
+        hashmap.set_many(range(1000), range(1000, 2000))
+        self.assertEqual(rehashes, 1)
+        self.assertEqual(len(hashmap), 1000)
+        self.assertEqual(hashmap[1], 1001)
+
+        self.assertEqual(hashmap.get_many([5, -1, 999], "x"), [1005, "x", 1999])
+        self.assertEqual(hashmap.contains_many([5, -1, 999]), [True, False, True])
+        self.assertEqual(hashmap.delete_many(range(-10, 990)), 990)
+        self.assertEqual(dict(hashmap), {i: i + 1000 for i in range(990, 1000)})
+        self.assertLess(hashmap.size, 1000)
+
+        hashmap.set_many([7, 7], ["first", "last"])
+        self.assertEqual(hashmap[7], "last")
+        with self.assertRaises(ValueError):
+            hashmap.set_many([1, 2], [1])
+
+    def test_stats(self):
+        hashmap = self.cls(initial_size=8)
+        stats = hashmap.stats()
+        self.assertEqual(stats.length, 0)
+        self.assertEqual(stats.resize_count, 0)
+        self.assertEqual(stats.max_displacement, 0)
+
+        for i in range(100):
+            hashmap[i] = i
+        stats = hashmap.stats()
+        self.assertEqual(stats.length, 100)
+        self.assertEqual(stats.size, hashmap.size)
+        self.assertAlmostEqual(stats.load_factor, 100 / hashmap.size)
+        self.assertGreater(stats.resize_count, 0)
+        self.assertGreater(stats.resize_time, 0)
+        self.assertGreaterEqual(stats.max_displacement, stats.mean_displacement)
+
+    def test_counters(self):
+        hashmap = self.cls({i: i for i in range(20)})
+        self.assertIsNone(hashmap.counters)
+        exported = []
+        counters = hashmap.enable_counters(export=exported.append, interval=5)
+        self.assertEqual(type(hashmap).__name__, self.cls.__name__)
+
+        for i in range(10):
+            hashmap[i]
+        self.assertNotIn(101, hashmap)
+        hashmap[100] = 100
+        del hashmap[0]
+        with self.assertRaises(KeyError):
+            del hashmap[500]
+        self.assertEqual(counters.hits, 11)
+        self.assertEqual(counters.misses, 3)
+        self.assertEqual(counters.comparisons, 11)
+        self.assertGreaterEqual(counters.probes, 11)
+        self.assertEqual(counters.operations, 14)
+        self.assertEqual(len(exported), 2)
+
+        self.assertIs(hashmap.disable_counters(), counters)
+        self.assertIs(type(hashmap), self.cls)
+        self.assertIsNone(hashmap.counters)
+        hashmap[1]
+        self.assertEqual(counters.hits, 11)
+        self.assertEqual(dict(hashmap), {i: i for i in [*range(1, 20), 100]})
+        with self.assertRaises(ValueError):
+            hashmap.enable_counters(interval=0)
+
+    def test_pickle(self):
+        hashmap = self.cls(initial_size=8, hash_strategy=SplitMixHash(7))
+        for i in range(100):
+            hashmap[str(i)] = [i]
+        for i in range(0, 100, 3):
+            del hashmap[str(i)]
+        hashmap.enable_counters(export=lambda counters: None)
+
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertIs(type(copy), self.cls)
+        self.assertIsNone(copy.counters)
+        self.assertEqual(copy.hash_strategy, SplitMixHash(7))
+        self.assertEqual(copy.size, hashmap.size)
+        self.assertEqual(list(copy), list(hashmap))
+        self.assertEqual(dict(copy), dict(hashmap))
+        self.assertEqual(
+            copy.stats().length_histogram, hashmap.stats().length_histogram
+        )
+
+        copy["new"] = 1
+        del copy["1"]
+        self.assertEqual(len(copy), len(hashmap))
+        self.assertIn("1", hashmap)
+
+    def test_unpickle_without_hashing(self):
+        hashmap = self.cls({i: i for i in range(50)}, hash_strategy=CountingHash())
+        data = pickle.dumps(hashmap)
+        CountingHash.calls = 0
+        copy = pickle.loads(data)
+        self.assertEqual(CountingHash.calls, 0)
+        self.assertEqual(dict(copy), dict(hashmap))
+
     def test_accidental_same_slot(self):
         """
         hash functions can accidentally collide in a same bucket. This test
@@ -0,0 +1,44 @@
+# type: ignore
+# ruff: noqa
+import json
+import unittest
+
+from benchmarks.compare import compare
+from benchmarks.keys import DISTRIBUTIONS, make_keys
+from benchmarks.operations import OPERATIONS
+from benchmarks.run import FACTORIES, INT_KEY_FACTORIES, run
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_keys(self):
+        for distribution in DISTRIBUTIONS:
+            keys, missing = make_keys(distribution, 100, seed=1)
+            self.assertEqual(len(keys), 100)
+            self.assertEqual(len(set(keys)), 100)
+            self.assertFalse(set(keys) & set(missing))
+            self.assertEqual(make_keys(distribution, 100, seed=1), (keys, missing))
+
+    def test_run(self):
+        report = run(size=20, repeat=1)
+        self.assertIn("LinearProbingHashMap", FACTORIES)
+        # Only "short_strings" isn't made of integers.
+        self.assertEqual(
+            len(report["results"]),
+            (len(FACTORIES) * len(DISTRIBUTIONS) - len(INT_KEY_FACTORIES))
+            * len(OPERATIONS),
+        )
+        for result in report["results"]:
+            if result["operation"] == "resize" and result["class"] == "dict":
+                self.assertIsNone(result["value"])
+            else:
+                self.assertGreaterEqual(result["value"], 0)
+        self.assertEqual(json.loads(json.dumps(report)), report)
+
+    def test_compare(self):
+        old = run(["dict", "LinearProbingHashMap"], ["sequential_ints"], size=20)
+        new = json.loads(json.dumps(old))
+        self.assertEqual(compare(old, new), [])
+        new["results"][0]["value"] = old["results"][0]["value"] * 2 + 1
+        (regression,) = compare(old, new)
+        self.assertEqual(regression["class"], "dict")
+        self.assertGreater(regression["ratio"], 1.1)
@@ -0,0 +1,286 @@
+# type: ignore
+# ruff: noqa
+import pickle
+import random
+import unittest
+from collections import OrderedDict
+
+from src.pyhashmaps.caches import (
+    EXPIRE_BATCH,
+    CacheHashMap,
+    LFUHashMap,
+    LRUHashMap,
+    TTLHashMap,
+)
+from src.pyhashmaps.stats import CacheInfo
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCacheHashMap(unittest.TestCase):
+    def test_creation(self):
+        for maxsize in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                CacheHashMap(maxsize=maxsize)
+        self.assertRaises(ValueError, LRUHashMap, maxsize=None)
+        self.assertRaises(ValueError, LFUHashMap, maxsize=None)
+        self.assertRaises(ValueError, TTLHashMap, ttl=0)
+        cache = CacheHashMap({i: i for i in range(1000)}, maxsize=None)
+        self.assertEqual(len(cache), 1000)
+
+    def test_evicts_in_insertion_order(self):
+        cache = CacheHashMap(maxsize=3)
+        for k in "abcd":
+            cache[k] = k
+        self.assertEqual(cache["b"], "b")
+        cache["c"] = "updated"
+        cache["e"] = "e"
+        self.assertEqual(list(cache), ["c", "d", "e"])
+        self.assertEqual(cache.cache_info().evictions, 2)
+
+    def test_resizes_keep_the_order(self):
+        for incremental in (False, True):
+            cache = CacheHashMap(
+                maxsize=500, initial_size=8, incremental_resize=incremental
+            )
+            for i in range(2000):
+                cache[i] = i
+                if i % 7 == 0:
+                    cache.pop(i - 3, None)
+            self.assertEqual(len(cache), 500)
+            self.assertGreater(cache.size, 8)
+            self.assertEqual(list(cache), sorted(cache))
+            self.assertEqual(list(cache)[-1], 1999)
+            keys, size = list(cache), cache.size
+            for k in keys[:450]:
+                del cache[k]
+            self.assertLess(cache.size, size)
+            self.assertEqual(list(cache), keys[450:])
+            self.assertEqual(dict(cache), {k: k for k in keys[450:]})
+
+    def test_cache_info(self):
+        cache = LRUHashMap({"a": 1}, maxsize=2)
+        cache["a"]
+        cache.get("b")
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        cache["b"] = cache["c"] = 2
+        self.assertEqual(
+            cache.cache_info(),
+            CacheInfo(
+                hits=1, misses=1, evictions=1, expirations=0, maxsize=2, currsize=2
+            ),
+        )
+
+    def test_batches_keep_the_given_order(self):
+        keys = [f"k{i}" for i in range(10)]
+        cache = LRUHashMap(maxsize=3)
+        cache.set_many(keys, range(10))
+        self.assertEqual(list(cache), ["k7", "k8", "k9"])
+
+        cache = LRUHashMap({50: 50, 3: 3, 1: 1}, maxsize=3)
+        self.assertEqual(cache.get_many([50, 3, 1]), [50, 3, 1])
+        cache[4] = 4
+        self.assertEqual(list(cache), [3, 1, 4])
+        self.assertEqual(cache.contains_many([3, 2]), [True, False])
+        self.assertEqual(cache.cache_info().hits, 3)
+
+        cache = LFUHashMap(maxsize=4)
+        cache.set_many(range(100_000), range(100_000))
+        self.assertEqual(list(cache), list(range(99_996, 100_000)))
+        self.assertLess(cache.size, 100)
+
+    def test_pop_is_not_a_use(self):
+        for cache in (
+            CacheHashMap({"a": 1, "b": 2, "c": 3}),
+            LRUHashMap({"a": 1, "b": 2, "c": 3}),
+            LFUHashMap({"a": 1, "b": 2, "c": 3}),
+            TTLHashMap({"a": 1, "b": 2, "c": 3}, ttl=60),
+        ):
+            self.assertEqual(cache.pop("b"), 2)
+            self.assertEqual(cache.pop("b", None), None)
+            with self.assertRaises(KeyError):
+                cache.pop("b")
+            self.assertEqual(cache.popitem(), ("a", 1))
+            info = cache.cache_info()
+            self.assertEqual((info.hits, info.misses, info.currsize), (0, 0, 1))
+            self.assertEqual(cache.popitem(), ("c", 3))
+            self.assertRaises(KeyError, cache.popitem)
+
+        cache = LFUHashMap({"a": 1, "b": 2})
+        cache["b"]
+        cache.pop("a")
+        self.assertEqual(cache.frequency("b"), 2)
+        self.assertEqual(cache._frequencies.next.count, 2)
+
+class TestLRUHashMap(unittest.TestCase):
+    def test_against_ordered_dict(self):
+        rng = random.Random(0)
+        cache = LRUHashMap(maxsize=50, initial_size=8)
+        expected = OrderedDict()
+        for i in range(5000):
+            k = rng.randrange(200)
+            op = rng.random()
+            if op < 0.4:
+                cache[k] = expected[k] = i
+                expected.move_to_end(k)
+                if len(expected) > 50:
+                    expected.popitem(last=False)
+            elif op < 0.8:
+                self.assertEqual(cache.get(k), expected.get(k))
+                if k in expected:
+                    expected.move_to_end(k)
+            elif k in expected:
+                del cache[k]
+                del expected[k]
+            self.assertEqual(len(cache), len(expected))
+        self.assertEqual(list(cache.items()), list(expected.items()))
+
+    def test_membership_does_not_promote(self):
+        cache = LRUHashMap({"a": 1, "b": 2}, maxsize=2)
+        self.assertIn("a", cache)
+        cache["c"] = 3
+        self.assertEqual(list(cache), ["b", "c"])
+        cache["b"]
+        cache["d"] = 4
+        self.assertEqual(list(cache), ["b", "d"])
+        self.assertEqual(list(cache.items()), [("b", 2), ("d", 4)])
+        self.assertEqual(list(cache.values()), [2, 4])
+        self.assertIn(("b", 2), cache.items())
+        self.assertNotIn(("b", 3), cache.items())
+        self.assertEqual(repr(cache), "LRUHashMap({'b': 2, 'd': 4})")
+        self.assertEqual(cache.cache_info().hits, 1)
+
+    def test_pickle_keeps_the_order(self):
+        cache = LRUHashMap({i: str(i) for i in range(10)}, maxsize=10)
+        cache[3]
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(list(copy.items()), list(cache.items()))
+        copy[10] = "10"
+        self.assertNotIn(0, copy)
+        self.assertEqual(copy.maxsize, 10)
+
+
+class TestLFUHashMap(unittest.TestCase):
+    def test_evicts_the_least_frequently_used(self):
+        cache = LFUHashMap(maxsize=3)
+        for k in "abc":
+            cache[k] = k
+        cache["a"], cache["a"], cache["b"]
+        cache["d"] = "d"
+        self.assertNotIn("c", cache)
+        self.assertEqual(
+            {k: cache.frequency(k) for k in cache}, {"a": 3, "b": 2, "d": 1}
+        )
+        # Among the items used as rarely, the least recent one goes first.
+        cache["d"]
+        cache["b"] = "updated"
+        cache["e"] = "e"
+        self.assertEqual(list(cache), ["e", "a", "b"])
+        with self.assertRaises(KeyError):
+            cache.frequency("d")
+
+    def test_frequency_nodes(self):
+        cache = LFUHashMap({i: i for i in range(5)}, maxsize=10)
+        for _ in range(3):
+            cache[0]
+        cache[1]
+        counts = []
+        node = cache._frequencies.next
+        while node is not cache._frequencies:
+            counts.append((node.count, len(node.entries)))
+            node = node.next
+        self.assertEqual(counts, [(1, 3), (2, 1), (4, 1)])
+        del cache[0]
+        self.assertEqual(cache._frequencies.prev.count, 2)
+
+    def test_against_reference(self):
+        rng = random.Random(1)
+        cache = LFUHashMap(maxsize=20, initial_size=8)
+        counts, last_use = {}, {}
+        for i in range(3000):
+            k = rng.randrange(60)
+            if rng.random() < 0.5:
+                if k not in counts and len(counts) == 20:
+                    victim = min(counts, key=lambda x: (counts[x], last_use[x]))
+                    del counts[victim]
+                counts[k] = counts.get(k, 0) + 1
+                last_use[k] = i
+                cache[k] = i
+            elif k in counts:
+                counts[k] += 1
+                last_use[k] = i
+                cache[k]
+        self.assertEqual({k: cache.frequency(k) for k in cache}, counts)
+
+    def test_pickle_keeps_frequencies(self):
+        cache = LFUHashMap({i: i for i in range(10)}, maxsize=10)
+        for i in range(10):
+            for _ in range(i % 4):
+                cache[i]
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(list(copy), list(cache))
+        self.assertEqual(
+            [copy.frequency(k) for k in copy], [cache.frequency(k) for k in cache]
+        )
+        copy[10] = 10
+        self.assertNotIn(0, copy)
+
+
+class TestTTLHashMap(unittest.TestCase):
+    def test_items_expire(self):
+        timer = FakeTimer()
+        cache = TTLHashMap(ttl=10, timer=timer)
+        cache["a"] = 1
+        timer.now = 5
+        cache["b"] = 2
+        timer.now = 9
+        cache["a"] = 3
+        timer.now = 15
+        self.assertEqual(dict(cache), {"a": 3})
+        self.assertNotIn("b", cache)
+        timer.now = 19
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual(cache.cache_info().expirations, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_expiry_is_lazy(self):
+        timer = FakeTimer()
+        cache = TTLHashMap({i: i for i in range(10)}, ttl=1, timer=timer)
+        timer.now = 1
+        cache["new"] = 0
+        self.assertEqual(cache._len, 11 - EXPIRE_BATCH)
+        cache.expire()
+        self.assertEqual(cache._len, 1)
+        self.assertEqual(cache.cache_info().expirations, 10)
+
+    def test_maxsize_evicts_the_oldest(self):
+        timer = FakeTimer()
+        cache = TTLHashMap(ttl=10, maxsize=2, timer=timer)
+        cache["a"] = cache["b"] = 1
+        cache["a"] = 2
+        cache["c"] = 3
+        self.assertEqual(list(cache), ["a", "c"])
+        self.assertEqual(cache.cache_info().evictions, 1)
+
+    def test_pickle_keeps_the_time_left(self):
+        timer = FakeTimer()
+        cache = TTLHashMap(ttl=10, timer=timer)
+        cache["a"] = 1
+        timer.now = 4
+        cache["b"] = 2
+        self.assertEqual(list(cache._snapshot()[3]), [6.0, 10.0])
+
+        copy = pickle.loads(pickle.dumps(cache))
+        copy.timer.now = 11
+        self.assertEqual(dict(copy), {"b": 2})
+        self.assertEqual(len(cache), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# type: ignore
+# ruff: noqa
+import pickle
+import unittest
+
+from src.pyhashmaps.compact import IX_DELETED, IX_EMPTY, CompactHashMap
+
+from .test_open_addressing_hashmap import (
+    QuadraticProbingTests,
+    TestOpenAddressingHashMap,
+)
+
+
+class TestCompactHashMap(
+    QuadraticProbingTests, TestOpenAddressingHashMap, unittest.TestCase
+):
+    cls = CompactHashMap
+
+    def test_insertion_order(self):
+        keys = [(i * 7919) % 1000 for i in range(1000)]
+        hashmap = self.cls(initial_size=8)
+        for k in keys:
+            hashmap[k] = k
+        self.assertGreater(hashmap.size, 8)
+        self.assertEqual(list(hashmap), keys)
+        self.assertEqual(list(reversed(hashmap)), keys[::-1])
+
+        hashmap[keys[0]] = "updated"
+        del hashmap[keys[1]]
+        hashmap[keys[1]] = "again"
+        self.assertEqual(list(hashmap), [keys[0]] + keys[2:] + [keys[1]])
+        self.assertEqual(hashmap[keys[0]], "updated")
+
+        for k in keys[2:900]:
+            del hashmap[k]
+        self.assertEqual(list(hashmap), [keys[0]] + keys[900:] + [keys[1]])
+
+    def test_iteration_skips_the_table(self):
+        hashmap = self.cls({i: i for i in range(5)}, initial_size=1024)
+        hashmap._indices = None
+        self.assertEqual(list(hashmap), list(range(5)))
+
+    def test_index_typecode(self):
+        hashmap = self.cls(initial_size=8)
+        self.assertEqual(hashmap._indices.itemsize, 1)
+        for i in range(200):
+            hashmap[i] = i
+        self.assertEqual(hashmap.size, 512)
+        self.assertEqual(hashmap._indices.itemsize, 2)
+        hashmap.reserve(100_000)
+        self.assertEqual(hashmap._indices.itemsize, 4)
+        self.assertEqual(dict(hashmap), {i: i for i in range(200)})
+
+    def test_resize_keeps_entries(self):
+        hashmap = self.cls({i: i for i in range(10)}, initial_size=16)
+        entries = list(hashmap._entries)
+        del hashmap[3]
+        self.assertIsNone(hashmap._entries[3])
+        hashmap.compact()
+        self.assertEqual(hashmap._entries, entries[:3] + entries[4:])
+        self.assertNotIn(IX_DELETED, hashmap._indices)
+        self.assertEqual(
+            sorted(ix for ix in hashmap._indices if ix != IX_EMPTY), list(range(9))
+        )
+
+    def test_popitem_and_set_many(self):
+        hashmap = self.cls()
+        hashmap.set_many([5, 3, 9, 1], "abcd")
+        self.assertEqual(
+            list(hashmap.items()), [(5, "a"), (3, "b"), (9, "c"), (1, "d")]
+        )
+        self.assertEqual(hashmap.popitem(), (1, "d"))
+        self.assertEqual(list(hashmap), [5, 3, 9])
+        hashmap.clear()
+        self.assertRaises(KeyError, hashmap.popitem)
+
+    def test_pickle_keeps_order(self):
+        hashmap = self.cls({i: i for i in range(10)})
+        del hashmap[3]
+        hashmap[3] = "last"
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual(list(copy), list(hashmap))
+        self.assertEqual(copy._entries, hashmap._entries)
+        self.assertEqual(copy._indices, hashmap._indices)
@@ -0,0 +1,119 @@
+# type: ignore
+# ruff: noqa
+import pickle
+import random
+import unittest
+
+from src.pyhashmaps.base import HashEntry
+from src.pyhashmaps.cuckoo import BUCKET_SIZE, STASH_SIZE, CuckooHashMap
+from src.pyhashmaps.open_addressing import DELETED
+
+from .base_test_file import BaseTestCase, CountingHash
+
+
+class TestCuckooHashMap(BaseTestCase, unittest.TestCase):
+    cls = CuckooHashMap
+
+    def test_creation(self):
+        self.assertEqual(self.cls(initial_size=1).size, BUCKET_SIZE)
+        self.assertEqual(self.cls(initial_size=20).size, 32)
+        self.assertEqual(len(self.cls(ways=3)._hash_functions), 3)
+        self.assertRaises(ValueError, self.cls, initial_size=0)
+        self.assertRaises(ValueError, self.cls, ways=1)
+        self.assertRaises(ValueError, self.cls, incremental_resize=True)
+
+    def test_against_dict(self):
+        for ways in (2, 3):
+            rng = random.Random(ways)
+            hashmap = self.cls(initial_size=8, ways=ways)
+            expected = {}
+            for i in range(5000):
+                k = rng.randrange(500)
+                if rng.random() < 0.6:
+                    hashmap[k] = expected[k] = i
+                elif k in expected:
+                    del hashmap[k]
+                    del expected[k]
+            self.assertEqual(dict(hashmap), expected)
+            self.assertEqual(len(hashmap), len(expected))
+            self.assertNotIn(DELETED, hashmap.slots)
+            self.assertEqual(hashmap.stats().tombstones, 0)
+
+    def test_lookups_are_bounded(self):
+        hashmap = self.cls(initial_size=1024, resize_factor=0.95)
+        keys = [str(i) for i in range(900)]
+        for k in keys:
+            hashmap[k] = k
+        self.assertEqual(hashmap.size, 1024)
+        bound = 2 * BUCKET_SIZE + len(hashmap._stash)
+        self.assertLessEqual(len(hashmap._stash), STASH_SIZE)
+        for k in keys:
+            probes, _, found = hashmap._trace(k, hash(k))
+            self.assertTrue(found)
+            self.assertLessEqual(probes, bound)
+        for k in map(str, range(1000, 2000)):
+            self.assertEqual(hashmap._trace(k, hash(k))[0], bound)
+        self.assertEqual(max(hashmap.stats().length_histogram), bound)
+
+    def test_stash(self):
+        hashmap = self.cls(initial_size=64, hash_strategy=lambda key: 0)
+        for i in range(10):
+            hashmap[i] = i
+        in_table = BUCKET_SIZE * len(set(hashmap._buckets(0, hashmap.size)))
+        self.assertEqual(len(hashmap._stash), 10 - in_table)
+        self.assertEqual(dict(hashmap), {i: i for i in range(10)})
+        for item in hashmap._stash:
+            hashmap[item.key] = "updated"
+        self.assertEqual(list(hashmap.values()).count("updated"), 10 - in_table)
+
+        stashed = len(hashmap._stash)
+        table_key = next(s.key for s in hashmap.slots if isinstance(s, HashEntry))
+        del hashmap[table_key]
+        # The freed slot goes to an item of the stash.
+        self.assertEqual(len(hashmap._stash), stashed - 1)
+        del hashmap[hashmap._stash[0].key]
+        self.assertEqual(len(hashmap._stash), stashed - 2)
+        self.assertEqual(len(hashmap), 8)
+
+    def test_many_equal_hashes(self):
+        # Far more keys with the same hash than their buckets and the stash
+        # can hold: they overflow the stash instead of rehashing forever.
+        hashmap = self.cls(hash_strategy=lambda key: 7)
+        for i in range(40):
+            hashmap[i] = i
+        self.assertEqual(dict(hashmap), {i: i for i in range(40)})
+        self.assertLessEqual(len(hashmap._stash), hashmap._max_stash)
+
+    def test_overfull_stash_rehashes(self):
+        hashmap = self.cls({i: i for i in range(20)})
+        stashed = range(100, 101 + STASH_SIZE)
+        hashmap._stash.extend(HashEntry(hash(k), k, k) for k in stashed)
+        hashmap._len += len(stashed)
+        resize_count = hashmap.stats().resize_count
+        hashmap[200] = 200
+        self.assertEqual(hashmap.stats().resize_count, resize_count + 1)
+        self.assertEqual(hashmap._stash, [])
+        self.assertEqual(len(hashmap), 20 + len(stashed) + 1)
+        self.assertEqual(hashmap[100], 100)
+
+    def test_rehash_reuses_hashes(self):
+        hashmap = self.cls({i: i for i in range(50)}, hash_strategy=CountingHash())
+        CountingHash.calls = 0
+        hashmap.reserve(1000)
+        hashmap.shrink_to_fit()
+        self.assertEqual(CountingHash.calls, 0)
+        self.assertEqual(dict(hashmap), {i: i for i in range(50)})
+
+    def test_pickle_keeps_layout(self):
+        hashmap = self.cls({i: i for i in range(40)}, initial_size=64)
+        hashmap._stash.append(HashEntry(hash(-5), -5, "stashed"))
+        hashmap._len += 1
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual(copy.slots, hashmap.slots)
+        self.assertEqual(copy._stash, hashmap._stash)
+        self.assertEqual(copy._hash_functions, hashmap._hash_functions)
+        self.assertEqual(copy[-5], "stashed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+# type: ignore
+# ruff: noqa
+import copy
+import pickle
+import random
+import unittest
+
+from src.pyhashmaps.base import HashEntry
+from src.pyhashmaps.hamt import (
+    BitmapNode,
+    CollisionNode,
+    HAMTBuilder,
+    HAMTHashMap,
+)
+from src.pyhashmaps.hashing import SplitMixHash
+
+
+def count_nodes(node, seen=None):
+    """Return how many nodes of the trie of `node` aren't in `seen`."""
+    if seen is not None and id(node) in seen:
+        return 0
+    children = node.array if isinstance(node, BitmapNode) else []
+    return 1 + sum(
+        count_nodes(child, seen)
+        for child in children
+        if not isinstance(child, HashEntry)
+    )
+
+
+def node_ids(node):
+    ids = {id(node)}
+    if isinstance(node, BitmapNode):
+        for child in node.array:
+            if not isinstance(child, HashEntry):
+                ids |= node_ids(child)
+    return ids
+
+
+class TestHAMTHashMap(unittest.TestCase):
+    def test_mapping(self):
+        hashmap = HAMTHashMap({"a": 1, "b": 2})
+        self.assertEqual(hashmap["a"], 1)
+        self.assertEqual(len(hashmap), 2)
+        self.assertEqual(set(hashmap), {"a", "b"})
+        self.assertNotIn("c", hashmap)
+        self.assertEqual(hashmap, {"a": 1, "b": 2})
+        self.assertEqual(repr(HAMTHashMap([(1, 2)])), "HAMTHashMap({1: 2})")
+        self.assertEqual(len(HAMTHashMap()), 0)
+        with self.assertRaises(KeyError):
+            hashmap["c"]
+        with self.assertRaises(TypeError):
+            hashmap["c"] = 3
+        with self.assertRaises(TypeError):
+            hashmap.set([], 1)
+
+    def test_versions_against_dict(self):
+        rng = random.Random(0)
+        hashmap = HAMTHashMap()
+        expected = {}
+        versions = []
+        for i in range(10000):
+            k = rng.randrange(2000)
+            if rng.random() < 0.6:
+                hashmap = hashmap.set(k, i)
+                expected[k] = i
+            elif k in expected:
+                hashmap = hashmap.delete(k)
+                del expected[k]
+            if i % 1000 == 0:
+                versions.append((hashmap, dict(expected)))
+        for version, items in versions:
+            self.assertEqual(dict(version.items()), items)
+            self.assertEqual(len(version), len(items))
+        with self.assertRaises(KeyError):
+            hashmap.delete(5000)
+
+    def test_structural_sharing(self):
+        hashmap = HAMTHashMap({i: i for i in range(5000)}, hash_strategy=SplitMixHash())
+        total = count_nodes(hashmap._root)
+        seen = node_ids(hashmap._root)
+        updated = hashmap.set(10, "new")
+        # Only the path to the key is copied, and at most 13 levels deep.
+        self.assertLessEqual(count_nodes(updated._root, seen), 4)
+        self.assertLessEqual(count_nodes(hashmap.delete(10)._root, seen), 4)
+        self.assertLessEqual(count_nodes(updated.set(-1, 0)._root, seen), 8)
+        self.assertEqual(count_nodes(updated._root), total)
+        self.assertEqual(hashmap[10], 10)
+        self.assertEqual(updated[10], "new")
+
+        self.assertIs(hashmap.set(10, hashmap[10]), hashmap)
+        self.assertIs(copy.copy(hashmap), hashmap)
+
+    def test_equal_hashes(self):
+        hashmap = HAMTHashMap(hash_strategy=lambda key: key % 3)
+        for i in range(30):
+            hashmap = hashmap.set(i, i)
+        collisions = [
+            child
+            for child in hashmap._root.array
+            if isinstance(child, CollisionNode)
+        ]
+        self.assertEqual(len(collisions), 3)
+        self.assertEqual(dict(hashmap.items()), {i: i for i in range(30)})
+        hashmap = hashmap.set(3, "three")
+        self.assertEqual(hashmap[3], "three")
+
+        for i in range(30):
+            if i % 3:
+                hashmap = hashmap.delete(i)
+        self.assertEqual(set(hashmap), set(range(0, 30, 3)))
+        for i in range(3, 30, 3):
+            hashmap = hashmap.delete(i)
+        # The last entry moves back up to the root.
+        self.assertEqual(hashmap._root.array, [HashEntry(0, 0, 0)])
+        with self.assertRaises(KeyError):
+            hashmap.delete(3)
+
+    def test_deletions_shrink_the_trie(self):
+        keys = range(1000)
+        hashmap = HAMTHashMap({k: k for k in keys}, hash_strategy=SplitMixHash())
+        for k in keys:
+            hashmap = hashmap.delete(k)
+        self.assertEqual(len(hashmap), 0)
+        self.assertEqual(hashmap._root.array, [])
+        self.assertEqual(hashmap._root.bitmap, 0)
+
+    def test_keeps_the_first_key(self):
+        hashmap = HAMTHashMap({1: "a"}).set(1.0, "b")
+        self.assertEqual(list(hashmap.items()), [(1, "b")])
+        self.assertIs(type(next(iter(hashmap))), int)
+
+    def test_update(self):
+        hashmap = HAMTHashMap({"a": 1})
+        updated = hashmap.update({"b": 2, "a": 3})
+        self.assertEqual(hashmap, {"a": 1})
+        self.assertEqual(updated, {"a": 3, "b": 2})
+        self.assertEqual(hashmap.update([("c", 4)]), {"a": 1, "c": 4})
+
+    def test_pickle(self):
+        hashmap = HAMTHashMap(
+            {str(i): i for i in range(500)}, hash_strategy=SplitMixHash(3)
+        )
+        restored = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual(restored, hashmap)
+        self.assertEqual(restored.hash_strategy, hashmap.hash_strategy)
+        self.assertEqual(restored.set("x", 1)["x"], 1)
+
+
+class TestHAMTBuilder(unittest.TestCase):
+    def test_builder(self):
+        hashmap = HAMTHashMap({i: i for i in range(100)})
+        builder = hashmap.builder()
+        self.assertIsInstance(builder, HAMTBuilder)
+        for i in range(50, 150):
+            builder[i] = -i
+        del builder[0]
+        with self.assertRaises(KeyError):
+            del builder[0]
+        self.assertEqual(len(builder), 149)
+        self.assertEqual(builder[120], -120)
+
+        built = builder.build()
+        self.assertEqual(dict(hashmap.items()), {i: i for i in range(100)})
+        expected = {i: i for i in range(1, 50)}
+        expected.update((i, -i) for i in range(50, 150))
+        self.assertEqual(dict(built.items()), expected)
+
+        # The builder goes on without changing what it built.
+        builder[1] = "changed"
+        builder.clear()
+        self.assertEqual(len(builder), 0)
+        self.assertEqual(dict(built.items()), expected)
+        self.assertEqual(builder.build(), {})
+
+    def test_writes_in_place(self):
+        builder = HAMTHashMap({i: i for i in range(1000)}).builder()
+        builder[0] = "copied"
+        seen = node_ids(builder._root)
+        for i in range(1000):
+            builder[0] = i
+        self.assertEqual(count_nodes(builder._root, seen), 0)
+        self.assertIs(builder.build(), builder.build())
+
+    def test_against_dict(self):
+        rng = random.Random(1)
+        builder = HAMTHashMap(hash_strategy=lambda key: key % 97).builder()
+        expected = {}
+        snapshots = []
+        for i in range(5000):
+            k = rng.randrange(1000)
+            if rng.random() < 0.6:
+                builder[k] = expected[k] = i
+            elif k in expected:
+                del builder[k]
+                del expected[k]
+            if i % 500 == 0:
+                snapshots.append((builder.build(), dict(expected)))
+        self.assertEqual(dict(builder.items()), expected)
+        for snapshot, items in snapshots:
+            self.assertEqual(dict(snapshot.items()), items)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+# type: ignore
+# ruff: noqa
+import unittest
+
+from src.pyhashmaps.hashing import FibonacciHash, KeyedHash, SplitMixHash
+from src.pyhashmaps.separate_chaining import DynamicArrayHashMap
+
+
+class TestHashStrategies(unittest.TestCase):
+    strategies = (FibonacciHash, SplitMixHash, KeyedHash)
+
+    def test_equal_keys(self):
+        for cls in self.strategies:
+            strategy = cls()
+            self.assertEqual(strategy(1), strategy(1.0))
+            self.assertEqual(strategy(1), strategy(True))
+            self.assertEqual(strategy("abc"), strategy("abc"))
+
+    def test_keyed_hash(self):
+        strategy = KeyedHash(seed=1)
+        self.assertNotEqual(strategy("a"), strategy(b"a"))
+        self.assertNotEqual(strategy("a"), KeyedHash(seed=2)("a"))
+
+    def test_seed(self):
+        for cls in self.strategies:
+            self.assertEqual(cls(seed=5)("key"), cls(seed=5)("key"))
+            self.assertEqual(cls(seed=5), cls(seed=5))
+            self.assertNotEqual(cls(seed=5)(12345), cls(seed=6)(12345))
+            # Random seeds.
+            self.assertNotEqual(cls().seed, cls().seed)
+
+    def test_range(self):
+        for cls in self.strategies:
+            strategy = cls()
+            for key in (-1, 0, 2**63, -(2**63), "x", b"x", (1, 2)):
+                self.assertTrue(0 <= strategy(key) < 2**63)
+
+    def test_keys_sharing_low_bits(self):
+        keys = [i * 64 for i in range(256)]
+        hashmap = DynamicArrayHashMap(dict.fromkeys(keys), initial_size=64)
+        # With the built-in hash(), they only use the chains at multiples of 64.
+        self.assertGreaterEqual(max(hashmap.chain_length_histogram()), 16)
+
+        for cls in self.strategies:
+            hashmap = DynamicArrayHashMap(
+                dict.fromkeys(keys), initial_size=64, hash_strategy=cls(seed=0)
+            )
+            self.assertLessEqual(max(hashmap.chain_length_histogram()), 10)
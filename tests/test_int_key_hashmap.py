@@ -0,0 +1,211 @@
+# type: ignore
+# ruff: noqa
+import pickle
+import random
+import unittest
+
+from src.pyhashmaps.int_keys import (
+    DELETED_KEY,
+    EMPTY_KEY,
+    IntFloatHashMap,
+    IntIntHashMap,
+    IntKeyHashMap,
+)
+from src.pyhashmaps.hashing import FibonacciHash
+from src.pyhashmaps.open_addressing import DELETED, EMPTY
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestIntKeyHashMap(unittest.TestCase):
+    cls = IntKeyHashMap
+
+    def test_mapping(self):
+        hashmap = self.cls({1: 10, -2: 20})
+        hashmap[3] = 30
+        hashmap[1] = 11
+        del hashmap[-2]
+        self.assertEqual(dict(hashmap), {1: 11, 3: 30})
+        self.assertEqual(len(hashmap), 2)
+        self.assertIn(3, hashmap)
+        self.assertNotIn(-2, hashmap)
+        with self.assertRaises(KeyError):
+            hashmap[-2]
+        with self.assertRaises(KeyError):
+            del hashmap[-2]
+
+    def test_non_integer_keys(self):
+        hashmap = self.cls({1: 1})
+        with self.assertRaises(TypeError):
+            hashmap["1"] = 1
+        with self.assertRaises(TypeError):
+            hashmap[1.5] = 1
+        self.assertNotIn("1", hashmap)
+        self.assertIsNone(hashmap.get(1.5))
+        with self.assertRaises(KeyError):
+            del hashmap["1"]
+
+    def test_special_keys(self):
+        special = [EMPTY_KEY, DELETED_KEY, 1 << 63, -(1 << 80)]
+        hashmap = self.cls()
+        for k in special:
+            hashmap[k] = k
+        hashmap[0] = 0
+        self.assertEqual(len(hashmap), 5)
+        self.assertEqual(set(hashmap), {0, *special})
+        self.assertTrue(all(hashmap[k] == k for k in special))
+        del hashmap[EMPTY_KEY]
+        self.assertNotIn(EMPTY_KEY, hashmap)
+        self.assertEqual(len(hashmap), 4)
+        self.assertEqual(hashmap._keys.count(EMPTY_KEY), hashmap.size - 1)
+
+    def test_against_dict(self):
+        rng = random.Random(0)
+        hashmap = self.cls(initial_size=8)
+        expected = {}
+        for i in range(5000):
+            k = rng.randrange(-300, 300)
+            if rng.random() < 0.6:
+                hashmap[k] = expected[k] = i
+            elif k in expected:
+                del hashmap[k]
+                del expected[k]
+        self.assertEqual(dict(hashmap), expected)
+        self.assertEqual(len(hashmap), len(expected))
+        self.assertEqual(hashmap._deleted, hashmap._keys.count(DELETED_KEY))
+
+    def test_slots(self):
+        hashmap = self.cls({5: 1, 6: 2}, initial_size=8)
+        del hashmap[5]
+        slots = hashmap.slots
+        self.assertIs(slots[5], DELETED)
+        self.assertEqual((slots[6].key, slots[6].value), (6, 2))
+        self.assertIs(slots[7], EMPTY)
+
+    def test_pickle(self):
+        hashmap = self.cls({EMPTY_KEY: 1, 5: 2, 13: 3}, initial_size=8)
+        del hashmap[5]
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertIs(type(copy), self.cls)
+        self.assertEqual(dict(copy), dict(hashmap))
+        self.assertEqual(copy._keys, hashmap._keys)
+
+    def test_no_incremental_resize(self):
+        with self.assertRaises(ValueError):
+            self.cls(incremental_resize=True)
+
+
+class TestIntIntHashMap(TestIntKeyHashMap):
+    cls = IntIntHashMap
+
+    def test_values_are_typed(self):
+        hashmap = self.cls({1: 2})
+        self.assertEqual(hashmap._values.typecode, "q")
+        with self.assertRaises(TypeError):
+            hashmap[3] = "3"
+        self.assertNotIn(3, hashmap)
+        self.assertEqual(len(hashmap), 1)
+        self.assertLess(hashmap.__sizeof__(), IntKeyHashMap({1: 2}).__sizeof__())
+
+
+class TestIntFloatHashMap(TestIntIntHashMap):
+    cls = IntFloatHashMap
+
+    def test_values_are_typed(self):
+        hashmap = self.cls({1: 2})
+        self.assertEqual(hashmap._values.typecode, "d")
+        self.assertEqual(hashmap[1], 2.0)
+        with self.assertRaises(TypeError):
+            hashmap[3] = "3"
+        self.assertNotIn(3, hashmap)
+
+
+@unittest.skipUnless(np is not None, "NumPy is not installed")
+class TestVectorizedOperations(unittest.TestCase):
+    def test_set_many(self):
+        for cls in (IntKeyHashMap, IntIntHashMap, IntFloatHashMap):
+            with self.subTest(cls=cls):
+                hashmap = cls({-1: 0, 7: 0}, initial_size=8)
+                keys = np.array([-1, -2, 7, 100, 7, 2**40])
+                hashmap.set_many(keys, np.arange(6))
+                self.assertEqual(
+                    dict(hashmap), {-1: 0, -2: 1, 7: 4, 100: 3, 2**40: 5}
+                )
+                self.assertEqual(len(hashmap), 5)
+
+    def test_set_many_over_tombstones(self):
+        hashmap = IntIntHashMap(initial_size=64)
+        for i in range(40):
+            hashmap[i] = i
+        for i in range(40):
+            del hashmap[i]
+        keys = np.arange(1000, 1044)
+        hashmap.set_many(keys, keys * 2)
+        self.assertEqual(dict(hashmap), {k: k * 2 for k in keys.tolist()})
+
+    def test_lookups(self):
+        hashmap = IntFloatHashMap()
+        keys = np.arange(-1000, 1000, 3)
+        hashmap.set_many(keys, keys / 2)
+        queries = np.arange(-1100, 1100)
+        expected = {k: k / 2 for k in keys.tolist()}
+        self.assertEqual(
+            hashmap.get_many(queries, -1.0),
+            [expected.get(k, -1.0) for k in queries.tolist()],
+        )
+        self.assertEqual(
+            hashmap.contains_many(queries),
+            [k in expected for k in queries.tolist()],
+        )
+
+    def test_fallbacks(self):
+        # Arrays with keys out of the range of the vectorized path, and other
+        # iterables, go through the generic implementation.
+        hashmap = IntIntHashMap()
+        keys = np.array([EMPTY_KEY, 1, 2**62], dtype=np.int64)
+        hashmap.set_many(keys, [1, 2, 3])
+        self.assertEqual(hashmap.get_many(keys), [1, 2, 3])
+        self.assertEqual(hashmap.contains_many([1, 5]), [True, False])
+
+    def test_other_hash_strategies(self):
+        # Arrays go through the generic implementation, as Python integers.
+        for cls in (IntKeyHashMap, IntIntHashMap):
+            with self.subTest(cls=cls):
+                hashmap = cls({5: 1}, hash_strategy=FibonacciHash(1))
+                self.assertEqual(hashmap.get_many(np.array([5, 6])), [1, None])
+                self.assertEqual(hashmap.contains_many(np.array([5, 6])), [True, False])
+                hashmap.set_many(np.array([7, 2**62], dtype=np.uint64), [2, 3])
+                self.assertEqual(dict(hashmap), {5: 1, 7: 2, 2**62: 3})
+                self.assertTrue(all(type(k) is int for k in hashmap))
+                keys = np.array([2**62, 2**63 + 1], dtype=np.uint64)
+                self.assertEqual(hashmap.get_many(keys), [3, None])
+
+    def test_numpy_scalar_keys(self):
+        for strategy in (None, FibonacciHash(1)):
+            with self.subTest(strategy=strategy):
+                hashmap = IntKeyHashMap({5: "x"}, hash_strategy=strategy)
+                self.assertEqual(hashmap[np.int64(5)], "x")
+                self.assertIn(np.uint8(5), hashmap)
+                hashmap[np.int32(7)] = "y"
+                hashmap[np.uint64(2**63)] = "special"
+                self.assertEqual(hashmap[7], "y")
+                self.assertEqual(hashmap[2**63], "special")
+                self.assertTrue(all(type(k) is int for k in hashmap))
+                del hashmap[np.int64(5)]
+                self.assertNotIn(5, hashmap)
+                with self.assertRaises(TypeError):
+                    hashmap[np.float64(1.0)] = 1
+                self.assertIsNone(hashmap.get(np.float64(7.0)))
+
+    def test_values_must_cast(self):
+        hashmap = IntIntHashMap()
+        with self.assertRaises(TypeError):
+            hashmap.set_many(np.arange(3), np.array([0.5, 1.5, 2.5]))
+        self.assertEqual(len(hashmap), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
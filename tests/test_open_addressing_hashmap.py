@@ -1,11 +1,20 @@
 # type: ignore
 # ruff: noqa
+import pickle
+import random
 import unittest
 
+from src.pyhashmaps.base import HashEntry
 from src.pyhashmaps.open_addressing import (
+    ArrayDoubleHashingHashMap,
+    ArrayLinearProbingHashMap,
+    ArrayQuadraticProbingHashMap,
+    DELETED,
+    EMPTY,
     DoubleHashingHashMap,
     LinearProbingHashMap,
     QuadraticProbingHashMap,
+    RobinHoodHashMap,
 )
 
 from .base_test_file import BaseTestCase
@@ -33,14 +42,392 @@ class TestOpenAddressingHashMap(BaseTestCase):
         self.assertEqual(hashmap.size, 20)
         self.assertEqual(len(hashmap), 8)
 
+    def test_incremental_resize(self):
+        if not self.cls._supports_incremental_resize:
+            self.assertRaises(ValueError, self.cls, incremental_resize=True)
+            return
+        hashmap = self.cls(initial_size=8, incremental_resize=True)
+        hashmap._rehash_step = 1
+        for i in range(6):
+            hashmap[i] = i
+        self.assertEqual(hashmap.size, 16)
+        self.assertEqual(hashmap._old_size, 8)
+        self.assertEqual(dict(hashmap), {i: i for i in range(6)})
+
+        hashmap[6] = 6
+        hashmap[0] = "updated"
+        del hashmap[5]
+        self.assertIsNotNone(hashmap._old_slots)
+        self.assertEqual(sorted(hashmap, key=str), [0, 1, 2, 3, 4, 6])
+        self.assertEqual(hashmap[0], "updated")
+        self.assertEqual(len(hashmap), 6)
+
+        for i in range(7, 100):
+            hashmap[i] = i
+        hashmap._finish_rehash()
+        self.assertIsNone(hashmap._old_slots)
+        self.assertEqual(len(hashmap), 99)
+        self.assertEqual(set(hashmap), set(range(100)) - {5})
+
+    def test_shrink(self):
+        hashmap = self.cls(initial_size=8)
+        for i in range(1000):
+            hashmap[i] = i
+        largest_size = hashmap.size
+        for i in range(990):
+            del hashmap[i]
+        self.assertLess(hashmap.size, largest_size // 8)
+        self.assertEqual(dict(hashmap), {i: i for i in range(990, 1000)})
+
+        hashmap.shrink_to_fit()
+        self.assertEqual(hashmap.size, 16)
+        self.assertEqual(dict(hashmap), {i: i for i in range(990, 1000)})
+
+    def test_shrink_disabled(self):
+        hashmap = self.cls(initial_size=8, shrink_factor=0)
+        for i in range(100):
+            hashmap[i] = i
+        size = hashmap.size
+        for i in range(100):
+            del hashmap[i]
+        self.assertEqual(hashmap.size, size)
+        self.assertRaises(ValueError, self.cls, resize_factor=0.6, shrink_factor=0.3)
+
+    def test_default_shrink_factor(self):
+        self.assertEqual(self.cls().shrink_factor, 0.1)
+        for resize_factor in (0.15, 0.2):
+            hashmap = self.cls(initial_size=8, resize_factor=resize_factor)
+            self.assertLess(hashmap.shrink_factor, resize_factor / 2)
+            for i in range(100):
+                hashmap[i] = i
+            for i in range(95):
+                del hashmap[i]
+            self.assertEqual(dict(hashmap), {i: i for i in range(95, 100)})
+
+    def test_probe_params_match_sequence(self):
+        hashmap = self.cls(initial_size=16)
+        for h in (0, 5, 123456789, -987654321):
+            params = hashmap._probe_params(h, hashmap.size)
+            if params is None:
+                continue
+            idx, stride, increment = params
+            expected = []
+            for _ in range(64):
+                expected.append(idx)
+                idx = (idx + stride) % hashmap.size
+                stride += increment
+            sequence = hashmap._probing_sequence(None, h, hashmap.size)
+            self.assertEqual([next(sequence) for _ in range(64)], expected)
+
+    def test_probing_covers_table(self):
+        if self.cls._power_of_two_size:
+            sizes = (1, 2, 16, 64)
+        else:
+            sizes = (1, 2, 16, 17, 30, 64)
+        hashmap = self.cls()
+        for size in sizes:
+            for h in (0, 5, 123456789, -987654321):
+                sequence = hashmap._probing_sequence(None, h, size)
+                visited = {next(sequence) for _ in range(size)}
+                self.assertEqual(visited, set(range(size)))
+
+    def test_colliding_keys_fill_table(self):
+        hashmap = self.cls(initial_size=64, resize_factor=0.99)
+        # Every key starts probing from slot 0.
+        for i in range(63):
+            hashmap[i * 64] = i
+        self.assertEqual(hashmap.size, 64)
+        self.assertEqual(dict(hashmap), {i * 64: i for i in range(63)})
+
+    def test_stats_probe_lengths(self):
+        hashmap = self.cls(initial_size=16)
+        # The three keys start probing from the same slot.
+        for key in (0, 16, 32):
+            hashmap[key] = key
+        stats = hashmap.stats()
+        if isinstance(hashmap, DoubleHashingHashMap):
+            # 16 and 32 step away from slot 0 with different strides.
+            self.assertEqual(stats.length_histogram, {1: 1, 2: 2})
+            self.assertEqual(stats.max_displacement, 1)
+            self.assertAlmostEqual(stats.mean_displacement, 2 / 3)
+        else:
+            self.assertEqual(stats.length_histogram, {1: 1, 2: 1, 3: 1})
+            self.assertEqual(stats.max_displacement, 2)
+            self.assertEqual(stats.mean_displacement, 1.0)
+
+        counters = hashmap.enable_counters()
+        hashmap[32]
+        self.assertEqual(counters.probes, stats.max_displacement + 1)
+        self.assertEqual(counters.comparisons, 1)
+        del hashmap[16]
+        self.assertEqual(hashmap.stats().tombstones, hashmap._deleted)
+
+    def test_no_generator_on_fast_path(self):
+        hashmap = self.cls(initial_size=8)
+        if hashmap._probe_params(0, 8) is None:
+            return
+
+        def fail(*args):
+            raise AssertionError("the probing generator was used")
+
+        hashmap._probing_sequence = fail
+        for i in range(100):
+            hashmap[i] = i
+        for i in range(0, 100, 2):
+            del hashmap[i]
+        self.assertEqual(hashmap[99], 99)
+        self.assertNotIn(0, hashmap)
+
+    def test_reuse_deleted_slot(self):
+        hashmap = self.cls(initial_size=10)
+        hashmap[1] = "a"
+        del hashmap[1]
+        self.assertEqual(hashmap.slots.count(DELETED), 1)
+        hashmap[1] = "b"
+        self.assertEqual(hashmap.slots.count(DELETED), 0)
+        self.assertEqual(hashmap[1], "b")
+        self.assertEqual(len(hashmap), 1)
+
+    def test_churn_does_not_grow(self):
+        hashmap = self.cls(initial_size=16)
+        for i in range(1000):
+            hashmap[i] = i
+            hashmap.pop(i - 3, None)
+        self.assertEqual(len(hashmap), 3)
+        self.assertEqual(hashmap.size, 16)
+        self.assertEqual(set(hashmap), {997, 998, 999})
+
+    def test_compact(self):
+        hashmap = self.cls(initial_size=32)
+        for i in range(20):
+            hashmap[i] = i
+        for i in range(15):
+            del hashmap[i]
+        self.assertEqual(hashmap.slots.count(DELETED), 15)
+        hashmap.compact()
+        self.assertEqual(hashmap.slots.count(DELETED), 0)
+        self.assertEqual(hashmap.size, 32)
+        self.assertEqual(dict(hashmap), {i: i for i in range(15, 20)})
+
+    def test_pickle_keeps_slots(self):
+        hashmap = self.cls(initial_size=32)
+        for i in range(20):
+            hashmap[i] = i
+        for i in range(0, 20, 2):
+            del hashmap[i]
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual(copy.slots, hashmap.slots)
+        self.assertEqual(copy._deleted, hashmap._deleted)
+
+    def test_pickle_during_incremental_resize(self):
+        if not self.cls._supports_incremental_resize:
+            return
+        hashmap = self.cls(initial_size=8, incremental_resize=True)
+        hashmap._rehash_step = 1
+        for i in range(7):
+            hashmap[i] = i
+        self.assertIsNotNone(hashmap._old_slots)
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertIsNone(copy._old_slots)
+        self.assertEqual(dict(copy), {i: i for i in range(7)})
+
 
 class TestLinearProbingHashMap(TestOpenAddressingHashMap, unittest.TestCase):
     cls = LinearProbingHashMap
 
 
-class TestQuadraticProbingHashMap(TestOpenAddressingHashMap, unittest.TestCase):
+class TestIncrementalLinearProbingHashMap(
+    TestOpenAddressingHashMap, unittest.TestCase
+):
+    class cls(LinearProbingHashMap):
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault("incremental_resize", True)
+            super().__init__(*args, **kwargs)
+
+
+class QuadraticProbingTests:
+    def test_resize(self):
+        hashmap = self.cls(initial_size=16, resize_factor=0.8)
+        for i in range(12):
+            hashmap[i] = None
+        self.assertEqual(hashmap.size, 16)
+        hashmap[12] = None
+        self.assertEqual(hashmap.size, 32)
+        self.assertEqual(len(hashmap), 13)
+
+    def test_size_rounded_up_to_power_of_two(self):
+        self.assertEqual(self.cls(initial_size=10).size, 16)
+        self.assertEqual(self.cls(initial_size=1).size, 1)
+        hashmap = self.cls(initial_size=100)
+        self.assertEqual(hashmap.size, 128)
+        for i in range(200):
+            hashmap[i] = i
+        for i in range(200):
+            del hashmap[i]
+        self.assertEqual(hashmap.size, 128)
+
+
+class TestQuadraticProbingHashMap(
+    QuadraticProbingTests, TestOpenAddressingHashMap, unittest.TestCase
+):
     cls = QuadraticProbingHashMap
 
 
 class TestDoubleHashingHashMap(TestOpenAddressingHashMap, unittest.TestCase):
     cls = DoubleHashingHashMap
+
+
+class TestRobinHoodHashMap(TestOpenAddressingHashMap, unittest.TestCase):
+    cls = RobinHoodHashMap
+
+    def assert_distances(self, hashmap):
+        for idx, slot in enumerate(hashmap.slots):
+            if slot is not EMPTY:
+                home = slot.hash_value % hashmap.size
+                self.assertEqual(hashmap._distances[idx], (idx - home) % hashmap.size)
+
+    def test_reuse_deleted_slot(self):
+        hashmap = self.cls(initial_size=10)
+        hashmap[1] = "a"
+        del hashmap[1]
+        self.assertEqual(hashmap.slots, [EMPTY] * 10)
+        hashmap[1] = "b"
+        self.assertEqual(hashmap[1], "b")
+
+    def test_compact(self):
+        hashmap = self.cls(initial_size=32)
+        for i in range(20):
+            hashmap[i] = i
+        for i in range(15):
+            del hashmap[i]
+        self.assertEqual(hashmap.slots.count(DELETED), 0)
+        hashmap.compact()
+        self.assertEqual(hashmap.size, 32)
+        self.assertEqual(dict(hashmap), {i: i for i in range(15, 20)})
+
+    def test_pickle_keeps_distances(self):
+        hashmap = self.cls({i * 8: i for i in range(5)}, initial_size=8)
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual(copy._distances, hashmap._distances)
+
+    def test_backward_shift_deletion(self):
+        hashmap = self.cls(initial_size=8, resize_factor=0.9)
+        # All of them go to the slot 1.
+        for k in (1, 9, 17, 25):
+            hashmap[k] = k
+        del hashmap[9]
+        self.assertEqual([s.key for s in hashmap.slots[1:4]], [1, 17, 25])
+        self.assertEqual(hashmap._distances[1:4], [0, 1, 2])
+        self.assertIs(hashmap.slots[4], EMPTY)
+        self.assertEqual(dict(hashmap), {1: 1, 17: 17, 25: 25})
+
+    def test_invariant_under_churn(self):
+        hashmap = self.cls(initial_size=8, resize_factor=0.9)
+        for i in range(500):
+            hashmap[i * 7] = i
+            if i % 3 == 0:
+                del hashmap[(i // 2) * 7]
+            self.assert_distances(hashmap)
+        expected = {}
+        for i in range(500):
+            expected[i * 7] = i
+            if i % 3 == 0:
+                del expected[(i // 2) * 7]
+        self.assertEqual(dict(hashmap), expected)
+
+
+class TestArrayOpenAddressingHashMap(TestOpenAddressingHashMap):
+    def test_no_entry_objects(self):
+        hashmap = self.cls({"a": 1, "b": 2})
+        hashmap["a"] = 3
+        self.assertEqual(hashmap._hashes.typecode, "q")
+        self.assertFalse(any(isinstance(k, HashEntry) for k in hashmap._keys))
+        self.assertEqual(
+            {(e.key, e.value) for e in hashmap.slots if isinstance(e, HashEntry)},
+            {("a", 3), ("b", 2)},
+        )
+
+    def test_delete_releases_value(self):
+        hashmap = self.cls()
+        hashmap["a"] = object()
+        del hashmap["a"]
+        self.assertEqual(hashmap._values, [None] * hashmap.size)
+
+
+class TestArrayLinearProbingHashMap(TestArrayOpenAddressingHashMap, unittest.TestCase):
+    cls = ArrayLinearProbingHashMap
+
+
+class TestArrayQuadraticProbingHashMap(
+    QuadraticProbingTests, TestArrayOpenAddressingHashMap, unittest.TestCase
+):
+    cls = ArrayQuadraticProbingHashMap
+
+
+class TestArrayDoubleHashingHashMap(TestArrayOpenAddressingHashMap, unittest.TestCase):
+    cls = ArrayDoubleHashingHashMap
+
+
+class TestClustering(unittest.TestCase):
+    """
+    Quadratic probing and double hashing should break up the runs of occupied
+    slots which linear probing builds, and find keys in fewer probes.
+    """
+
+    @staticmethod
+    def fill(cls):
+        hashmap = cls(initial_size=1024, resize_factor=0.9)
+        keys = random.Random(0).sample(range(10**12), 800)
+        for key in keys:
+            hashmap[key] = key
+        return hashmap, keys
+
+    @staticmethod
+    def mean_probe_length(hashmap, keys):
+        total = 0
+        for key in keys:
+            sequence = hashmap._probing_sequence(key, hash(key), hashmap.size)
+            for probes, idx in enumerate(sequence, 1):
+                slot = hashmap.slots[idx]
+                if isinstance(slot, HashEntry) and slot.key == key:
+                    break
+            total += probes
+        return total / len(keys)
+
+    @staticmethod
+    def mean_cluster_size(hashmap):
+        """The average length of the run of occupied slots an item is part of."""
+        runs = []
+        run = 0
+        for slot in hashmap.slots:
+            if isinstance(slot, HashEntry):
+                run += 1
+            elif run:
+                runs.append(run)
+                run = 0
+        runs.append(run)
+        return sum(r * r for r in runs) / sum(runs)
+
+    def test_shorter_clusters_and_probes(self):
+        linear, keys = self.fill(LinearProbingHashMap)
+        linear_probes = self.mean_probe_length(linear, keys)
+        linear_cluster = self.mean_cluster_size(linear)
+        for cls in (QuadraticProbingHashMap, DoubleHashingHashMap):
+            with self.subTest(cls=cls.__name__):
+                hashmap, keys = self.fill(cls)
+                self.assertEqual(hashmap.size, linear.size)
+                self.assertLess(self.mean_probe_length(hashmap, keys), linear_probes)
+                self.assertLess(self.mean_cluster_size(hashmap), linear_cluster)
+
+    def test_neighbouring_home_slots(self):
+        # 100 adjacent home slots with four keys each: linear probing merges
+        # them into a single run which every key has to walk through.
+        keys = [h + i * 1024 for h in range(100) for i in range(4)]
+        probes = {}
+        classes = (LinearProbingHashMap, QuadraticProbingHashMap, DoubleHashingHashMap)
+        for cls in classes:
+            hashmap = cls({k: k for k in keys}, initial_size=1024)
+            probes[cls] = self.mean_probe_length(hashmap, keys)
+        linear = probes[LinearProbingHashMap]
+        self.assertLess(probes[QuadraticProbingHashMap], linear / 4)
+        self.assertLess(probes[DoubleHashingHashMap], linear / 2)
@@ -0,0 +1,142 @@
+# type: ignore
+# ruff: noqa
+import os
+import random
+import time
+import unittest
+from unittest import mock
+
+from src.pyhashmaps.compact import CompactHashMap
+from src.pyhashmaps.cuckoo import CuckooHashMap
+from src.pyhashmaps.hashing import KeyedHash
+from src.pyhashmaps.int_keys import IntIntHashMap
+from src.pyhashmaps.open_addressing import (
+    ArrayLinearProbingHashMap,
+    LinearProbingHashMap,
+    RobinHoodHashMap,
+)
+from src.pyhashmaps.parallel import build_parallel
+from src.pyhashmaps.separate_chaining import AVLTreeHashMap, LinkedListHashMap
+from src.pyhashmaps.swiss_table import SwissTableHashMap
+
+from .base_test_file import CountingHash
+
+
+class TestBuildParallel(unittest.TestCase):
+    def test_against_dict(self):
+        rng = random.Random(0)
+        items = [(rng.randrange(3000), i) for i in range(5000)]
+        for cls in (
+            LinearProbingHashMap,
+            ArrayLinearProbingHashMap,
+            RobinHoodHashMap,
+            SwissTableHashMap,
+            CompactHashMap,
+            CuckooHashMap,
+            IntIntHashMap,
+            LinkedListHashMap,
+            AVLTreeHashMap,
+        ):
+            with self.subTest(cls=cls):
+                hashmap = build_parallel(items, cls=cls, workers=2, chunk_size=700)
+                self.assertIsInstance(hashmap, cls)
+                self.assertEqual(dict(hashmap.items()), dict(items))
+                self.assertEqual(len(hashmap), len(dict(items)))
+
+    def test_main_process_does_not_probe(self):
+        items = {str(i): i for i in range(2000)}
+        with mock.patch.object(
+            LinearProbingHashMap, "_set_hashed", side_effect=AssertionError
+        ):
+            hashmap = build_parallel(
+                items, workers=2, chunk_size=500, initial_size=8, resize_factor=0.5
+            )
+        self.assertEqual(hashmap.stats().resize_count, 1)
+        self.assertLessEqual(hashmap.stats().load_factor, 0.5)
+        self.assertEqual(dict(hashmap.items()), items)
+        self.assertTrue(all(hashmap[k] == v for k, v in items.items()))
+
+        # The table is an ordinary one afterwards.
+        for i in range(2000, 3000):
+            hashmap[str(i)] = i
+        for i in range(0, 3000, 2):
+            del hashmap[str(i)]
+        self.assertEqual(dict(hashmap.items()), {str(i): i for i in range(1, 3000, 2)})
+
+    def test_keys_are_hashed_once(self):
+        items = [(i, i) for i in range(1000)]
+        CountingHash.calls = 0
+        hashmap = build_parallel(
+            items, workers=2, chunk_size=100, hash_strategy=CountingHash()
+        )
+        self.assertEqual(CountingHash.calls, 1000)
+        self.assertEqual(dict(hashmap.items()), dict(items))
+
+        hashmap = build_parallel(
+            {str(i): i for i in range(1000)},
+            workers=2,
+            chunk_size=100,
+            hash_strategy=KeyedHash(5),
+        )
+        self.assertEqual(hashmap["999"], 999)
+
+    def test_clusters_across_partitions(self):
+        # The table has 64 slots and two partitions of 32.
+        for homes in ([63] * 40, [30] * 10 + [32] * 10 + [60] * 10, [31, 63] * 20):
+            with self.subTest(homes=homes):
+                items = [((home, i), i) for i, home in enumerate(homes)]
+                hashmap = build_parallel(
+                    items, workers=2, chunk_size=10, hash_strategy=lambda key: key[0]
+                )
+                self.assertEqual(hashmap.size, 64)
+                self.assertEqual(dict(hashmap.items()), dict(items))
+                self.assertTrue(all(hashmap[k] == v for k, v in items))
+                self.assertEqual(len(hashmap), len(items))
+
+    def test_falls_back_to_set_many(self):
+        items = [(str(i), i) for i in range(1000)] + [("5", "last")]
+        for cls, kwargs in (
+            (LinearProbingHashMap, {"workers": 1}),
+            (LinearProbingHashMap, {"workers": 4, "chunk_size": 600}),
+            (CompactHashMap, {"workers": 2, "chunk_size": 100}),
+        ):
+            with self.subTest(cls=cls, **kwargs):
+                with mock.patch.object(cls, "set_many", autospec=True) as set_many:
+                    build_parallel(items, cls=cls, **kwargs)
+                set_many.assert_called_once()
+
+        hashmap = build_parallel(items, cls=CompactHashMap, workers=2, chunk_size=100)
+        self.assertEqual(list(hashmap), [str(i) for i in range(1000)])
+        self.assertEqual(hashmap["5"], "last")
+
+    def test_arguments(self):
+        hashmap = build_parallel(iter([("a", 1), ("b", 2)]), workers=4)
+        self.assertEqual(dict(hashmap.items()), {"a": 1, "b": 2})
+        self.assertEqual(len(build_parallel([], cls=AVLTreeHashMap)), 0)
+
+        for kwargs in ({"workers": 0}, {"workers": 1.5}, {"chunk_size": 0}):
+            with self.assertRaises(ValueError):
+                build_parallel([], **kwargs)
+
+    @unittest.skipIf((os.cpu_count() or 1) < 4, "needs at least 4 CPUs")
+    def test_faster_than_set_many(self):
+        items = [(f"key{i}", i) for i in range(400_000)]
+        keys, values = zip(*items)
+
+        def best_time(build):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                build()
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        serial = best_time(lambda: LinearProbingHashMap().set_many(keys, values))
+        parallel = best_time(
+            lambda: build_parallel(items, workers=4, chunk_size=50_000)
+        )
+        self.assertLess(parallel, serial)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,225 @@
+# type: ignore
+# ruff: noqa
+import io
+import json
+import os
+import pickle
+import random
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from src.pyhashmaps.persistent import (
+    HEADER_SIZE,
+    MmapHashMap,
+    PickleSerializer,
+    _HEADER,
+    _MIN_WASTE,
+)
+
+
+def _read_items(path, keys):
+    with MmapHashMap(path, flag="r") as hashmap:
+        return hashmap.get_many(keys), len(hashmap)
+
+
+class JSONSerializer:
+    def dumps(self, obj):
+        return json.dumps(obj).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class TestMmapHashMap(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "hashmap.db")
+
+    def open(self, *args, **kwargs):
+        hashmap = MmapHashMap(self.path, *args, **kwargs)
+        self.addCleanup(lambda: hashmap._mm.closed or hashmap.close())
+        return hashmap
+
+    def test_mapping(self):
+        hashmap = self.open({"a": 1, ("b", 2): [3]})
+        hashmap[10] = None
+        hashmap["a"] = "updated"
+        del hashmap[("b", 2)]
+        self.assertEqual(dict(hashmap.items()), {"a": "updated", 10: None})
+        self.assertEqual(len(hashmap), 2)
+        self.assertNotIn(("b", 2), hashmap)
+        with self.assertRaises(KeyError):
+            del hashmap["missing"]
+        with self.assertRaises(TypeError):
+            hashmap[{}] = 1
+
+    def test_against_dict(self):
+        rng = random.Random(0)
+        hashmap = self.open(initial_size=8)
+        expected = {}
+        for i in range(3000):
+            k = rng.choice([rng.randrange(200), str(rng.randrange(200))])
+            if rng.random() < 0.6:
+                hashmap[k] = expected[k] = i
+            elif k in expected:
+                del hashmap[k]
+                del expected[k]
+        self.assertEqual(dict(hashmap.items()), expected)
+        self.assertGreater(hashmap.stats().resize_count, 0)
+
+    def test_reopen(self):
+        hashmap = self.open(initial_size=16, resize_factor=0.5, seed=42)
+        for i in range(100):
+            hashmap[str(i)] = i
+        del hashmap["0"]
+        size = hashmap.size
+        hashmap.close()
+
+        hashmap = self.open(flag="w")
+        self.assertEqual(len(hashmap), 99)
+        self.assertEqual(hashmap.size, size)
+        self.assertEqual(hashmap.resize_factor, 0.5)
+        self.assertEqual(hashmap.hash_strategy.seed, 42)
+        self.assertEqual(hashmap["50"], 50)
+        self.assertNotIn("0", hashmap)
+        hashmap["0"] = 0
+        hashmap.close()
+
+        self.assertEqual(self.open(flag="c")["0"], 0)
+        self.assertEqual(len(self.open(flag="n")), 0)
+
+    def test_random_seed(self):
+        hashmap = self.open({"a": 1})
+        seed = hashmap.hash_strategy.seed
+        hashmap.reserve(1000)
+        hashmap.close()
+        self.assertEqual(self.open(flag="r").hash_strategy.seed, seed)
+        seeds = {self.open(flag="n").hash_strategy.seed for _ in range(3)}
+        self.assertEqual(len(seeds | {seed}), 4)
+
+    def test_flags(self):
+        with self.assertRaises(ValueError):
+            self.open(flag="x")
+        with self.assertRaises(FileNotFoundError):
+            self.open(flag="r")
+        with open(self.path, "wb") as f:
+            f.write(bytes(HEADER_SIZE))
+        with self.assertRaises(ValueError):
+            self.open(flag="w")
+
+    def test_read_only(self):
+        self.open({"a": 1}).close()
+        hashmap = self.open(flag="r")
+        self.assertEqual(hashmap["a"], 1)
+        with self.assertRaises(io.UnsupportedOperation):
+            hashmap["b"] = 2
+        with self.assertRaises(io.UnsupportedOperation):
+            del hashmap["a"]
+        with self.assertRaises(io.UnsupportedOperation):
+            hashmap.compact()
+        self.assertEqual(dict(hashmap.items()), {"a": 1})
+
+    def test_many_readers(self):
+        keys = [f"key{i}" for i in range(500)]
+        with self.open() as hashmap:
+            hashmap.set_many(keys, range(500))
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(_read_items, self.path, keys) for _ in range(4)]
+            for future in futures:
+                self.assertEqual(future.result(), (list(range(500)), 500))
+
+    def test_reader_sees_the_writer_grow_the_file(self):
+        writer = self.open({"a": 0}, initial_size=1024)
+        reader = self.open(flag="r")
+        self.assertEqual(len(reader), 1)
+        size = os.path.getsize(self.path)
+        for i in range(200):
+            writer[str(i)] = "x" * 1000
+        self.assertGreater(os.path.getsize(self.path), size)
+        self.assertEqual(len(reader), 201)
+        self.assertEqual(reader["199"], "x" * 1000)
+        self.assertEqual(len(dict(reader.items())), 201)
+
+        # A slot may point past the mapping before the header is written.
+        writer["new"] = "y" * 100_000
+        key_bytes = reader.serializer.dumps("new")
+        idx = reader._find_index(key_bytes, reader._hash_func("new"))
+        self.assertNotEqual(idx, -1)
+        self.assertEqual(reader["new"], "y" * 100_000)
+
+        # A resize replaces the file, so the reader keeps the old one.
+        writer.reserve(5000)
+        writer["after"] = 1
+        self.assertEqual(len(reader), 202)
+        self.assertNotIn("after", reader)
+        self.assertEqual(reader["a"], 0)
+
+    def test_delete_many_keeps_the_shrink_factor(self):
+        hashmap = self.open({i: i for i in range(100)}, shrink_factor=0.2)
+        shrink_factors = []
+        del_hashed = hashmap._del_hashed
+
+        def recording_del_hashed(key, hash_):
+            del_hashed(key, hash_)
+            with open(self.path, "rb") as f:
+                shrink_factors.append(_HEADER.unpack(f.read(_HEADER.size))[-1])
+
+        hashmap._del_hashed = recording_del_hashed
+        self.assertEqual(hashmap.delete_many(range(95)), 95)
+        self.assertEqual(set(shrink_factors), {0.2})
+        self.assertEqual(hashmap.shrink_factor, 0.2)
+        self.assertLess(hashmap.size, 100)
+
+    def test_small_resize_factor(self):
+        hashmap = self.open({i: i for i in range(100)}, resize_factor=0.2)
+        self.assertLess(hashmap.shrink_factor, 0.1)
+        hashmap.close()
+        self.assertEqual(self.open(flag="r").resize_factor, 0.2)
+
+    def test_dead_records_are_dropped(self):
+        hashmap = self.open(initial_size=8)
+        value = "x" * 1000
+        for i in range(2 * _MIN_WASTE // len(value)):
+            hashmap["key"] = value
+        self.assertLess(os.path.getsize(self.path), 2 * _MIN_WASTE)
+        self.assertLess(hashmap._waste, _MIN_WASTE)
+        self.assertEqual(dict(hashmap.items()), {"key": value})
+
+    def test_rehash_reuses_stored_hashes(self):
+        hashmap = self.open({i: i for i in range(20)}, initial_size=8)
+        serializer = hashmap.serializer
+        # Neither serializing nor hashing a key is possible without it.
+        hashmap.serializer = None
+        hashmap.reserve(1000)
+        hashmap.serializer = serializer
+        self.assertEqual(dict(hashmap.items()), {i: i for i in range(20)})
+
+    def test_serializer(self):
+        hashmap = self.open(serializer=JSONSerializer())
+        hashmap["a"] = {"b": [1, 2]}
+        self.assertEqual(hashmap["a"], {"b": [1, 2]})
+        ((_, offset),) = hashmap._live_slots()
+        self.assertEqual(hashmap._key_bytes(offset), b'"a"')
+        self.assertEqual(PickleSerializer().loads(PickleSerializer().dumps(1)), 1)
+
+    def test_pickle_reopens_the_file(self):
+        hashmap = self.open({"a": 1})
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.addCleanup(copy.close)
+        self.assertEqual(copy.path, hashmap.path)
+        self.assertFalse(copy.readonly)
+        self.assertEqual(dict(copy.items()), {"a": 1})
+
+    def test_counters(self):
+        hashmap = self.open({"a": 1})
+        counters = hashmap.enable_counters()
+        hashmap["a"]
+        hashmap.get("b")
+        self.assertEqual((counters.hits, counters.misses), (1, 1))
+        self.assertEqual(hashmap.stats().length, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,20 @@
 # type: ignore
 # ruff: noqa
+import ctypes
+import pickle
+import sys
 import unittest
 
+from src.pyhashmaps.base import HashEntry
+from src.pyhashmaps.chains import AVLTree, BinarySearchTree, DynamicArray, LinkedList
+from src.pyhashmaps.resize_policies import (
+    AdaptivePolicy,
+    LoadFactorMaxChainPolicy,
+    LoadFactorPolicy,
+)
 from src.pyhashmaps.separate_chaining import (
+    AdaptiveHashMap,
+    AVLTreeHashMap,
     BSTHashMap,
     DynamicArrayHashMap,
     LinkedListHashMap,
@@ -33,6 +45,162 @@ class TestSeparateChainingHashmap(BaseTestCase):
             hashmap[A()] = i
         self.assertEqual(hashmap.size, 5 * 2)
 
+    def test_colliding_keys_dont_grow_the_table(self):
+        class Key(int):
+            def __hash__(self):
+                return 0
+
+        for policy in (
+            None,
+            LoadFactorPolicy(),
+            LoadFactorMaxChainPolicy(max_chain_size=3),
+            AdaptivePolicy(max_chain_size=4),
+        ):
+            hashmap = self.cls(initial_size=64, resize_policy=policy)
+            for i in range(30):
+                hashmap[Key(i)] = i
+            self.assertEqual(hashmap.size, 64)
+            self.assertEqual(hashmap.chain_length_histogram(), {0: 63, 30: 1})
+
+    def test_resize_policies(self):
+        hashmap = self.cls(initial_size=10, resize_policy=LoadFactorPolicy(0.5))
+        for i in range(5):
+            hashmap[i] = i
+        self.assertEqual(hashmap.size, 20)
+
+        # Lots of chains with two items, which is the policy's half chain size.
+        hashmap = self.cls(initial_size=100, resize_policy=AdaptivePolicy(4, 4, 0.1))
+        for i in range(20):
+            hashmap[i] = hashmap[i + 100] = i
+        self.assertEqual(hashmap.size, 100)
+        hashmap[200] = hashmap[300] = 0
+        self.assertEqual(hashmap.size, 200)
+
+        self.assertRaises(ValueError, LoadFactorPolicy, 0)
+        self.assertRaises(ValueError, LoadFactorMaxChainPolicy, max_chain_size=0)
+        self.assertRaises(ValueError, AdaptivePolicy, long_chain_ratio=0)
+
+    def test_shrink(self):
+        hashmap = self.cls(initial_size=2, max_chain_size=5)
+        for i in range(1000):
+            hashmap[i] = i
+        largest_size = hashmap.size
+        for i in range(990):
+            del hashmap[i]
+        self.assertLessEqual(hashmap.size, largest_size // 4)
+        self.assertEqual(dict(hashmap), {i: i for i in range(990, 1000)})
+
+        hashmap.shrink_to_fit()
+        self.assertEqual(hashmap.size, 16)
+        self.assertEqual(dict(hashmap), {i: i for i in range(990, 1000)})
+
+    def test_shrink_disabled(self):
+        hashmap = self.cls(initial_size=2, shrink_factor=0)
+        for i in range(100):
+            hashmap[i] = i
+        size = hashmap.size
+        for i in range(100):
+            del hashmap[i]
+        self.assertEqual(hashmap.size, size)
+        self.assertRaises(ValueError, self.cls, shrink_factor=1)
+
+    def test_shrink_factor_leaves_a_gap(self):
+        self.assertRaises(ValueError, self.cls, shrink_factor=0.5)
+        self.assertRaises(
+            ValueError,
+            self.cls,
+            shrink_factor=0.3,
+            resize_policy=LoadFactorPolicy(max_load_factor=0.5),
+        )
+        # Without an explicit shrink_factor, any policy is accepted.
+        for max_load_factor in (0.15, 0.2):
+            policy = LoadFactorPolicy(max_load_factor=max_load_factor)
+            hashmap = self.cls(resize_policy=policy)
+            self.assertLess(hashmap.shrink_factor, max_load_factor / 2)
+        self.assertEqual(self.cls().shrink_factor, 0.1)
+
+        def drain(churn):
+            hashmap = self.cls(initial_size=8, shrink_factor=0.3)
+            hashmap.update((i, i) for i in range(256))
+            resize_count = hashmap.stats().resize_count
+            for i in range(256):
+                del hashmap[i]
+                # Inserting and deleting back and forth across the boundary.
+                for _ in range(churn):
+                    hashmap[i] = i
+                    del hashmap[i]
+            return hashmap.stats().resize_count - resize_count
+
+        self.assertEqual(drain(churn=3), drain(churn=0))
+
+    def test_stats_chain_lengths(self):
+        hashmap = self.cls(initial_size=8)
+        # The three keys land in the same chain.
+        for key in (0, 8, 16):
+            hashmap[key] = key
+        stats = hashmap.stats()
+        self.assertEqual(stats.length_histogram, {0: 7, 3: 1})
+        self.assertEqual(stats.tombstones, 0)
+        if isinstance(hashmap.slots[0], AVLTree):
+            # 8 is the root, with 0 and 16 as its children.
+            self.assertEqual(stats.max_displacement, 1)
+            self.assertAlmostEqual(stats.mean_displacement, 2 / 3)
+        else:
+            self.assertEqual(stats.max_displacement, 2)
+            self.assertEqual(stats.mean_displacement, 1.0)
+
+        counters = hashmap.enable_counters()
+        hashmap[16]
+        self.assertEqual(counters.probes, stats.max_displacement + 1)
+        self.assertEqual(counters.comparisons, 1)
+        self.assertNotIn(1, hashmap)
+        self.assertEqual(counters.misses, 1)
+
+    def test_incremental_resize(self):
+        hashmap = self.cls(initial_size=4, max_chain_size=2, incremental_resize=True)
+        hashmap._rehash_step = 1
+        hashmap[0] = 0
+        hashmap[4] = 4
+        self.assertEqual(hashmap.size, 8)
+        self.assertEqual(hashmap._old_size, 4)
+        self.assertEqual(dict(hashmap), {0: 0, 4: 4})
+
+        hashmap[1] = 1
+        hashmap[0] = "updated"
+        self.assertEqual(hashmap._rehash_idx, 1)
+        self.assertEqual(dict(hashmap), {0: "updated", 1: 1, 4: 4})
+        del hashmap[4]
+        self.assertEqual(len(hashmap), 2)
+
+        for i in range(10, 200):
+            hashmap[i] = i
+        hashmap._finish_rehash()
+        self.assertIsNone(hashmap._old_slots)
+        self.assertEqual(set(hashmap), {0, 1, *range(10, 200)})
+        self.assertEqual(len(hashmap), 192)
+
+    def test_sizeof_during_incremental_resize(self):
+        hashmap = self.cls(initial_size=8, incremental_resize=True)
+        hashmap._rehash_step = 1
+        for i in range(100):
+            hashmap[i] = i
+        self.assertIsNotNone(hashmap._old_slots)
+        pending = hashmap._old_size - hashmap._rehash_idx
+        size = sys.getsizeof(hashmap)
+        hashmap._finish_rehash()
+        pointer_size = ctypes.sizeof(ctypes.c_void_p)
+        # Only the old chains still waiting to be moved add to the new table.
+        self.assertEqual(size - sys.getsizeof(hashmap), pending * pointer_size)
+
+
+class TestIncrementalDynamicArrayHashMap(
+    TestSeparateChainingHashmap, unittest.TestCase
+):
+    class cls(DynamicArrayHashMap):
+        def __init__(self, *args, **kwargs):
+            kwargs.setdefault("incremental_resize", True)
+            super().__init__(*args, **kwargs)
+
 
 class TestDynamicArrayHashMap(TestSeparateChainingHashmap, unittest.TestCase):
     cls = DynamicArrayHashMap
@@ -59,3 +227,156 @@ class TestBSTHashMap(TestSeparateChainingHashmap, unittest.TestCase):
         for i in range(3):
             hashmap[A()] = i
         self.assertEqual(hashmap.size, 5 * 2)
+
+
+class TestAVLTreeHashMap(TestBSTHashMap):
+    cls = AVLTreeHashMap
+
+    def test_sorted_keys_in_one_chain(self):
+        hashmap = self.cls(
+            initial_size=1, resize_policy=LoadFactorPolicy(max_load_factor=10**6)
+        )
+        n = 2000
+        for i in range(n):
+            hashmap[i] = i
+        chain = hashmap.slots[0]
+        self.assertEqual(len(chain), n)
+        # An AVL tree is never higher than 1.44 * log2(n).
+        self.assertLessEqual(chain.root.height, 16)
+        self.assertEqual([e.key for e in chain], list(range(n)))
+
+        for i in range(0, n, 3):
+            del hashmap[i]
+        self.assertEqual(list(hashmap), [i for i in range(n) if i % 3])
+        self.assertLessEqual(chain.root.height, 16)
+        self.assertRaises(KeyError, chain.delete, 0, 0)
+
+
+class TestAdaptiveHashMap(TestSeparateChainingHashmap, unittest.TestCase):
+    cls = AdaptiveHashMap
+
+    def test_treeify(self):
+        class Key(int):
+            def __hash__(self):
+                return 0
+
+        hashmap = self.cls()
+        chain = hashmap.slots[0]
+        for i in range(8):
+            hashmap[Key(i)] = i
+        self.assertIsInstance(chain.chain, DynamicArray)
+        hashmap[Key(8)] = 8
+        self.assertIsInstance(chain.chain, AVLTree)
+        self.assertEqual(hashmap[Key(5)], 5)
+
+        for i in range(3):
+            del hashmap[Key(i)]
+        self.assertIsInstance(chain.chain, DynamicArray)
+        self.assertEqual(sorted(hashmap.values()), list(range(3, 9)))
+
+    def test_unorderable_keys(self):
+        class Key:
+            def __hash__(self):
+                return 0
+
+        class OrderedKey(int):
+            def __hash__(self):
+                return 0
+
+        hashmap = self.cls()
+        chain = hashmap.slots[0]
+        keys = [Key() for _ in range(20)]
+        for k in keys:
+            hashmap[k] = 1
+        self.assertIsInstance(chain.chain, DynamicArray)
+        self.assertEqual(len(hashmap), 20)
+
+        hashmap = self.cls()
+        chain = hashmap.slots[0]
+        for i in range(10):
+            hashmap[OrderedKey(i)] = i
+        self.assertIsInstance(chain.chain, AVLTree)
+        self.assertNotIn(keys[0], hashmap)
+        hashmap[keys[0]] = "unorderable"
+        self.assertIsInstance(chain.chain, DynamicArray)
+        self.assertEqual(hashmap[keys[0]], "unorderable")
+        self.assertEqual(len(hashmap), 11)
+
+    def test_partially_ordered_keys(self):
+        class Key(frozenset):
+            def __hash__(self):
+                return 0
+
+        class ReversedKey(int):
+            def __hash__(self):
+                return 0
+
+            def __lt__(self, other):
+                return int(other) < int(self)
+
+        # `<` compares these keys without raising, but not as a total order.
+        for keys in (
+            [Key({i}) for i in range(30)],
+            [ReversedKey(i) for i in range(30)],
+        ):
+            hashmap = self.cls()
+            chain = hashmap.slots[0]
+            for i, k in enumerate(keys):
+                hashmap[k] = i
+            self.assertIsInstance(chain.chain, DynamicArray)
+            self.assertEqual([hashmap[k] for k in keys], list(range(30)))
+
+        class FloatKey(float):
+            def __hash__(self):
+                return 0
+
+        class IntKey(int):
+            def __hash__(self):
+                return 0
+
+        hashmap = self.cls()
+        chain = hashmap.slots[0]
+        for i in range(10):
+            hashmap[FloatKey(i)] = i
+        self.assertIsInstance(chain.chain, AVLTree)
+        # Keys of another type are still found when they're equal.
+        self.assertEqual(hashmap[IntKey(1)], 1)
+        del hashmap[IntKey(2)]
+        self.assertNotIn(FloatKey(2), hashmap)
+        nan = FloatKey("nan")
+        hashmap[nan] = "nan"
+        hashmap[FloatKey(20)] = 20
+        self.assertIsInstance(chain.chain, DynamicArray)
+        self.assertEqual(hashmap[nan], "nan")
+        self.assertEqual(len(hashmap), 11)
+
+
+class TestChainTraversal(unittest.TestCase):
+    def test_deep_trees(self):
+        n = 2000
+        for chain in (BinarySearchTree(), AVLTree()):
+            for i in range(n):
+                chain.append_at_end(HashEntry(i, i, i))
+            self.assertEqual([e.key for e in chain], list(range(n)))
+
+    def test_rebuild_order_keeps_shape(self):
+        keys = [4, 2, 6, 1, 3, 5, 7, 8, 9, 10]
+        for chain_cls in (LinkedList, BinarySearchTree, AVLTree):
+            chain = chain_cls()
+            for k in keys:
+                chain.append_at_end(HashEntry(k, k, k))
+            copy = chain_cls()
+            for item in chain.rebuild_order():
+                copy.append_at_end(item)
+            self.assertEqual(
+                list(copy.rebuild_order()), list(chain.rebuild_order())
+            )
+
+    def test_pickle_deep_tree(self):
+        hashmap = BSTHashMap(
+            initial_size=1, resize_policy=LoadFactorPolicy(max_load_factor=10**6)
+        )
+        n = 5000
+        hashmap.set_many(range(n), range(n))
+        copy = pickle.loads(pickle.dumps(hashmap))
+        self.assertEqual([e.key for e in copy.slots[0]], list(range(n)))
@@ -0,0 +1,248 @@
+# type: ignore
+# ruff: noqa
+import random
+import threading
+import unittest
+
+from src.pyhashmaps.caches import LFUHashMap, LRUHashMap, TTLHashMap
+from src.pyhashmaps.compact import CompactHashMap
+from src.pyhashmaps.int_keys import IntIntHashMap
+from src.pyhashmaps.open_addressing import LinearProbingHashMap, RobinHoodHashMap
+from src.pyhashmaps.separate_chaining import AVLTreeHashMap, LinkedListHashMap
+from src.pyhashmaps.sharded import ShardedHashMap, rcu_class
+from src.pyhashmaps.swiss_table import SwissTableHashMap
+
+SHARD_CLASSES = [
+    LinearProbingHashMap,
+    RobinHoodHashMap,
+    SwissTableHashMap,
+    CompactHashMap,
+    IntIntHashMap,
+    LinkedListHashMap,
+    AVLTreeHashMap,
+]
+
+
+class TestShardedHashMap(unittest.TestCase):
+    def test_against_dict(self):
+        for shard_class in SHARD_CLASSES:
+            with self.subTest(shard_class=shard_class):
+                rng = random.Random(0)
+                hashmap = ShardedHashMap(
+                    shards=4, shard_class=shard_class, initial_size=8
+                )
+                expected = {}
+                for i in range(3000):
+                    k = rng.randrange(-300, 300)
+                    if rng.random() < 0.6:
+                        hashmap[k] = expected[k] = i
+                    elif k in expected:
+                        del hashmap[k]
+                        del expected[k]
+                self.assertEqual(dict(hashmap), expected)
+                self.assertEqual(len(hashmap), len(expected))
+                with self.assertRaises(KeyError):
+                    hashmap[1000]
+                with self.assertRaises(KeyError):
+                    del hashmap[1000]
+
+    def test_keys_are_spread(self):
+        hashmap = ShardedHashMap({i: i for i in range(1000)}, shards=8)
+        for shard in hashmap._shards:
+            self.assertGreater(len(shard.map), 50)
+        self.assertEqual(len(ShardedHashMap({1: 1}, shards=1)), 1)
+        for shards in (0, 3, 2.0):
+            with self.assertRaises(ValueError):
+                ShardedHashMap(shards=shards)
+
+    def test_shard_options(self):
+        hashmap = ShardedHashMap(
+            shard_class=RobinHoodHashMap, hash_strategy=str.__len__, initial_size=32
+        )
+        hashmap["abc"] = 1
+        for shard in hashmap._shards:
+            self.assertIs(shard.map.hash_strategy, str.__len__)
+            self.assertEqual(shard.map.size, 32)
+            self.assertIsInstance(shard.map, RobinHoodHashMap)
+        self.assertEqual(repr(hashmap), "ShardedHashMap({'abc': 1})")
+
+    def test_resize_swaps_the_map(self):
+        hashmap = ShardedHashMap(shards=1, initial_size=8)
+        old = hashmap._shards[0].map
+        for i in range(5):
+            hashmap[i] = i
+        self.assertIs(hashmap._shards[0].map, old)
+
+        hashmap[5] = 5
+        new = hashmap._shards[0].map
+        self.assertIsNot(new, old)
+        self.assertGreater(new.size, 8)
+        # The insert which triggered the resize went to the old table, which
+        # is still consistent.
+        self.assertEqual(old.size, 8)
+        self.assertEqual(dict(old), {i: i for i in range(6)})
+        self.assertEqual(new.stats().resize_count, 1)
+        self.assertEqual(dict(hashmap), {i: i for i in range(6)})
+        self.assertEqual(hashmap._shards[0].version % 2, 0)
+
+    def test_rcu_class(self):
+        cls = rcu_class(LinkedListHashMap)
+        self.assertIs(cls, rcu_class(LinkedListHashMap))
+        self.assertEqual(cls.__name__, "LinkedListHashMap")
+        self.assertTrue(issubclass(cls, LinkedListHashMap))
+
+    def test_compound_operations(self):
+        hashmap = ShardedHashMap({"a": 1})
+        self.assertEqual(hashmap.setdefault("a", 2), 1)
+        self.assertEqual(hashmap.setdefault("b", 2), 2)
+        self.assertIsNone(hashmap.setdefault("c"))
+
+        self.assertEqual(hashmap.pop("c"), None)
+        self.assertEqual(hashmap.pop("c", "x"), "x")
+        with self.assertRaises(KeyError):
+            hashmap.pop("c")
+
+        self.assertTrue(hashmap.update_if("a", lambda v: v == 1, 10))
+        self.assertFalse(hashmap.update_if("a", lambda v: v == 1, 20))
+        self.assertFalse(hashmap.update_if("z", lambda v: True, 20))
+        self.assertNotIn("z", hashmap)
+
+        calls = []
+        factory = lambda k: calls.append(k) or k * 2
+        self.assertEqual(hashmap.compute_if_absent("d", factory), "dd")
+        self.assertEqual(hashmap.compute_if_absent("d", factory), "dd")
+        self.assertEqual(calls, ["d"])
+        self.assertEqual(dict(hashmap), {"a": 10, "b": 2, "d": "dd"})
+
+        items = {hashmap.popitem() for _ in range(3)}
+        self.assertEqual(items, {("a", 10), ("b", 2), ("d", "dd")})
+        with self.assertRaises(KeyError):
+            hashmap.popitem()
+
+    def test_clear(self):
+        hashmap = ShardedHashMap({i: i for i in range(100)}, initial_size=8)
+        hashmap.clear()
+        self.assertEqual(len(hashmap), 0)
+        self.assertTrue(all(s.map.size == 8 for s in hashmap._shards))
+        hashmap[1] = 1
+        self.assertEqual(dict(hashmap), {1: 1})
+
+    def test_failed_write_releases_the_shard(self):
+        hashmap = ShardedHashMap(shard_class=IntIntHashMap)
+        with self.assertRaises(TypeError):
+            hashmap[1] = "1"
+        with self.assertRaises(TypeError):
+            hashmap["1"] = 1
+        hashmap[1] = 1
+        self.assertEqual(hashmap[1], 1)
+        self.assertTrue(all(s.version % 2 == 0 for s in hashmap._shards))
+
+    def test_concurrent_readers_and_writers(self):
+        for shard_class in (LinearProbingHashMap, RobinHoodHashMap, AVLTreeHashMap):
+            with self.subTest(shard_class=shard_class):
+                hashmap = ShardedHashMap(
+                    {-i: i for i in range(1, 200)},
+                    shards=4,
+                    shard_class=shard_class,
+                    initial_size=8,
+                )
+                stop = threading.Event()
+                errors = []
+
+                def write(offset):
+                    for i in range(offset, 4000, 4):
+                        hashmap[i] = i
+                        if i % 3 == 0:
+                            del hashmap[i]
+
+                def read():
+                    # The keys which are never written must always be found.
+                    while not stop.is_set():
+                        for i in range(1, 200):
+                            if hashmap.get(-i) != i:
+                                errors.append(i)
+
+                readers = [threading.Thread(target=read) for _ in range(2)]
+                writers = [
+                    threading.Thread(target=write, args=(i,)) for i in range(4)
+                ]
+                for t in readers + writers:
+                    t.start()
+                for t in writers:
+                    t.join()
+                stop.set()
+                for t in readers:
+                    t.join()
+
+                self.assertEqual(errors, [])
+                expected = {-i: i for i in range(1, 200)}
+                expected.update((i, i) for i in range(4000) if i % 3)
+                self.assertEqual(dict(hashmap), expected)
+
+    def test_concurrent_cache_shards(self):
+        for shard_class, kwargs in (
+            (LRUHashMap, {"maxsize": 50}),
+            (LFUHashMap, {"maxsize": 50}),
+            (TTLHashMap, {"maxsize": 50, "ttl": 0.001}),
+        ):
+            with self.subTest(shard_class=shard_class):
+                hashmap = ShardedHashMap(shards=2, shard_class=shard_class, **kwargs)
+                stop = threading.Event()
+                errors = []
+
+                def write():
+                    try:
+                        for i in range(5000):
+                            hashmap[i % 300] = i
+                    except Exception as e:
+                        errors.append(e)
+
+                def read():
+                    # Lookups reorder the entries of the cache they hit.
+                    try:
+                        while not stop.is_set():
+                            for i in range(300):
+                                hashmap.get(i)
+                            len(hashmap)
+                    except Exception as e:
+                        errors.append(e)
+
+                readers = [threading.Thread(target=read) for _ in range(2)]
+                writers = [threading.Thread(target=write) for _ in range(2)]
+                for t in readers + writers:
+                    t.start()
+                for t in writers:
+                    t.join(timeout=60)
+                stop.set()
+                for t in readers:
+                    t.join(timeout=60)
+
+                self.assertFalse(any(t.is_alive() for t in readers + writers))
+                self.assertEqual(errors, [])
+                for shard in hashmap._shards:
+                    cache = shard.map
+                    self.assertEqual(len(list(cache._ordered_entries())), cache._len)
+                    self.assertLessEqual(cache._len, 50)
+
+    def test_concurrent_compute_if_absent(self):
+        hashmap = ShardedHashMap()
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def work():
+            barrier.wait()
+            for i in range(500):
+                hashmap.compute_if_absent(i, lambda k: calls.append(k) or k)
+                hashmap.update_if(i, lambda v: True, i)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(calls), list(range(500)))
+        self.assertEqual(dict(hashmap), {i: i for i in range(500)})
+
+
+if __name__ == "__main__":
+    unittest.main()
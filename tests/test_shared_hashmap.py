@@ -0,0 +1,133 @@
+# type: ignore
+# ruff: noqa
+import io
+import multiprocessing
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from src.pyhashmaps.open_addressing import LinearProbingHashMap
+from src.pyhashmaps.persistent import HEADER_SIZE
+from src.pyhashmaps.shared import MIN_SIZE, SharedHashMap
+
+from .test_persistent_hashmap import JSONSerializer
+
+
+def _read_items(hashmap, keys):
+    return hashmap.get_many(keys), len(hashmap)
+
+
+def _read_by_name(name, keys):
+    hashmap = SharedHashMap(name)
+    try:
+        return hashmap.get_many(keys)
+    finally:
+        hashmap.close()
+
+
+class TestSharedHashMap(unittest.TestCase):
+    def freeze(self, *args, **kwargs):
+        hashmap = SharedHashMap.freeze(*args, **kwargs)
+        self.addCleanup(hashmap.unlink)
+        self.addCleanup(hashmap.close)
+        return hashmap
+
+    def attach(self, name, **kwargs):
+        hashmap = SharedHashMap(name, **kwargs)
+        self.addCleanup(hashmap.close)
+        return hashmap
+
+    def test_freeze(self):
+        source = LinearProbingHashMap({str(i): [i] for i in range(1000)})
+        source[("a", 1)] = None
+        hashmap = self.freeze(source, resize_factor=0.5, seed=7)
+        self.assertEqual(len(hashmap), 1001)
+        self.assertEqual(dict(hashmap.items()), dict(source.items()))
+        self.assertEqual(hashmap["500"], [500])
+        self.assertIsNone(hashmap[("a", 1)])
+        self.assertNotIn("1000", hashmap)
+        self.assertGreaterEqual(hashmap.size, 2002)
+        self.assertEqual(hashmap.hash_strategy.seed, 7)
+        self.assertLessEqual(hashmap.stats().load_factor, 0.5)
+
+        empty = self.freeze({})
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.size, MIN_SIZE)
+        with self.assertRaises(KeyError):
+            empty["a"]
+        with self.assertRaises(ValueError):
+            SharedHashMap.freeze({}, resize_factor=1.0)
+
+    def test_read_only(self):
+        hashmap = self.freeze({"a": 1})
+        with self.assertRaises(io.UnsupportedOperation):
+            hashmap["b"] = 2
+        with self.assertRaises(io.UnsupportedOperation):
+            del hashmap["a"]
+        with self.assertRaises(io.UnsupportedOperation):
+            hashmap.reserve(100)
+        self.assertEqual(dict(hashmap.items()), {"a": 1})
+
+    def test_attach(self):
+        hashmap = self.freeze({"a": 1, "b": 2}, serializer=JSONSerializer())
+        other = self.attach(hashmap.name, serializer=JSONSerializer())
+        self.assertEqual(dict(other.items()), {"a": 1, "b": 2})
+        self.assertEqual(other.size, hashmap.size)
+        self.assertEqual(other.hash_strategy.seed, hashmap.hash_strategy.seed)
+        # Without a seed, every segment gets a random one.
+        self.assertNotEqual(
+            self.freeze({"a": 1}).hash_strategy.seed, hashmap.hash_strategy.seed
+        )
+
+        with self.assertRaises(FileNotFoundError):
+            SharedHashMap("pyhashmaps-missing-segment")
+
+        shm = SharedMemory(create=True, size=HEADER_SIZE)
+        self.addCleanup(shm.unlink)
+        self.addCleanup(shm.close)
+        with self.assertRaises(ValueError):
+            SharedHashMap(shm.name)
+
+    def test_pickle_sends_the_name(self):
+        hashmap = self.freeze({i: str(i) for i in range(1000)})
+        data = pickle.dumps(hashmap)
+        self.assertLess(len(data), 500)
+        copy = pickle.loads(data)
+        self.addCleanup(copy.close)
+        self.assertEqual(copy.name, hashmap.name)
+        self.assertEqual(copy[999], "999")
+
+    def test_close_and_unlink(self):
+        hashmap = SharedHashMap.freeze({"a": 1})
+        other = SharedHashMap(hashmap.name)
+        hashmap.close()
+        self.assertEqual(other["a"], 1)
+        hashmap.unlink()
+        # Processes which are still attached keep reading the segment.
+        self.assertEqual(other["a"], 1)
+        other.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedHashMap(hashmap.name)
+
+    def test_many_processes(self):
+        keys = [f"key{i}" for i in range(500)]
+        hashmap = self.freeze(dict(zip(keys, range(500))))
+        for method in ("fork", "spawn"):
+            if method not in multiprocessing.get_all_start_methods():
+                continue
+            with self.subTest(method=method):
+                context = multiprocessing.get_context(method)
+                with ProcessPoolExecutor(2, mp_context=context) as executor:
+                    futures = [
+                        executor.submit(_read_items, hashmap, keys),
+                        executor.submit(_read_by_name, hashmap.name, keys[:3]),
+                    ]
+                    self.assertEqual(futures[0].result(), (list(range(500)), 500))
+                    self.assertEqual(futures[1].result(), [0, 1, 2])
+                # The segment outlives the workers which attached to it.
+                self.assertEqual(self.attach(hashmap.name)["key7"], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
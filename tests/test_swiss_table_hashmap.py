@@ -0,0 +1,60 @@
+# type: ignore
+# ruff: noqa
+import unittest
+
+from src.pyhashmaps.open_addressing import DELETED, EMPTY
+from src.pyhashmaps.swiss_table import (
+    CTRL_DELETED,
+    CTRL_EMPTY,
+    GROUP_WIDTH,
+    SwissTableHashMap,
+    _fingerprint,
+)
+
+from .test_open_addressing_hashmap import TestOpenAddressingHashMap
+
+
+class TestSwissTableHashMap(TestOpenAddressingHashMap, unittest.TestCase):
+    cls = SwissTableHashMap
+
+    def assert_ctrl(self, hashmap):
+        ctrl = hashmap._ctrl
+        self.assertEqual(len(ctrl), hashmap.size + GROUP_WIDTH)
+        for idx, slot in enumerate(hashmap.slots):
+            if slot is EMPTY:
+                self.assertEqual(ctrl[idx], CTRL_EMPTY)
+            elif slot is DELETED:
+                self.assertEqual(ctrl[idx], CTRL_DELETED)
+            else:
+                self.assertEqual(ctrl[idx], _fingerprint(slot.hash_value))
+        for i in range(GROUP_WIDTH):
+            self.assertEqual(ctrl[hashmap.size + i], ctrl[i % hashmap.size])
+
+    def test_control_bytes(self):
+        hashmap = self.cls(initial_size=5)
+        for i in range(200):
+            hashmap[i] = i
+            if i % 4 == 0:
+                del hashmap[i // 2]
+            self.assert_ctrl(hashmap)
+
+    def test_miss_skips_other_fingerprints(self):
+        class CountingList(list):
+            reads = 0
+
+            def __getitem__(self, idx):
+                CountingList.reads += 1
+                return super().__getitem__(idx)
+
+        # All of them start probing at the same group.
+        hashes = [64 * i for i in range(1, 30)]
+        fingerprints = {_fingerprint(h) for h in hashes}
+        missing = next(
+            64 * i for i in range(100, 1000) if _fingerprint(64 * i) not in fingerprints
+        )
+        hashmap = self.cls(dict.fromkeys(hashes), initial_size=64)
+        hashmap.slots = CountingList(hashmap.slots)
+        self.assertNotIn(missing, hashmap)
+        self.assertEqual(CountingList.reads, 0)
+        self.assertIn(hashes[-1], hashmap)
+        self.assertLess(CountingList.reads, len(hashes) // 4)